@@ -0,0 +1,152 @@
+"""
+Batch throughput benchmark of nsvb.batch.estimate_trees, the threaded and
+multiprocess engines, and the approximate nsvb.grid.interpolate_trees.
+
+Trees are drawn from regional FIA species mixes, with the division codes,
+diameters and heights of each region, so that coefficient resolution and
+model forms are exercised in realistic proportions. Run from the repository
+root:
+
+    python benchmarks/bench_batch.py --sizes 1000 100000 10000000
+
+``--threads 1 2 4 8`` adds a run of the threaded engine per thread count,
+to measure how it scales with the cores of the machine.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from common import summary
+
+from nsvb.batch import EncodedDivisions, estimate_trees
+from nsvb.grid import interpolate_trees
+from nsvb.parallel import estimate_trees_parallel, estimate_trees_threaded
+
+# Species (FIA SPCD) and their shares of trees, and division codes, of each
+# region. Every mix includes species that fall back to the Jenkins group
+# coefficients.
+MIXES = {
+    "pacific_northwest": {
+        "species": {
+            202: 0.35,
+            263: 0.15,
+            122: 0.12,
+            108: 0.10,
+            19: 0.08,
+            242: 0.06,
+            351: 0.05,
+            312: 0.05,
+            928: 0.04,
+        },
+        "divisions": ["240", "M240", "M330", "M242"],
+    },
+    "northeast": {
+        "species": {
+            316: 0.25,
+            746: 0.12,
+            802: 0.10,
+            12: 0.10,
+            541: 0.08,
+            97: 0.08,
+            833: 0.07,
+            318: 0.06,
+            129: 0.04,
+            935: 0.04,
+        },
+        "divisions": ["210", "M210", "220"],
+    },
+    "southeast": {
+        "species": {
+            131: 0.40,
+            611: 0.15,
+            802: 0.10,
+            316: 0.10,
+            621: 0.07,
+            827: 0.06,
+            110: 0.05,
+            693: 0.04,
+            994: 0.03,
+        },
+        "divisions": ["230", "M230", "220"],
+    },
+}
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+
+ENGINES = {
+    "estimate_trees": lambda trees: estimate_trees(**trees),
+    "estimate_trees_threaded": lambda trees: estimate_trees_threaded(**trees),
+    "estimate_trees_parallel": lambda trees: estimate_trees_parallel(**trees),
+    "interpolate_trees": lambda trees: interpolate_trees(**trees),
+}
+
+
+def make_trees(mix: str, n: int, seed: int = 0) -> dict:
+    """
+    Draw ``n`` trees of a regional mix, with lognormal diameters of 1 to 60
+    in and heights from a Chapman-Richards curve with 10% noise.
+    """
+    rng = np.random.default_rng(seed)
+    species = MIXES[mix]["species"]
+    divisions = MIXES[mix]["divisions"]
+    shares = np.array(list(species.values()))
+    spcd = rng.choice(list(species), n, p=shares / shares.sum())
+    dia = np.clip(rng.lognormal(np.log(9.0), 0.5, n), 1.0, 60.0)
+    ht = 4.5 + 120.0 * (1 - np.exp(-0.04 * dia)) ** 1.2
+    ht *= rng.normal(1.0, 0.1, n).clip(0.6, 1.4)
+    division = EncodedDivisions(rng.integers(0, len(divisions), n), divisions)
+    return {"spcd": spcd, "dia": dia, "ht": ht, "division": division}
+
+
+def run(sizes=DEFAULT_SIZES, mixes=tuple(MIXES), engines=tuple(ENGINES), repeat=3):
+    """
+    Time each engine on each mix and number of trees, in seconds per batch
+    and trees per second.
+    """
+    results = {}
+    for mix in mixes:
+        for n in sizes:
+            trees = make_trees(mix, n)
+            for engine in engines:
+                # One untimed run compiles the coefficient tables (and
+                # builds the interpolation grids).
+                ENGINES[engine](trees)
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    ENGINES[engine](trees)
+                    samples.append(time.perf_counter() - start)
+                timing = summary(samples)
+                timing["trees_per_second"] = n / timing["median"]
+                results[f"{engine} [{mix}, n={n}]"] = timing
+            del trees
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--mixes", nargs="*", choices=list(MIXES), default=list(MIXES))
+    parser.add_argument(
+        "--engines", nargs="*", choices=list(ENGINES), default=list(ENGINES)
+    )
+    parser.add_argument("--threads", nargs="*", type=int, default=[])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engines = list(args.engines)
+    for threads in args.threads:
+        engine = f"estimate_trees_threaded/{threads}"
+        ENGINES[engine] = lambda trees, threads=threads: estimate_trees_threaded(
+            **trees, threads=threads
+        )
+        engines.append(engine)
+    json.dump(run(args.sizes, args.mixes, engines, args.repeat), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Per-call latency benchmark of the scalar nsvb.estimators functions.
+
+Each estimator is timed on trees whose coefficients resolve at each level:
+division-specific SPCD rows, species-level SPCD rows and the Jenkins species
+group fallback. Tables are loaded before timing. Run from the repository
+root:
+
+    python benchmarks/bench_estimators.py --repeat 5
+"""
+
+import argparse
+import json
+import sys
+
+from common import time_call
+
+from nsvb import estimators
+from nsvb.estimators import TreeModel
+
+FUNCTIONS = (
+    "total_inside_bark_wood_volume",
+    "total_bark_wood_volume",
+    "total_outside_bark_volume",
+    "total_stem_wood_dry_weight",
+    "total_stem_bark_weight",
+    "total_branch_weight",
+    "total_aboveground_biomass",
+    "total_foliage_dry_weight",
+)
+
+# (spcd, dia, ht, division) of a tree resolving at each level.
+TREES = {
+    "division": (202, 20.0, 110.0, "240"),
+    "spcd": (316, 11.1, 38.0, "M210"),
+    "jenkins": (631, 11.3, 28.0, "M240"),
+}
+
+
+def run(repeat: int = 5, min_time: float = 0.2) -> dict:
+    """
+    Time every estimator, and its bound :class:`TreeModel` method, on each
+    tree of :data:`TREES`.
+    """
+    results = {}
+    for level, (spcd, dia, ht, division) in TREES.items():
+        for name in FUNCTIONS:
+            function = getattr(estimators, name)
+            function(spcd, dia, ht, division)
+            results[f"{name} [{level}]"] = time_call(
+                lambda: function(spcd, dia, ht, division), repeat, min_time
+            )
+        method = getattr(TreeModel(spcd, division), "total_aboveground_biomass")
+        results[f"TreeModel.total_aboveground_biomass [{level}]"] = time_call(
+            lambda: method(dia, ht), repeat, min_time
+        )
+        results[f"estimate_tree [{level}]"] = time_call(
+            lambda: estimators.estimate_tree(spcd, dia, ht, division),
+            repeat,
+            min_time,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    args = parser.parse_args()
+
+    json.dump(run(args.repeat, args.min_time), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
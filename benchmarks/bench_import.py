@@ -0,0 +1,81 @@
+"""
+Import-time benchmark for nsvb.
+
+Each measurement runs in a fresh interpreter so the module cache and the lazy
+tables start cold. Run from the repository root:
+
+    python benchmarks/bench_import.py --repeat 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+from common import summary
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+FIRST_ACCESS_SNIPPET = """
+import time
+import nsvb.estimators
+from nsvb.tables import TABLES
+start = time.perf_counter()
+TABLES[{name!r}][(202, "")] if {name!r}.endswith("a") else TABLES[{name!r}][1]
+print(time.perf_counter() - start)
+"""
+
+LOAD_ALL_SNIPPET = """
+import time
+from nsvb.tables import TABLES
+start = time.perf_counter()
+for table in TABLES.values():
+    len(table)
+print(time.perf_counter() - start)
+"""
+
+
+def _run(snippet: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", snippet], check=True, capture_output=True, text=True
+    ).stdout
+    return float(output)
+
+
+def run(repeat: int = 5, tables=("s1a", "s1b", "s8a")) -> dict:
+    """
+    Time the imports of nsvb.tables and nsvb.estimators, the first access
+    of each of ``tables`` and the load of every table.
+    """
+    results = {}
+    for module in ("nsvb.tables", "nsvb.estimators"):
+        snippet = IMPORT_SNIPPET.format(module=module)
+        results[f"import {module}"] = summary([_run(snippet) for _ in range(repeat)])
+    for name in tables:
+        snippet = FIRST_ACCESS_SNIPPET.format(name=name)
+        results[f"first access TABLES[{name!r}]"] = summary(
+            [_run(snippet) for _ in range(repeat)]
+        )
+    results["load all TABLES"] = summary(
+        [_run(LOAD_ALL_SNIPPET) for _ in range(repeat)]
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tables", nargs="*", default=["s1a", "s1b", "s8a"])
+    args = parser.parse_args()
+
+    json.dump(run(args.repeat, args.tables), sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Importing this module puts the repository root on ``sys.path``, so the
+scripts benchmark the working tree without installing it.
+"""
+
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def summary(samples: list) -> dict:
+    """
+    Summarize timing samples in seconds.
+    """
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def time_call(function, repeat: int, min_time: float = 0.2) -> dict:
+    """
+    Time a call, looping it within each sample until the sample takes at
+    least ``min_time`` seconds, and summarize the seconds per call.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        samples.append((time.perf_counter() - start) / loops)
+    return {**summary(samples), "loops": loops}
+
+
+def environment() -> dict:
+    """
+    Commit, interpreter and library versions of a run, so that results can
+    be compared between commits and machines.
+    """
+    import numpy as np
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
@@ -0,0 +1,61 @@
+"""
+Compare two benchmark result files written by run.py.
+
+Prints the ratio of the median time of every benchmark in both files
+(candidate / baseline) and exits with status 1 if any is slower than the
+threshold. Run from the repository root:
+
+    python benchmarks/compare.py baseline.json candidate.json --threshold 1.1
+"""
+
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, candidate: dict) -> dict:
+    """
+    Ratios of the candidate to the baseline median times, keyed by suite
+    and benchmark name, for the benchmarks in both results.
+    """
+    ratios = {}
+    for suite, timings in candidate["suites"].items():
+        base = baseline["suites"].get(suite, {})
+        for name, timing in timings.items():
+            if name in base:
+                ratios[f"{suite}: {name}"] = timing["median"] / base[name]["median"]
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="ratio above which a benchmark counts as a regression",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    for run, results in (("baseline", baseline), ("candidate", candidate)):
+        environment = results["environment"]
+        print(f"{run}: {environment['commit']} (Python {environment['python']})")
+    regressions = 0
+    for name, ratio in compare(baseline, candidate).items():
+        flag = ""
+        if ratio > args.threshold:
+            flag = "  <- slower"
+            regressions += 1
+        print(f"{ratio:6.3f}  {name}{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Run the benchmark suites and write their results to one JSON file.
+
+The file records the commit, interpreter, library versions and machine of
+the run alongside the timings of each suite, so that runs can be compared
+with compare.py. Run from the repository root:
+
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --suites batch --sizes 1000 1000000 -o quick.json
+"""
+
+import argparse
+import json
+import sys
+
+import bench_batch
+import bench_estimators
+import bench_import
+from common import environment
+
+SUITES = ("import", "estimators", "batch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-o", "--output", help="JSON file (default: stdout)")
+    parser.add_argument("--suites", nargs="*", choices=SUITES, default=SUITES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--sizes", nargs="*", type=int, default=bench_batch.DEFAULT_SIZES
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="*",
+        choices=list(bench_batch.ENGINES),
+        default=list(bench_batch.ENGINES),
+    )
+    args = parser.parse_args()
+
+    results = {"environment": environment(), "suites": {}}
+    if "import" in args.suites:
+        results["suites"]["import"] = bench_import.run(args.repeat)
+    if "estimators" in args.suites:
+        results["suites"]["estimators"] = bench_estimators.run(args.repeat)
+    if "batch" in args.suites:
+        results["suites"]["batch"] = bench_batch.run(
+            args.sizes, engines=args.engines, repeat=args.repeat
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
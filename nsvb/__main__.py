@@ -0,0 +1,5 @@
+import sys
+
+from nsvb.cli import main
+
+sys.exit(main())
@@ -0,0 +1,138 @@
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError as e:
+    raise ImportError(
+        "nsvb.accessor requires pandas; install it with `pip install nsvb[pandas]`"
+    ) from e
+
+from nsvb.batch import INPUT_COLUMNS, OPTIONAL_INPUTS, EncodedDivisions, estimate_trees
+
+
+def _species(series) -> np.ndarray:
+    """
+    Species codes of a column, with -1 for missing values.
+
+    Categorical columns are converted once per category and gathered by
+    category code.
+
+    Parameters:
+        series (pd.Series): SPCD column.
+
+    Returns:
+        np.ndarray: Species codes (int64).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = _species(series.cat.categories.to_series())
+        return np.append(categories, -1)[series.cat.codes.to_numpy()]
+    if not series.hasnans:
+        return series.to_numpy(dtype=np.int64)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(values), -1, values).astype(np.int64)
+
+
+def _divisions(series) -> EncodedDivisions:
+    """
+    Dictionary-encoded division codes of a column, so each distinct division
+    is resolved once. Missing values are the empty division.
+
+    Parameters:
+        series (pd.Series): DIVISION column.
+
+    Returns:
+        EncodedDivisions: Division codes.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, categories = pd.factorize(series, use_na_sentinel=True)
+    return EncodedDivisions(codes, np.asarray(categories).astype(str))
+
+
+@pd.api.extensions.register_dataframe_accessor("nsvb")
+class NSVBAccessor:
+    """
+    Vectorized NSVB estimators for DataFrames of trees, registered as
+    ``DataFrame.nsvb`` when :mod:`nsvb.accessor` is imported.
+
+    Example:
+        >>> import nsvb.accessor
+        >>> df.nsvb.estimate(components=["agb"], division="ECODIV")
+    """
+
+    def __init__(self, df):
+        self._df = df
+
+    def estimate(
+        self,
+        components=None,
+        spcd: str = INPUT_COLUMNS["spcd"],
+        dia: str = INPUT_COLUMNS["dia"],
+        ht: str = INPUT_COLUMNS["ht"],
+        division: str = INPUT_COLUMNS["division"],
+        cull: str = INPUT_COLUMNS["cull"],
+        decaycd: str = INPUT_COLUMNS["decaycd"],
+        actual_ht: str = INPUT_COLUMNS["actual_ht"],
+        cr: str = INPUT_COLUMNS["cr"],
+        province: str = INPUT_COLUMNS["province"],
+        errors: str = "raise",
+    ) -> "pd.DataFrame":
+        """
+        Run :func:`nsvb.batch.estimate_trees` on the columns of the DataFrame
+        and add one column per component in place.
+
+        Categorical SPCD, DIVISION and PROVINCE columns are resolved once per
+        category; other DIVISION and PROVINCE columns are factorized first,
+        so coefficients are looked up once per distinct code.
+
+        Parameters:
+            components (iterable, optional): Names from
+                :data:`nsvb.estimators.COMPONENTS` to add. Default is all of
+                them.
+            spcd (str, optional): SPCD column. Default is "SPCD".
+            dia (str, optional): DIA column. Default is "DIA".
+            ht (str, optional): HT column. Default is "HT".
+            division (str, optional): DIVISION column. Trees have no division
+                if it is absent. Default is "DIVISION".
+            cull (str, optional): CULL column. Trees have no cull if it is
+                absent. Default is "CULL".
+            decaycd (str, optional): DECAYCD column of dead trees. Trees are
+                live if it is absent. Default is "DECAYCD".
+            actual_ht (str, optional): ACTUALHT column of broken-top trees.
+                Trees are intact if it is absent. Default is "ACTUALHT".
+            cr (str, optional): Observed crown ratio column. The Table S11
+                mean crown ratios are used if it is absent. Default is "CR".
+            province (str, optional): Ecological province column for Table
+                S11. The division is used if it is absent. Default is
+                "PROVINCE".
+            errors (str, optional): "raise" or "nan", as for
+                :func:`nsvb.batch.estimate_trees`. Default is "raise".
+
+        Returns:
+            pd.DataFrame: The DataFrame, with the component columns added.
+
+        Raises:
+            KeyError: If the SPCD, DIA or HT column is missing.
+        """
+        df = self._df
+        inputs = dict(OPTIONAL_INPUTS)
+        inputs["spcd"] = _species(df[spcd])
+        inputs["dia"] = df[dia].to_numpy(dtype=np.float64, na_value=np.nan)
+        inputs["ht"] = df[ht].to_numpy(dtype=np.float64, na_value=np.nan)
+        if division in df:
+            inputs["division"] = _divisions(df[division])
+        if cull in df:
+            inputs["cull"] = df[cull].to_numpy(dtype=np.float64, na_value=0.0)
+        if decaycd in df:
+            inputs["decaycd"] = df[decaycd].to_numpy(dtype=np.float64, na_value=0.0)
+        for name, column in (("actual_ht", actual_ht), ("cr", cr)):
+            if column in df:
+                inputs[name] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        if province in df:
+            inputs["province"] = _divisions(df[province])
+
+        results = estimate_trees(**inputs, components=components, errors=errors)
+        for name, values in results.items():
+            df[name] = values
+        return df
@@ -0,0 +1,234 @@
+from collections import namedtuple
+
+import numpy as np
+
+from nsvb.batch import EncodedDivisions, _as_arrays, estimate_trees
+from nsvb.estimators import COMPONENTS
+
+# Number of trees estimated at once by aggregate_trees.
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+# Integer keys (and combinations of keys) spanning at most this many values,
+# or four per tree, are coded by offset rather than by sorting.
+DENSE_LIMIT = 1 << 22
+
+GroupTotals = namedtuple("GroupTotals", ["keys", "totals", "n_trees"])
+GroupTotals.__doc__ = """
+Per-group totals of :func:`aggregate_trees`.
+
+Attributes:
+    keys (np.ndarray or dict): Key of each group; a dict of key arrays
+        keyed by name when several group keys are given.
+    totals (dict): Expanded component totals of each group, keyed by
+        component name.
+    n_trees (np.ndarray): Number of trees in each group.
+"""
+
+
+def _factorize(values) -> tuple:
+    """
+    Integer codes of one group key.
+
+    Integer keys are coded by their offset from the minimum, boolean keys
+    as 0 and 1 and dictionary-encoded keys by their index, then compacted to the values
+    present with a ``bincount``, none of which sorts the trees. Other keys
+    are coded with ``np.unique``.
+
+    Parameters:
+        values (array_like or EncodedDivisions): Key of each tree.
+
+    Returns:
+        tuple: Code of each tree and the key value of each code, in
+        ascending code order.
+    """
+    if isinstance(values, EncodedDivisions):
+        size = len(values.categories)
+        codes = np.where(values.indices < 0, size, values.indices).astype(np.intp)
+        return _compact(codes, np.append(values.categories, ""))
+    values = np.asarray(values)
+    if values.dtype.kind == "b":
+        return _compact(values.ravel().astype(np.intp), np.array([False, True]))
+    if values.dtype.kind in "iu" and values.size:
+        low, high = values.min(), values.max()
+        span = int(high) - int(low) + 1
+        if span <= max(DENSE_LIMIT, 4 * values.size):
+            codes = (values - low).astype(np.intp)
+            labels = np.arange(int(low), int(high) + 1).astype(values.dtype)
+            return _compact(codes, labels)
+    labels, codes = np.unique(values, return_inverse=True)
+    return codes.ravel().astype(np.intp), labels
+
+
+def _compact(codes, labels) -> tuple:
+    """
+    Renumber codes to the values present.
+
+    Parameters:
+        codes (np.ndarray): Code of each tree, indexing ``labels``.
+        labels (np.ndarray): Key value of each code.
+
+    Returns:
+        tuple: Compacted code of each tree and the key value of each code.
+    """
+    present = np.bincount(codes, minlength=len(labels)) > 0
+    renumber = np.cumsum(present) - 1
+    return renumber[codes], labels[present]
+
+
+def encode_groups(groups, n: int) -> tuple:
+    """
+    Dense group IDs of trees from one or more group keys.
+
+    Keys are factorized separately (see :func:`_factorize`) and combined in
+    mixed radix with the first key most significant, so groups are numbered
+    in key order. When the combined codes span at most
+    :data:`DENSE_LIMIT` values (or four per tree) they are compacted with a
+    ``bincount`` over the span, without sorting the trees; otherwise the
+    combined codes are sorted once with ``np.unique``.
+
+    Parameters:
+        groups (array_like, EncodedDivisions, dict or None): Key of each
+            tree, or keys keyed by name, or None for a single group.
+        n (int): Number of trees.
+
+    Returns:
+        tuple: Group ID of each tree (0 to n_groups - 1) and the key of each
+        group, an array or a dict of arrays like ``groups``.
+    """
+    if groups is None:
+        return np.zeros(n, dtype=np.intp), np.zeros(min(n, 1), dtype=np.intp)
+    named = isinstance(groups, dict)
+    keys = groups if named else {None: groups}
+
+    codes, labels = [], []
+    for values in keys.values():
+        if not isinstance(values, EncodedDivisions):
+            values = np.broadcast_to(values, (n,))
+        elif len(values) != n:
+            raise ValueError("Group keys must have one value per tree")
+        key_codes, key_labels = _factorize(values)
+        codes.append(key_codes)
+        labels.append(key_labels)
+
+    span = 1
+    for key_labels in labels:
+        span *= max(len(key_labels), 1)
+    if span < 1 << 62:
+        combined = np.zeros(n, dtype=np.int64)
+        for key_codes, key_labels in zip(codes, labels):
+            combined = combined * len(key_labels) + key_codes
+        if span <= max(DENSE_LIMIT, 4 * n):
+            ids, group_codes = _compact(combined, np.arange(span))
+        else:
+            group_codes, ids = np.unique(combined, return_inverse=True)
+        per_key = []
+        for key_labels in reversed(labels):
+            group_codes, key_codes = np.divmod(group_codes, len(key_labels))
+            per_key.append(key_codes)
+        per_key.reverse()
+    else:
+        unique, ids = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+        per_key = list(unique.T)
+
+    group_keys = {
+        name: key_labels[key_codes]
+        for name, key_labels, key_codes in zip(keys, labels, per_key)
+    }
+    return ids.ravel().astype(np.intp), group_keys if named else group_keys[None]
+
+
+def aggregate_trees(
+    spcd,
+    dia,
+    ht,
+    division="",
+    groups=None,
+    expansion=1.0,
+    components=None,
+    errors="raise",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dtype=np.float64,
+    **inputs,
+) -> GroupTotals:
+    """
+    Estimate trees and reduce them to expanded per-group totals in a single
+    pass, e.g. per plot, condition, species or division.
+
+    Trees are estimated ``chunk_size`` at a time with
+    :func:`nsvb.batch.estimate_trees`, and each chunk is multiplied by its
+    expansion factors and accumulated into the group totals with
+    ``bincount``, so per-tree results are never held for more than one
+    chunk. Totals of groups with a tree that cannot be estimated are NaN.
+    Totals are accumulated in float64 whatever the dtype of the estimates.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        groups (array_like, EncodedDivisions or dict, optional): Group key of
+            each tree, e.g. plot CN, or several keys keyed by name, e.g.
+            ``{"PLT_CN": plt_cn, "SPCD": spcd}``. Default is a single group.
+        expansion (array_like, optional): Expansion factor of each tree, e.g.
+            TPA_UNADJ. Default is 1.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to total. Default is all of
+            them.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+        chunk_size (int, optional): Number of trees estimated at once.
+            Default is 262,144.
+        dtype (np.dtype, optional): np.float64 or np.float32, the dtype of
+            the per-tree estimates as for :func:`nsvb.batch.estimate_trees`.
+            Default is np.float64.
+        **inputs: Other :func:`nsvb.batch.estimate_trees` inputs, e.g.
+            ``cull`` or ``decaycd``, as scalars or per-tree arrays.
+
+    Returns:
+        GroupTotals: Group keys, component totals and tree counts.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown components: {', '.join(sorted(unknown))}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    spcd, dia, ht, division, _ = _as_arrays(
+        spcd, dia, ht, division, expansion, dtype=dtype
+    )
+    # Expansion factors stay float64 whatever the dtype of the estimates.
+    expansion = np.broadcast_to(np.asarray(expansion, dtype=np.float64), spcd.shape)
+    n = len(spcd)
+    ids, keys = encode_groups(groups, n)
+    n_trees = np.bincount(ids)
+    n_groups = len(n_trees)
+    # Per-tree inputs are sliced by chunk; scalars are passed as they are.
+    per_tree = {}
+    for name, value in inputs.items():
+        if isinstance(value, EncodedDivisions):
+            per_tree[name] = value
+        elif np.ndim(value):
+            per_tree[name] = np.broadcast_to(value, (n,))
+
+    totals = {name: np.zeros(n_groups) for name in components}
+    for start in range(0, n, chunk_size):
+        chunk = slice(start, min(start + chunk_size, n))
+        results = estimate_trees(
+            spcd[chunk],
+            dia[chunk],
+            ht[chunk],
+            division[chunk],
+            components=components,
+            errors=errors,
+            dtype=dtype,
+            **{**inputs, **{name: value[chunk] for name, value in per_tree.items()}},
+        )
+        for name in components:
+            totals[name] += np.bincount(
+                ids[chunk],
+                weights=results[name] * expansion[chunk],
+                minlength=n_groups,
+            )
+    return GroupTotals(keys, totals, n_trees)
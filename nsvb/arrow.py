@@ -0,0 +1,224 @@
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as e:
+    raise ImportError(
+        "nsvb.arrow requires pyarrow; install it with `pip install nsvb[arrow]`"
+    ) from e
+
+from nsvb.batch import (
+    CODE_INPUTS,
+    INPUT_COLUMNS,
+    OPTIONAL_INPUTS,
+    EncodedDivisions,
+    estimate_trees,
+)
+from nsvb.estimators import COMPONENTS
+
+
+def _numeric(array, fill) -> np.ndarray:
+    """
+    View a numeric Arrow array as a NumPy array.
+
+    Arrays without nulls are returned as zero-copy views of the Arrow
+    buffer; nulls are replaced by ``fill`` first, which copies. Integer
+    arrays are cast to float64 before a NaN fill.
+
+    Parameters:
+        array (pa.Array): Numeric column.
+        fill (int or float): Value for nulls.
+
+    Returns:
+        np.ndarray: Column values.
+    """
+    if array.null_count:
+        if np.isnan(fill) and not pa.types.is_floating(array.type):
+            array = array.cast(pa.float64())
+        array = array.fill_null(pa.scalar(fill, type=array.type))
+    return array.to_numpy(zero_copy_only=True)
+
+
+def _divisions(array) -> EncodedDivisions:
+    """
+    View a division column as dictionary-encoded division codes.
+
+    Dictionary arrays are used as stored; other arrays are dictionary
+    encoded by Arrow. Only the dictionary is converted to Python strings.
+
+    Parameters:
+        array (pa.Array): Division column.
+
+    Returns:
+        EncodedDivisions: Division codes.
+    """
+    if not pa.types.is_dictionary(array.type):
+        array = array.dictionary_encode()
+    indices = _numeric(array.indices, -1)
+    categories = array.dictionary.cast(pa.string()).fill_null("")
+    return EncodedDivisions(indices, categories.to_numpy(zero_copy_only=False))
+
+
+def _inputs(batch, columns) -> dict:
+    """
+    Collect the estimate_trees inputs of a record batch.
+
+    Parameters:
+        batch (pa.RecordBatch): Trees.
+        columns (dict): Input column names keyed by estimate_trees argument.
+
+    Returns:
+        dict: estimate_trees keyword arguments.
+
+    Raises:
+        ValueError: If a required column is missing.
+    """
+    inputs = dict(OPTIONAL_INPUTS)
+    for name, column in columns.items():
+        if column not in batch.schema.names:
+            if name in OPTIONAL_INPUTS:
+                continue
+            raise ValueError(f"Table has no {column!r} column")
+        array = batch.column(column)
+        if name in CODE_INPUTS:
+            inputs[name] = _divisions(array)
+        elif name == "spcd":
+            inputs[name] = _numeric(array, -1)
+        elif name in ("cull", "decaycd"):
+            inputs[name] = _numeric(array, 0)
+        else:
+            inputs[name] = _numeric(array, np.nan)
+    return inputs
+
+
+def estimate_batch(
+    batch, components=None, columns=None, errors="raise"
+) -> "pa.RecordBatch":
+    """
+    Run :func:`nsvb.batch.estimate_trees` on an Arrow record batch and
+    append one float64 column per component.
+
+    Numeric input columns without nulls are read as zero-copy NumPy views
+    and the division column is resolved per dictionary entry, not per tree.
+    Trees that cannot be estimated get nulls when ``errors`` is "nan".
+
+    Parameters:
+        batch (pa.RecordBatch): Trees.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to append. Default is all of
+            them.
+        columns (dict, optional): Input column names keyed by
+            ``estimate_trees`` argument, overriding
+            :data:`nsvb.batch.INPUT_COLUMNS`.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+
+    Returns:
+        pa.RecordBatch: The batch with the component columns appended.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    columns = {**INPUT_COLUMNS, **(columns or {})}
+    results = estimate_trees(
+        **_inputs(batch, columns), components=components, errors=errors
+    )
+    arrays = batch.columns + [
+        pa.array(results[name], from_pandas=True) for name in components
+    ]
+    names = batch.schema.names + list(components)
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def estimate_table(table, components=None, columns=None, errors="raise") -> "pa.Table":
+    """
+    Run :func:`estimate_batch` over each record batch of an Arrow table.
+
+    Parameters:
+        table (pa.Table): Trees.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to append. Default is all of
+            them.
+        columns (dict, optional): Input column names keyed by
+            ``estimate_trees`` argument, overriding
+            :data:`nsvb.batch.INPUT_COLUMNS`.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+
+    Returns:
+        pa.Table: The table with the component columns appended.
+    """
+    schema = _output_schema(table.schema, components)
+    batches = [
+        estimate_batch(batch, components, columns, errors)
+        for batch in table.to_batches()
+    ]
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def _output_schema(schema, components=None):
+    """
+    Append a float64 field per component to a schema.
+
+    Parameters:
+        schema (pa.Schema): Input schema.
+        components (iterable, optional): Component names. Default is all of
+            them.
+
+    Returns:
+        pa.Schema: Output schema.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    for name in components:
+        schema = schema.append(pa.field(name, pa.float64()))
+    return schema
+
+
+def estimate_parquet(
+    source, dest, components=None, columns=None, errors="raise", **options
+) -> int:
+    """
+    Estimate the trees of a Parquet file one row group at a time and write
+    them, with the component columns appended, to another Parquet file.
+
+    Each output row group holds the trees of the matching input row group,
+    so memory use is bounded by the largest row group. The division column
+    is read dictionary encoded, so it is resolved once per distinct
+    division in each row group.
+
+    Parameters:
+        source (str, path or file): Input Parquet file.
+        dest (str, path or file): Output Parquet file.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to append. Default is all of
+            them.
+        columns (dict, optional): Input column names keyed by
+            ``estimate_trees`` argument, overriding
+            :data:`nsvb.batch.INPUT_COLUMNS`.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+        **options: Keyword arguments for ``pyarrow.parquet.ParquetWriter``,
+            e.g. ``compression``.
+
+    Returns:
+        int: Number of trees processed.
+    """
+    columns = {**INPUT_COLUMNS, **(columns or {})}
+    parquet_file = pq.ParquetFile(source)
+    codes = [
+        columns[name]
+        for name in CODE_INPUTS
+        if columns[name] in parquet_file.schema_arrow.names
+    ]
+    if codes:
+        # Read the division and province column chunks as stored, dictionary
+        # encoded.
+        parquet_file = pq.ParquetFile(source, read_dictionary=codes)
+    schema = _output_schema(parquet_file.schema_arrow, components)
+    total = 0
+    with pq.ParquetWriter(dest, schema, **options) as writer:
+        for i in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(i)
+            table = estimate_table(table, components, columns, errors)
+            writer.write_table(table, row_group_size=max(table.num_rows, 1))
+            total += table.num_rows
+    return total
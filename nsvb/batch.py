@@ -0,0 +1,878 @@
+from contextlib import nullcontext
+from inspect import signature
+
+import numpy as np
+
+from nsvb.estimators import COMPONENTS, WEIGHT_CUBIC_FOOT_WATER
+from nsvb.models import ARRAY_MODEL_MAP, cumulative_volume_ratio_array
+from nsvb.tables import (
+    COEFFICIENT_COLUMNS,
+    compiled_carbon_fractions,
+    compiled_crown_ratios,
+    compiled_species,
+    compiled_table,
+    compiled_wood_density_proportions,
+)
+
+# Instrumentation of estimate_trees, set by nsvb.instrument.
+_instrumentation = None
+
+# Compiled replacement of _evaluate, set by nsvb.jit.set_backend.
+_kernel = None
+
+# FIA column names of the estimate_trees inputs, keyed by argument name.
+INPUT_COLUMNS = {
+    "spcd": "SPCD",
+    "dia": "DIA",
+    "ht": "HT",
+    "division": "DIVISION",
+    "cull": "CULL",
+    "decaycd": "DECAYCD",
+    "actual_ht": "ACTUALHT",
+    "cr": "CR",
+    "province": "PROVINCE",
+}
+
+# Inputs that may be absent from a table of trees, with their default value.
+OPTIONAL_INPUTS = {
+    "division": "",
+    "cull": 0.0,
+    "decaycd": 0,
+    "actual_ht": np.nan,
+    "cr": np.nan,
+    "province": None,
+}
+
+# Floating point dtypes of batch inputs, coefficients and results: float64
+# by default, or float32 to halve the memory of large runs.
+FLOAT_DTYPES = (np.dtype(np.float64), np.dtype(np.float32))
+
+# Inputs given as codes rather than numbers.
+CODE_INPUTS = ("division", "province")
+
+
+class EncodedDivisions:
+    """
+    Dictionary-encoded division codes, as stored by Arrow dictionary arrays
+    and pandas categoricals.
+
+    The batch estimators resolve each category once per coefficient table
+    and gather the result by index, so the per-tree division strings are
+    never materialized.
+
+    Attributes:
+        indices (np.ndarray): Integer index of each tree's division into
+            ``categories``; -1 for a missing division.
+        categories (np.ndarray): Distinct division codes.
+    """
+
+    __slots__ = ("indices", "categories")
+
+    def __init__(self, indices, categories):
+        self.indices = np.asarray(indices)
+        self.categories = np.asarray(categories).astype(str)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, index):
+        return EncodedDivisions(self.indices[index], self.categories)
+
+    def codes(self, table) -> np.ndarray:
+        """
+        Encode the divisions for a compiled table.
+
+        Parameters:
+            table (CompiledTable): Compiled coefficient table.
+
+        Returns:
+            np.ndarray: Division code of each tree.
+        """
+        # Index -1 (a missing division) picks the trailing 0, which is the
+        # code of the empty division.
+        codes = np.append(table.division_codes(self.categories), 0)
+        return codes[self.indices]
+
+
+def _float_dtype(dtype) -> np.dtype:
+    """
+    Validate the floating point dtype of a batch run.
+
+    Parameters:
+        dtype (np.dtype): One of :data:`FLOAT_DTYPES`.
+
+    Returns:
+        np.dtype: The dtype.
+
+    Raises:
+        ValueError: If the dtype is not float64 or float32.
+    """
+    dtype = np.dtype(dtype)
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError(f"dtype must be float64 or float32, not {dtype}")
+    return dtype
+
+
+def _as_arrays(spcd, dia, ht, division="", *extra, dtype=np.float64):
+    """
+    Broadcast the tree inputs to one-dimensional arrays of equal length.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        *extra (array_like): Additional per-tree inputs, e.g. cull.
+        dtype (np.dtype, optional): Floating point dtype of dia, ht and the
+            extra inputs. Default is np.float64.
+
+    Returns:
+        tuple: spcd (int64), dia, ht, division (str, or EncodedDivisions) and
+        any extra inputs (of ``dtype``) as arrays of the same length. Inputs
+        that are already one-dimensional arrays of the right type are
+        returned without copying.
+    """
+    encoded = isinstance(division, EncodedDivisions)
+    spcd = np.asarray(spcd, dtype=np.int64)
+    dia = np.asarray(dia, dtype=dtype)
+    ht = np.asarray(ht, dtype=dtype)
+    if encoded:
+        categories, division = division.categories, division.indices
+    else:
+        division = np.asarray(division).astype(str, copy=False)
+    extra = [np.asarray(value, dtype=dtype) for value in extra]
+    arrays = np.broadcast_arrays(spcd, dia, ht, division, *extra)
+    arrays = [np.ravel(array) for array in arrays]
+    if encoded:
+        arrays[3] = EncodedDivisions(arrays[3], categories)
+    return tuple(arrays)
+
+
+# Coefficient columns each array kernel takes, in signature order.
+_KERNEL_COLUMNS = {
+    model: tuple(
+        name for name in signature(kernel).parameters if name in COEFFICIENT_COLUMNS
+    )
+    for model, kernel in ARRAY_MODEL_MAP.items()
+}
+
+
+def _evaluate(table, rows, dia, ht):
+    """
+    Evaluate a compiled table for trees with resolved coefficient rows.
+
+    Each model form present is evaluated with a single array kernel call over
+    all of its trees, with the coefficients gathered by row. Results have
+    the dtype of ``dia``, which should match the table's coefficients.
+
+    Parameters:
+        table (CompiledTable): Compiled coefficient table.
+        rows (np.ndarray): Coefficient row of each tree.
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+
+    Returns:
+        np.ndarray: Model form results.
+    """
+    if _kernel is not None:
+        return _kernel(table, rows, dia, ht)
+    models = table.model[rows]
+    present = np.flatnonzero(np.bincount(models, minlength=len(ARRAY_MODEL_MAP) + 1))
+    if len(present) == 1:
+        model = int(present[0])
+        return ARRAY_MODEL_MAP[model](
+            dia,
+            ht,
+            **{name: table.columns[name][rows] for name in _KERNEL_COLUMNS[model]},
+        )
+
+    out = np.empty(dia.shape, dtype=dia.dtype)
+    for model in present.tolist():
+        index = np.flatnonzero(models == model)
+        tree_rows = rows[index]
+        out[index] = ARRAY_MODEL_MAP[model](
+            dia[index],
+            ht[index],
+            **{name: table.columns[name][tree_rows] for name in _KERNEL_COLUMNS[model]},
+        )
+    return out
+
+
+def _stage(name):
+    """
+    Timer of a stage of :func:`estimate_trees` when instrumentation is
+    enabled (see :mod:`nsvb.instrument`), otherwise a no-op.
+
+    Parameters:
+        name (str): Stage name.
+
+    Returns:
+        context manager: Timer of the stage.
+    """
+    if _instrumentation is None:
+        return nullcontext()
+    return _instrumentation.timer(f"estimate_trees.{name}")
+
+
+def _table_rows(table, slots, division, strict=True):
+    """
+    Resolve the coefficient row of each tree in a compiled table.
+
+    Parameters:
+        table (CompiledTable): Compiled coefficient table.
+        slots (np.ndarray): Species slots from the compiled species index.
+        division (np.ndarray or EncodedDivisions): Division codes.
+        strict (bool, optional): Raise for trees that cannot be resolved. If
+            False, their row is -1 instead. Default is True.
+
+    Returns:
+        np.ndarray: Coefficient row of each tree.
+    """
+    if isinstance(division, EncodedDivisions):
+        division_codes = division.codes(table)
+    else:
+        division_codes = table.division_codes(division)
+    return table.rows(slots, division_codes, strict)
+
+
+def _run_model_form(table_name, slots, dia, ht, division, strict=True):
+    """
+    Run the model form for the given table over arrays of trees.
+
+    Parameters:
+        table_name (str): Table name.
+        slots (np.ndarray): Species slots from the compiled species index.
+        dia (np.ndarray): Diameters of the trees; float32 diameters and
+            heights are evaluated with float32 coefficients.
+        ht (np.ndarray): Heights of the trees.
+        division (np.ndarray or EncodedDivisions): Division codes.
+        strict (bool, optional): Raise for trees that cannot be resolved. If
+            False, their result is NaN instead. Default is True.
+
+    Returns:
+        np.ndarray: Model form results, of the dtype of ``dia``.
+    """
+    table = compiled_table(table_name).astype(dia.dtype)
+    rows = _table_rows(table, slots, division, strict)
+    if _instrumentation is not None:
+        _instrumentation.count_rows(table, slots, rows)
+    if strict or rows.size == 0 or rows.min() >= 0:
+        return _evaluate(table, rows, dia, ht)
+
+    out = np.full(dia.shape, np.nan, dtype=dia.dtype)
+    valid = rows >= 0
+    out[valid] = _evaluate(table, rows[valid], dia[valid], ht[valid])
+    return out
+
+
+def ratio_coefficients(table_name, slots, division, strict=True) -> tuple:
+    """
+    Gather the cumulative volume ratio coefficients of each tree.
+
+    Parameters:
+        table_name (str): "s4" (outside bark) or "s5" (inside bark).
+        slots (np.ndarray): Species slots from the compiled species index.
+        division (np.ndarray or EncodedDivisions): Division codes.
+        strict (bool, optional): Raise for trees that cannot be resolved. If
+            False, their coefficients are NaN instead. Default is True.
+
+    Returns:
+        tuple: alpha and beta of each tree.
+    """
+    table = compiled_table(table_name)
+    rows = _table_rows(table, slots, division, strict)
+    alpha = table.columns["alpha"][rows]
+    beta = table.columns["beta"][rows]
+    if not strict:
+        alpha[rows < 0] = np.nan
+        beta[rows < 0] = np.nan
+    return alpha, beta
+
+
+def _decay_codes(decaycd) -> np.ndarray:
+    """
+    Validate decay codes.
+
+    Parameters:
+        decaycd (array_like): Decay codes (1-5) of dead trees, or 0 (or NaN)
+            for live trees.
+
+    Returns:
+        np.ndarray: Decay codes (int64), 0 for live trees.
+
+    Raises:
+        ValueError: If a decay code is not 0-5.
+    """
+    decaycd = np.nan_to_num(np.asarray(decaycd, dtype=np.float64)).astype(np.int64)
+    if decaycd.size and (decaycd.min() < 0 or decaycd.max() > 5):
+        raise ValueError("decaycd must be between 0 and 5")
+    return decaycd
+
+
+def _decay_proportions(slots, decaycd) -> np.ndarray:
+    """
+    Gather the Table 1 proportions of each tree.
+
+    Parameters:
+        slots (np.ndarray): Species slots from the compiled species index.
+        decaycd (np.ndarray): Decay codes from :func:`_decay_codes`.
+
+    Returns:
+        np.ndarray: Array of shape (n, 3) of the wood density, bark and
+        branch proportions of each tree, all 1 for live trees.
+    """
+    hardwood = compiled_species().hardwood[slots].astype(np.intp)
+    return compiled_wood_density_proportions()[hardwood, decaycd]
+
+
+def _crown_ratios(province, hardwood) -> np.ndarray:
+    """
+    Gather the Table S11 mean crown ratio of each tree.
+
+    Parameters:
+        province (np.ndarray or EncodedDivisions): Province codes.
+        hardwood (np.ndarray): True for hardwood species.
+
+    Returns:
+        np.ndarray: Mean crown ratios as proportions.
+    """
+    table = compiled_crown_ratios()
+    if isinstance(province, EncodedDivisions):
+        codes = table.province_codes(province.categories)
+        codes = np.append(codes, table.undefined)[province.indices]
+    else:
+        codes = table.province_codes(province)
+    return table.ratios[codes, hardwood.astype(np.intp)]
+
+
+def _broken_top_remaining(
+    slots, ht, actual_ht, cr, division, province, strict=True
+) -> tuple:
+    """
+    Proportions of the stem and of the crown remaining on broken-top trees.
+
+    The stem proportion is the inside-bark cumulative volume ratio (Table
+    S5) at the actual height. The crown is taken to span the top ``CRH``
+    of the total height, where ``CRH`` is the observed crown ratio
+    standardized from the actual to the total height or, without one, the
+    Table S11 mean crown ratio of the province and softwood/hardwood class.
+
+    Parameters:
+        slots (np.ndarray): Species slots from the compiled species index.
+        ht (np.ndarray): Heights of the trees in feet (ft).
+        actual_ht (np.ndarray): Actual heights in feet (ft); trees whose
+            actual height is missing, not positive or not below the height
+            have intact tops.
+        cr (np.ndarray): Observed crown ratios in percent of the actual
+            height, or NaN.
+        division (np.ndarray or EncodedDivisions): Division codes.
+        province (np.ndarray or EncodedDivisions): Province codes.
+        strict (bool, optional): Raise for trees that cannot be resolved. If
+            False, their proportions are NaN instead. Default is True.
+
+    Returns:
+        tuple: Stem and crown proportions of each tree, exactly 1 for intact
+        trees.
+    """
+    broken = (actual_ht > 0) & (actual_ht < ht)
+    if not broken.any():
+        return np.ones(ht.shape), np.ones(ht.shape)
+
+    alpha, beta = ratio_coefficients("s5", slots, division, strict)
+    stem = cumulative_volume_ratio_array(actual_ht, ht, alpha, beta)
+
+    observed = cr / 100
+    with np.errstate(invalid="ignore"):
+        expected = _crown_ratios(province, compiled_species().hardwood[slots])
+        crh = np.where(observed > 0, (ht - actual_ht * (1 - observed)) / ht, expected)
+        crown = np.clip((actual_ht - ht * (1 - crh)) / (ht * crh), 0.0, 1.0)
+    return np.where(broken, stem, 1.0), np.where(broken, crown, 1.0)
+
+
+def _stem_wood_weight(slots, v_tot_ib, cull, strict=True, decaycd=0):
+    """
+    Convert total stem inside-bark wood volume to dry weight, reduced for
+    cull and the density of dead trees.
+
+    Parameters:
+        slots (np.ndarray): Species slots from the compiled species index.
+        v_tot_ib (np.ndarray): Total inside bark wood volume of each tree.
+        cull (np.ndarray): Rotten and missing cull in percent.
+        strict (bool, optional): Raise for species without a wood specific
+            gravity. If False, their result is NaN instead. Default is True.
+        decaycd (np.ndarray, optional): Decay codes from
+            :func:`_decay_codes`. Default is 0 (live trees).
+
+    Returns:
+        np.ndarray: Total stem wood dry weight of each tree in pounds (lb).
+    """
+    species = compiled_species()
+    wdsg = np.where(slots >= 0, species.wdsg[slots], np.nan)
+    if strict and np.isnan(wdsg).any():
+        spcd = species.spcd[slots[np.isnan(wdsg)][0]]
+        raise ValueError(f"No wood specific gravity for SPCD {spcd}")
+
+    # Cull wood keeps the density of DECAYCD = 3 (0.54 for hardwoods and
+    # 0.92 for softwoods); with no cull the factor is exactly one.
+    hardwood = species.hardwood[slots].astype(np.intp)
+    dens_prop = compiled_wood_density_proportions()[hardwood, 3, 0]
+    factor = np.where(cull > 0, 1 - cull / 100 * (1 - dens_prop), 1.0)
+
+    # Dead trees take the density of their decay class instead, which is
+    # considered to already account for their cull.
+    decaycd = np.broadcast_to(decaycd, slots.shape)
+    dead = decaycd > 0
+    if dead.any():
+        factor = np.where(dead, _decay_proportions(slots, decaycd)[:, 0], factor)
+    dtype = v_tot_ib.dtype
+    return (
+        v_tot_ib
+        * factor.astype(dtype, copy=False)
+        * wdsg.astype(dtype, copy=False)
+        * WEIGHT_CUBIC_FOOT_WATER
+    )
+
+
+def total_inside_bark_wood_volume(spcd, dia, ht, division="") -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_inside_bark_wood_volume`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+
+    Returns:
+        np.ndarray: Total inside bark wood volume of each tree.
+    """
+    spcd, dia, ht, division = _as_arrays(spcd, dia, ht, division)
+    slots = compiled_species().slots(spcd)
+    return _run_model_form("s1", slots, dia, ht, division)
+
+
+def total_bark_wood_volume(spcd, dia, ht, division="") -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_bark_wood_volume`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+
+    Returns:
+        np.ndarray: Total bark wood volume of each tree.
+    """
+    spcd, dia, ht, division = _as_arrays(spcd, dia, ht, division)
+    slots = compiled_species().slots(spcd)
+    return _run_model_form("s2", slots, dia, ht, division)
+
+
+def total_outside_bark_volume(spcd, dia, ht, division="") -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_outside_bark_volume`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+
+    Returns:
+        np.ndarray: Total outside bark volume of each tree.
+    """
+    spcd, dia, ht, division = _as_arrays(spcd, dia, ht, division)
+    slots = compiled_species().slots(spcd)
+    v_tot_ib = _run_model_form("s1", slots, dia, ht, division)
+    v_tot_bk = _run_model_form("s2", slots, dia, ht, division)
+    return v_tot_ib + v_tot_bk
+
+
+def total_stem_wood_dry_weight(
+    spcd, dia, ht, division="", cull=0, decaycd=0
+) -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_stem_wood_dry_weight`.
+
+    Dead trees take the wood density proportion (DensProp) of their decay
+    code in place of the cull reduction, as in :func:`estimate_trees`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+        cull (array_like, optional): Rotten and missing cull in percent.
+            Default is 0.
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 (or NaN) for live trees. Default is 0.
+
+    Returns:
+        np.ndarray: Total stem wood dry weight of each tree in pounds (lb).
+
+    Raises:
+        ValueError: If a decay code is not 0-5.
+    """
+    spcd, dia, ht, division, cull, decaycd = _as_arrays(
+        spcd, dia, ht, division, cull, decaycd
+    )
+    decaycd = _decay_codes(decaycd)
+    slots = compiled_species().slots(spcd)
+    v_tot_ib = _run_model_form("s1", slots, dia, ht, division)
+    return _stem_wood_weight(slots, v_tot_ib, cull, decaycd=decaycd)
+
+
+def total_stem_bark_weight(spcd, dia, ht, division="", decaycd=0) -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_stem_bark_weight`.
+
+    Dead trees are reduced by the wood density proportion (DensProp) times
+    the bark proportion (BarkProp) of their decay code, as in
+    :func:`estimate_trees`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 (or NaN) for live trees. Default is 0.
+
+    Returns:
+        np.ndarray: Total stem bark weight of each tree in pounds (lb).
+
+    Raises:
+        ValueError: If a decay code is not 0-5.
+    """
+    spcd, dia, ht, division, decaycd = _as_arrays(spcd, dia, ht, division, decaycd)
+    decaycd = _decay_codes(decaycd)
+    slots = compiled_species().slots(spcd)
+    w_tot_bk = _run_model_form("s6", slots, dia, ht, division)
+    dens_prop, bark_prop, _ = _decay_proportions(slots, decaycd).T
+    return w_tot_bk * dens_prop * bark_prop
+
+
+def total_branch_weight(spcd, dia, ht, division="", decaycd=0) -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_branch_weight`.
+
+    Dead trees are reduced by the wood density proportion (DensProp) times
+    the branch proportion (BranchProp) of their decay code, as in
+    :func:`estimate_trees`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 (or NaN) for live trees. Default is 0.
+
+    Returns:
+        np.ndarray: Total branch weight of each tree in pounds (lb).
+
+    Raises:
+        ValueError: If a decay code is not 0-5.
+    """
+    spcd, dia, ht, division, decaycd = _as_arrays(spcd, dia, ht, division, decaycd)
+    decaycd = _decay_codes(decaycd)
+    slots = compiled_species().slots(spcd)
+    w_branch = _run_model_form("s7", slots, dia, ht, division)
+    dens_prop, _, branch_prop = _decay_proportions(slots, decaycd).T
+    return w_branch * dens_prop * branch_prop
+
+
+def total_aboveground_biomass(spcd, dia, ht, division="", decaycd=0) -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_aboveground_biomass`.
+
+    Dead trees are reduced by the overall proportion of their stem wood,
+    bark and branch reductions, as in :func:`estimate_trees`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 (or NaN) for live trees. Default is 0.
+
+    Returns:
+        np.ndarray: Total aboveground biomass of each tree in pounds (lb).
+
+    Raises:
+        ValueError: If a decay code is not 0-5.
+    """
+    decaycd = _decay_codes(decaycd)
+    if (decaycd > 0).any():
+        results = estimate_trees(
+            spcd, dia, ht, division, components=["agb"], decaycd=decaycd
+        )
+        return results["agb"]
+    spcd, dia, ht, division = _as_arrays(spcd, dia, ht, division)
+    slots = compiled_species().slots(spcd)
+    return _run_model_form("s8", slots, dia, ht, division)
+
+
+def total_foliage_dry_weight(spcd, dia, ht, division="", decaycd=0) -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.total_foliage_dry_weight`.
+
+    Dead trees have no foliage, as in :func:`estimate_trees`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like, optional): Division codes. Default is an empty
+            string.
+
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 (or NaN) for live trees. Default is 0.
+
+    Returns:
+        np.ndarray: Total foliage dry weight of each tree in pounds (lb).
+
+    Raises:
+        ValueError: If a decay code is not 0-5.
+    """
+    spcd, dia, ht, division, decaycd = _as_arrays(spcd, dia, ht, division, decaycd)
+    decaycd = _decay_codes(decaycd)
+    slots = compiled_species().slots(spcd)
+    w_foliage = _run_model_form("s9", slots, dia, ht, division)
+    return np.where(decaycd > 0, 0.0, w_foliage)
+
+
+def carbon_fraction(spcd, decaycd=0) -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.carbon_fraction`.
+
+    Fractions are gathered from the dense SPCD by DECAYCD array compiled from
+    Tables S10a and S10b.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or 0
+            (or NaN) for live trees. Default is 0.
+
+    Returns:
+        np.ndarray: Carbon fractions, NaN for species without a live
+        fraction.
+
+    Raises:
+        KeyError: If a species code is not in REF_SPECIES.
+        ValueError: If a decay code is not 0-5.
+    """
+    fractions = compiled_carbon_fractions()
+    spcd = np.asarray(spcd, dtype=np.int64)
+    decaycd = _decay_codes(decaycd)
+    if spcd.size and (spcd.min() < 0 or spcd.max() >= len(fractions)):
+        raise KeyError(int(spcd[(spcd < 0) | (spcd >= len(fractions))][0]))
+    return fractions[spcd, decaycd]
+
+
+def to_carbon(spcd, biomass, decaycd=0) -> np.ndarray:
+    """
+    Vectorized :func:`nsvb.estimators.to_carbon`.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        biomass (array_like): Dry weights in pounds (lb).
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or 0
+            (or NaN) for live trees. Default is 0.
+
+    Returns:
+        np.ndarray: Carbon in pounds (lb).
+    """
+    return np.asarray(biomass, dtype=np.float64) * carbon_fraction(spcd, decaycd)
+
+
+def estimate_trees(
+    spcd,
+    dia,
+    ht,
+    division="",
+    cull=0,
+    components=None,
+    errors="raise",
+    decaycd=0,
+    actual_ht=np.nan,
+    cr=np.nan,
+    province=None,
+    dtype=np.float64,
+) -> dict:
+    """
+    Run every tree-level step for arrays of trees in a single pass.
+
+    Vectorized :func:`nsvb.estimators.estimate_tree`. Species are resolved
+    once for all components, each coefficient table is gathered once, and
+    each intermediate, such as the inside-bark wood volume used by the stem
+    wood weight, is computed once.
+
+    Dead trees are reduced in the same pass with the Table 1 proportions of
+    their softwood/hardwood class and decay code: stem wood by the wood
+    density proportion (DensProp), which replaces the cull reduction; stem
+    bark by DensProp times the bark proportion (BarkProp); and branches by
+    DensProp times the branch proportion (BranchProp). Dead trees have no
+    foliage.
+
+    Trees with a broken top (an actual height below the height) keep the
+    gross volumes of the full stem, but their stem wood and bark weights are
+    reduced to the stem remaining, and their branch and foliage weights to
+    the crown remaining (see :func:`_broken_top_remaining`).
+
+    The aboveground biomass of dead and broken-top trees is reduced by the
+    overall proportion of the stem wood, bark and branch reductions. Cull
+    alone does not reduce it: the stem wood weight of live trees is compared
+    on the same cull basis, so an intact tree gives the same AGB with or
+    without an actual height.
+
+    With ``dtype=np.float32`` the inputs, the gathered coefficients and the
+    results are float32, which halves the memory of large runs; the sums of
+    the overall reduction are still accumulated in float64. Against the
+    worked examples of the GTR, float32 results differ from float64 by at
+    most about 1e-6 relative, well within the precision the GTR reports
+    (see ``FLOAT32_RTOL`` in ``tests/test_examples.py``).
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        cull (array_like, optional): Rotten and missing cull in percent.
+            Default is 0.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to return. Default is all of
+            them; only the steps they depend on are computed.
+        errors (str, optional): "raise" to raise for trees whose species or
+            coefficients cannot be resolved, or "nan" to return NaN for
+            them. Default is "raise".
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 (or NaN) for live trees. Default is 0.
+        actual_ht (array_like, optional): Actual heights of broken-top trees
+            in feet (ft); NaN for intact trees. Default is NaN.
+        cr (array_like, optional): Observed crown ratios of broken-top trees
+            in percent of the actual height; NaN to use the Table S11 mean
+            crown ratio. Default is NaN.
+        province (array_like or EncodedDivisions, optional): Ecological
+            province (or division) codes for Table S11. Default is the
+            division codes; codes not in the table use its UNDEFINED row.
+        dtype (np.dtype, optional): np.float64 or np.float32. Default is
+            np.float64.
+
+    Returns:
+        dict: Component arrays of ``dtype`` keyed by component name.
+
+    Raises:
+        ValueError: If a decay code is not 0-5, or the dtype is not float64
+            or float32.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown components: {', '.join(sorted(unknown))}")
+    if errors not in ("raise", "nan"):
+        raise ValueError(f"errors must be 'raise' or 'nan', not {errors!r}")
+    strict = errors == "raise"
+    dtype = _float_dtype(dtype)
+
+    spcd, dia, ht, division, cull, decaycd, actual_ht, cr = _as_arrays(
+        spcd, dia, ht, division, cull, decaycd, actual_ht, cr, dtype=dtype
+    )
+    if province is None:
+        province = division
+    elif not isinstance(province, EncodedDivisions):
+        province = np.broadcast_to(np.asarray(province).astype(str), spcd.shape)
+    decaycd = _decay_codes(decaycd)
+    with _stage("species"):
+        slots = compiled_species().slots(spcd, strict)
+    wanted = set(components)
+    dead = decaycd > 0
+    reduced = dead | ((actual_ht > 0) & (actual_ht < ht))
+    any_reduced = bool(reduced.any())
+    if any_reduced and "agb" in wanted:
+        # The overall reduction needs every woody component.
+        wanted |= {"w_tot_ib", "w_tot_bk", "w_branch"}
+    results = {}
+
+    def run(table_name):
+        with _stage(table_name):
+            return _run_model_form(table_name, slots, dia, ht, division, strict)
+
+    if wanted & {"v_tot_ib", "v_tot_ob", "w_tot_ib"}:
+        results["v_tot_ib"] = run("s1")
+    if wanted & {"v_tot_bk", "v_tot_ob"}:
+        results["v_tot_bk"] = run("s2")
+    if "v_tot_ob" in wanted:
+        results["v_tot_ob"] = results["v_tot_ib"] + results["v_tot_bk"]
+    if "w_tot_ib" in wanted:
+        with _stage("stem_wood_weight"):
+            results["w_tot_ib"] = _stem_wood_weight(
+                slots, results["v_tot_ib"], cull, strict, decaycd
+            )
+    if "w_tot_bk" in wanted:
+        results["w_tot_bk"] = run("s6")
+    if "w_branch" in wanted:
+        results["w_branch"] = run("s7")
+    if "agb" in wanted:
+        results["agb"] = run("s8")
+    if "w_foliage" in wanted:
+        results["w_foliage"] = run("s9")
+
+    if any_reduced:
+        with _stage("reductions"):
+            proportions = _decay_proportions(slots, decaycd).astype(dtype, copy=False)
+            dens_prop, bark_prop, branch_prop = proportions.T
+            stem, crown = (
+                remaining.astype(dtype, copy=False)
+                for remaining in _broken_top_remaining(
+                    slots, ht, actual_ht, cr, division, province, strict
+                )
+            )
+            gross = {}
+            if "agb" in wanted:
+                # On the cull basis of the reduced weight: live trees keep
+                # their cull, so cull alone does not reduce their AGB, and
+                # dead trees, whose density replaces cull, have none.
+                gross["w_tot_ib"] = _stem_wood_weight(
+                    slots, results["v_tot_ib"], np.where(dead, 0, cull), strict
+                )
+                gross["w_tot_bk"] = results["w_tot_bk"]
+                gross["w_branch"] = results["w_branch"]
+            if "w_tot_ib" in wanted:
+                results["w_tot_ib"] = results["w_tot_ib"] * stem
+            if "w_tot_bk" in wanted:
+                results["w_tot_bk"] = results["w_tot_bk"] * stem * dens_prop * bark_prop
+            if "w_branch" in wanted:
+                results["w_branch"] = (
+                    results["w_branch"] * crown * dens_prop * branch_prop
+                )
+            if "agb" in wanted:
+                # Summed in float64 whatever the dtype of the components.
+                reduced_sum = np.zeros(len(spcd))
+                gross_sum = np.zeros(len(spcd))
+                for name in ("w_tot_ib", "w_tot_bk", "w_branch"):
+                    reduced_sum += results[name]
+                    gross_sum += gross[name]
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    reduction = (reduced_sum / gross_sum).astype(dtype, copy=False)
+                results["agb"] = np.where(
+                    reduced, results["agb"] * reduction, results["agb"]
+                )
+            if "w_foliage" in wanted:
+                results["w_foliage"] = np.where(dead, 0.0, results["w_foliage"] * crown)
+
+    return {name: results[name] for name in components}
@@ -0,0 +1,151 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from nsvb import estimators
+
+CacheInfo = namedtuple(
+    "CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"]
+)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache of model form results keyed by table, species,
+    division, diameter and height.
+
+    With ``dia_decimals`` or ``ht_decimals`` set, diameters or heights are
+    rounded to that many decimals before the lookup *and* the evaluation,
+    so a cached result is always the result for the rounded measurement,
+    whichever tree filled the entry. Without them, results are exactly those
+    of the uncached estimators.
+
+    Parameters:
+        maxsize (int, optional): Maximum number of cached results. Default is
+            65,536.
+        dia_decimals (int, optional): Decimals diameters are rounded to.
+            Default is None (no rounding).
+        ht_decimals (int, optional): Decimals heights are rounded to. Default
+            is None (no rounding).
+    """
+
+    def __init__(
+        self, maxsize: int = 65536, dia_decimals: int = None, ht_decimals: int = None
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.dia_decimals = dia_decimals
+        self.ht_decimals = ht_decimals
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, table_name, spcd, division, dia, ht, evaluate) -> float:
+        """
+        Look up a model form result, evaluating and caching it on a miss.
+
+        Errors raised by ``evaluate`` are not cached.
+
+        Parameters:
+            table_name (str): Table name.
+            spcd (int): Species code.
+            division (str): Division code.
+            dia (float): Diameter of the tree.
+            ht (float): Height of the tree.
+            evaluate (callable): Called as ``evaluate(table_name, spcd, dia,
+                ht, division)`` on a miss.
+
+        Returns:
+            float: Model form result.
+        """
+        if self.dia_decimals is not None:
+            dia = round(dia, self.dia_decimals)
+        if self.ht_decimals is not None:
+            ht = round(ht, self.ht_decimals)
+        key = (table_name, spcd, division, dia, ht)
+
+        with self._lock:
+            try:
+                result = self._results[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._results.move_to_end(key)
+                return result
+
+        # Evaluated outside the lock; threads racing on the same key compute
+        # the same value.
+        result = evaluate(table_name, spcd, dia, ht, division)
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+                self._evictions += 1
+        return result
+
+    def info(self) -> CacheInfo:
+        """
+        Cache statistics.
+
+        Returns:
+            CacheInfo: Hits, misses, evictions, maximum and current size.
+        """
+        with self._lock:
+            return CacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self.maxsize,
+                len(self._results),
+            )
+
+    def clear(self):
+        """
+        Remove every cached result and reset the statistics.
+        """
+        with self._lock:
+            self._results.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+def enable_cache(
+    maxsize: int = 65536, dia_decimals: int = None, ht_decimals: int = None
+) -> ResultCache:
+    """
+    Cache the model form results of the scalar estimators in
+    :mod:`nsvb.estimators`, replacing any cache already enabled.
+
+    Parameters:
+        maxsize (int, optional): Maximum number of cached results. Default is
+            65,536.
+        dia_decimals (int, optional): Decimals diameters are rounded to, e.g.
+            1 for 0.1 in. Default is None (no rounding).
+        ht_decimals (int, optional): Decimals heights are rounded to. Default
+            is None (no rounding).
+
+    Returns:
+        ResultCache: The enabled cache.
+    """
+    cache = ResultCache(maxsize, dia_decimals, ht_decimals)
+    estimators._result_cache = cache
+    return cache
+
+
+def disable_cache():
+    """
+    Stop caching model form results and drop the cache.
+    """
+    estimators._result_cache = None
+
+
+def cache_info():
+    """
+    Statistics of the enabled cache.
+
+    Returns:
+        CacheInfo or None: Statistics, or None if no cache is enabled.
+    """
+    cache = estimators._result_cache
+    return None if cache is None else cache.info()
@@ -0,0 +1,285 @@
+import argparse
+import csv
+import io
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+
+from nsvb.batch import CODE_INPUTS, INPUT_COLUMNS, OPTIONAL_INPUTS, estimate_trees
+from nsvb.estimators import COMPONENTS
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _to_float(values, column: str = "", lines=None) -> np.ndarray:
+    """
+    Parse CSV fields as floats, with empty fields as NaN.
+
+    Fields that are not numbers are NaN as well, unless ``lines`` is given.
+
+    Parameters:
+        values (list): String fields.
+        column (str, optional): Column name, for error messages.
+        lines (list, optional): Line number of each field in the input CSV.
+            If given, a field that is not a number raises.
+
+    Returns:
+        np.ndarray: Parsed values.
+
+    Raises:
+        ValueError: If ``lines`` is given and a field is not a number.
+    """
+    values = np.array(values, dtype=object)
+    values[values == ""] = "nan"
+    try:
+        return values.astype(np.float64)
+    except ValueError:
+        pass
+    parsed = np.empty(len(values))
+    for i, value in enumerate(values.tolist()):
+        try:
+            parsed[i] = float(value)
+        except ValueError:
+            if lines is not None:
+                raise ValueError(
+                    f"Line {lines[i]} of the input CSV: {column} value {value!r} "
+                    "is not a number"
+                ) from None
+            parsed[i] = np.nan
+    return parsed
+
+
+def _to_spcd(values, column: str = "", lines=None) -> np.ndarray:
+    """
+    Parse CSV fields as species codes. Empty or non-integral fields become
+    -1, which no species resolves to.
+
+    Parameters:
+        values (list): String fields.
+        column (str, optional): Column name, for error messages.
+        lines (list, optional): Line number of each field in the input CSV.
+            If given, a field that is not a number raises.
+
+    Returns:
+        np.ndarray: Species codes.
+
+    Raises:
+        ValueError: If ``lines`` is given and a field is not a number.
+    """
+    values = _to_float(values, column, lines)
+    valid = np.isfinite(values) & (values == np.round(values))
+    return np.where(valid, values, -1).astype(np.int64)
+
+
+def _format(values) -> np.ndarray:
+    """
+    Format floats for the output CSV, with NaN as an empty field.
+
+    Parameters:
+        values (np.ndarray): Values to format.
+
+    Returns:
+        np.ndarray: String fields.
+    """
+    fields = values.astype(str)
+    fields[np.isnan(values)] = ""
+    return fields
+
+
+def process_csv(
+    source,
+    dest,
+    components=None,
+    columns=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    errors: str = "nan",
+) -> int:
+    """
+    Stream trees from a CSV through :func:`nsvb.batch.estimate_trees` and
+    write them, with one column per component appended, to another CSV.
+
+    Rows are read, evaluated and written ``chunk_size`` at a time, so memory
+    use is bounded by the chunk size rather than the file size.
+
+    With ``errors="nan"``, fields that are missing from short rows or are
+    not numbers are read as NaN (and species codes as unresolvable), so the
+    trees get empty fields rather than stopping the stream. With
+    ``errors="raise"`` they raise an error naming the line. Blank lines are
+    skipped.
+
+    Parameters:
+        source (file): Text stream of the input CSV, with a header row.
+        dest (file): Text stream the output CSV is written to.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to append. Default is all of
+            them.
+        columns (dict, optional): Input column names keyed by
+            ``estimate_trees`` argument, overriding :data:`nsvb.batch.INPUT_COLUMNS`.
+        chunk_size (int, optional): Number of rows per chunk. Default is
+            100,000.
+        errors (str, optional): "nan" to write empty fields for trees that
+            cannot be estimated, or "raise" to stop with an error. Default is
+            "nan".
+
+    Returns:
+        int: Number of trees processed.
+
+    Raises:
+        ValueError: If a required column is missing, an argument is invalid
+            or, with ``errors="raise"``, a row is short or a numeric field is
+            not a number.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    columns = {**INPUT_COLUMNS, **(columns or {})}
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    reader = csv.reader(source)
+    writer = csv.writer(dest, lineterminator="\n")
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise ValueError("Input CSV has no header row") from None
+
+    positions = {}
+    for name, column in columns.items():
+        if column in header:
+            positions[name] = header.index(column)
+        elif name not in OPTIONAL_INPUTS:
+            raise ValueError(f"Input CSV has no {column!r} column")
+    writer.writerow(header + list(components))
+
+    strict = errors == "raise"
+    numbered = ((reader.line_num, row) for row in reader if row)
+    total = 0
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+        lines = [line for line, _ in chunk]
+        rows = [row for _, row in chunk]
+        for i, row in enumerate(rows):
+            if len(row) < len(header):
+                if strict:
+                    raise ValueError(
+                        f"Line {lines[i]} of the input CSV has {len(row)} fields, "
+                        f"expected {len(header)}"
+                    )
+                rows[i] = row + [""] * (len(header) - len(row))
+        fields = {name: [row[i] for row in rows] for name, i in positions.items()}
+        parse_lines = lines if strict else None
+        inputs = {name: default for name, default in OPTIONAL_INPUTS.items()}
+        inputs["spcd"] = _to_spcd(fields.pop("spcd"), columns["spcd"], parse_lines)
+        for name in CODE_INPUTS:
+            if name in fields:
+                inputs[name] = fields.pop(name)
+        inputs.update(
+            {
+                name: _to_float(values, columns[name], parse_lines)
+                for name, values in fields.items()
+            }
+        )
+        if "cull" in positions:
+            inputs["cull"] = np.nan_to_num(inputs["cull"])
+
+        results = estimate_trees(**inputs, components=components, errors=errors)
+        outputs = [_format(results[name]) for name in components]
+        writer.writerows(row + list(values) for row, values in zip(rows, zip(*outputs)))
+        total += len(rows)
+    return total
+
+
+def main(argv=None):
+    """
+    Entry point of the ``nsvb`` command.
+
+    Parameters:
+        argv (list, optional): Command-line arguments. Default is
+            ``sys.argv[1:]``.
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog="nsvb",
+        description="Estimate NSVB volume and biomass for the trees in a CSV.",
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="input CSV, or - for stdin (default)"
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="output CSV, or - for stdout (default)"
+    )
+    parser.add_argument(
+        "-c",
+        "--components",
+        default=",".join(COMPONENTS),
+        help="comma-separated components to append (default: all)",
+    )
+    for name, column in INPUT_COLUMNS.items():
+        parser.add_argument(
+            f"--{name}-column",
+            default=column,
+            help=f"input column for {name.upper()} (default: {column})",
+        )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"rows per chunk (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--errors",
+        choices=("nan", "raise"),
+        default="nan",
+        help="leave unresolvable trees empty or stop with an error (default: nan)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not report throughput"
+    )
+    args = parser.parse_args(argv)
+
+    components = [name.strip() for name in args.components.split(",")]
+    components = [name for name in components if name]
+    columns = {name: getattr(args, f"{name}_column") for name in INPUT_COLUMNS}
+
+    if args.input == "-":
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    else:
+        source = open(args.input, encoding="utf-8-sig", newline="")
+    if args.output == "-":
+        dest = sys.stdout
+    else:
+        dest = open(args.output, "w", encoding="utf-8", newline="")
+
+    start = time.perf_counter()
+    try:
+        total = process_csv(
+            source,
+            dest,
+            components=components,
+            columns=columns,
+            chunk_size=args.chunk_size,
+            errors=args.errors,
+        )
+    except (KeyError, ValueError) as e:
+        parser.exit(1, f"nsvb: error: {e}\n")
+    finally:
+        if args.input == "-":
+            source.detach()
+        else:
+            source.close()
+        if args.output == "-":
+            dest.flush()
+        else:
+            dest.close()
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        rate = total / elapsed if elapsed > 0 else float("inf")
+        print(
+            f"{total} trees in {elapsed:.3f} s ({rate:,.0f} trees/s)", file=sys.stderr
+        )
+    return 0
@@ -1,14 +1,98 @@
+from functools import lru_cache, partial
+from time import perf_counter
+from types import MappingProxyType
+
 from nsvb.models import MODEL_MAP
 from nsvb.tables import REF_SPECIES, TABLES
 
 WEIGHT_CUBIC_FOOT_WATER = 62.4  # lb/ft^3
 
+# Components returned by the full-tree pipeline, in the step order of
+# "Examples of Tree-Level Calculations" in the GTR.
+COMPONENTS = (
+    "v_tot_ib",  # Step 1: total stem inside-bark wood volume (ft^3)
+    "v_tot_bk",  # Step 2: total stem bark volume (ft^3)
+    "v_tot_ob",  # Step 3: total stem outside-bark volume (ft^3)
+    "w_tot_ib",  # Step 7: total stem wood dry weight (lb)
+    "w_tot_bk",  # Step 8: total stem bark weight (lb)
+    "w_branch",  # Step 9: total branch weight (lb)
+    "agb",  # Step 10: total aboveground biomass (lb)
+    "w_foliage",  # Step 15: total foliage dry weight (lb)
+)
+
+# Result cache in front of _run_model_form, set by nsvb.cache.enable_cache.
+_result_cache = None
+
+# Largest number of (table, spcd, division) resolutions memoized by
+# _resolve_coefficients; divisions are caller-supplied strings.
+RESOLVED_MAXSIZE = 4096
+
+# Instrumentation of _run_model_form, set by nsvb.instrument.
+_instrumentation = None
+
+# Estimator timed for the model form evaluations of each table.
+_TABLE_ESTIMATORS = {
+    "s1": "total_inside_bark_wood_volume",
+    "s2": "total_bark_wood_volume",
+    "s6": "total_stem_bark_weight",
+    "s7": "total_branch_weight",
+    "s8": "total_aboveground_biomass",
+    "s9": "total_foliage_dry_weight",
+}
+
+
+def _resolve_coefficients(table_name: str, spcd: int, division: str = "") -> tuple:
+    """
+    Resolve the coefficient row for a species and division.
+
+    The division-specific row of the SPCD table is preferred, then the
+    species-level row, and finally the Jenkins species group table. As in
+    the original lookup, a division-specific row is only used for species
+    that also have a species-level row. Resolved records are read-only and
+    the :data:`RESOLVED_MAXSIZE` most recent (table, species, division)
+    resolutions are memoized, so concurrent callers never share or modify
+    mutable state.
+
+    Parameters:
+        table_name (str): Table name.
+        spcd (int): Species code.
+        division (str, optional): Division code. Default is an empty string.
+
+    Returns:
+        tuple: A hashable key identifying the resolved row and the
+        read-only coefficient record for that row.
+    """
+    return _resolve(table_name, spcd, division)
+
+
+@lru_cache(maxsize=RESOLVED_MAXSIZE)
+def _resolve(table_name: str, spcd: int, division: str) -> tuple:
+    try:
+        table_name_spcd = f"{table_name}a"
+        table_data = TABLES[table_name_spcd]
+        # A missing species-level row falls through to the Jenkins table,
+        # even when the division has a row.
+        species_data = table_data[(spcd, "")]
+        if (spcd, division) in table_data:
+            return (table_name_spcd, (spcd, division)), table_data[(spcd, division)]
+        return (table_name_spcd, (spcd, "")), species_data
+    except KeyError:
+        spgrp = int(REF_SPECIES[spcd]["JENKINS_SPGRPCD"])
+        table_name_spgrp = f"{table_name}b"
+        data = TABLES[table_name_spgrp].get(spgrp)
+        wdsg = float(REF_SPECIES[spcd]["WOOD_SPGR_GREENVOL_DRYWT"])
+        # The Jenkins row is shared by every species in the group, so each
+        # species gets its own record with its wdsg bound.
+        record = MappingProxyType({**data, "wdsg": wdsg})
+        return (table_name_spgrp, spgrp, wdsg), record
+
 
 def _run_model_form(
     table_name: str, spcd: int, dia: float, ht: float, division: str = ""
 ) -> float:
     """
-    Run the model form for the given table.
+    Run the model form for the given table, through the result cache when
+    one is enabled with :func:`nsvb.cache.enable_cache`.
 
     Parameters:
         table_name (str): Table name.
@@ -20,17 +104,35 @@ def _run_model_form(
     Returns:
         float: Model form result.
     """
+    if _instrumentation is not None:
+        return _run_instrumented(table_name, spcd, dia, ht, division)
+    if _result_cache is not None:
+        return _result_cache.get(table_name, spcd, division, dia, ht, _evaluate)
+    return _evaluate(table_name, spcd, dia, ht, division)
+
+
+def _run_instrumented(table_name, spcd, dia, ht, division):
+    instrumentation = _instrumentation
+    key, data = _resolve_coefficients(table_name, spcd, division)
+    if key[0].endswith("b"):
+        level = "jenkins"
+    else:
+        level = "division" if key[1][1] else "species"
+    instrumentation.count_resolution(table_name, level)
+    instrumentation.count_model_form(table_name, data["model"])
+    start = perf_counter()
     try:
-        table_name_spcd = f"{table_name}a"
-        table_data = TABLES[table_name_spcd]
-        data = table_data.get((spcd, division), table_data[(spcd, "")])
-    except KeyError:
-        spgrp = int(REF_SPECIES[spcd]["JENKINS_SPGRPCD"])
-        table_name_spgrp = f"{table_name}b"
-        table_data = TABLES[table_name_spgrp]
-        data = table_data.get(spgrp)
-        wdsg = float(REF_SPECIES[spcd]["WOOD_SPGR_GREENVOL_DRYWT"])
-        data["wdsg"] = wdsg
+        if _result_cache is not None:
+            return _result_cache.get(table_name, spcd, division, dia, ht, _evaluate)
+        return _evaluate(table_name, spcd, dia, ht, division)
+    finally:
+        instrumentation.add_time(
+            _TABLE_ESTIMATORS.get(table_name, table_name), perf_counter() - start
+        )
+
+
+def _evaluate(table_name: str, spcd: int, dia: float, ht: float, division: str):
+    _, data = _resolve_coefficients(table_name, spcd, division)
     model_function = MODEL_MAP[data["model"]]
     return model_function(dia, ht, **data)
 
@@ -234,3 +336,288 @@ def total_foliage_dry_weight(
 
     """
     return _run_model_form("s9", spcd, dia, ht, division)
+
+
+def carbon_fraction(spcd: int, decaycd: int = 0) -> float:
+    """
+    Wood carbon fraction of a tree, from Table S10a for live trees and from
+    Table S10b by softwood/hardwood class and decay code for dead trees.
+
+    Parameters:
+        spcd (int): FIA species code.
+        decaycd (int, optional): Decay code (1-5) of a dead tree, or 0 for a
+            live tree. Default is 0.
+
+    Returns:
+        float: Carbon fraction as a proportion of dry weight.
+    """
+    if not decaycd:
+        return TABLES["s10a"][spcd] / 100
+    wood = REF_SPECIES[spcd]["SFTWD_HRDWD"]
+    return TABLES["s10b"][(wood, int(decaycd))] / 100
+
+
+def to_carbon(spcd: int, biomass: float, decaycd: int = 0) -> float:
+    """
+    Convert a biomass estimate, e.g. :func:`total_aboveground_biomass`, to
+    carbon.
+
+    Parameters:
+        spcd (int): FIA species code.
+        biomass (float): Dry weight in pounds (lb).
+        decaycd (int, optional): Decay code (1-5) of a dead tree, or 0 for a
+            live tree. Default is 0.
+
+    Returns:
+        float: Carbon in pounds (lb).
+    """
+    return biomass * carbon_fraction(spcd, decaycd)
+
+
+def _bind_model_form(table_name: str, spcd: int, division: str = ""):
+    """
+    Bind the model form of the given table to its resolved coefficients.
+
+    Parameters:
+        table_name (str): Table name.
+        spcd (int): Species code.
+        division (str, optional): Division code. Default is an empty string.
+
+    Returns:
+        callable: Function of (dia, ht) returning the model form result. If the
+        coefficients cannot be resolved, calling it raises the same error as
+        :func:`_run_model_form`.
+    """
+    try:
+        _, data = _resolve_coefficients(table_name, spcd, division)
+        coefficients = {
+            name: value
+            for name, value in data.items()
+            if name != "model" and value is not None
+        }
+        return partial(MODEL_MAP[data["model"]], **coefficients)
+    except (KeyError, ValueError, TypeError):
+        return lambda dia, ht: _run_model_form(table_name, spcd, dia, ht, division)
+
+
+class TreeModel:
+    """
+    Estimators bound to one species and division.
+
+    All component coefficients, the wood specific gravity and the
+    hardwood/softwood class are resolved once, when the model is created.
+    Instances are cached per (spcd, division), so ``TreeModel(202, "240")``
+    returns the same object on every call. Results are identical to the
+    module-level estimators.
+
+    Parameters:
+        spcd (int): FIA species code.
+        division (str, optional): Division code. Default is an empty string.
+    """
+
+    __slots__ = (
+        "spcd",
+        "division",
+        "wdsg",
+        "hardwood",
+        "_s1",
+        "_s2",
+        "_s6",
+        "_s7",
+        "_s8",
+        "_s9",
+    )
+
+    _cache = {}
+
+    def __new__(cls, spcd: int, division: str = ""):
+        key = (spcd, division)
+        model = cls._cache.get(key)
+        if model is None:
+            model = super().__new__(cls)
+            model._bind(spcd, division)
+            model = cls._cache.setdefault(key, model)
+        return model
+
+    def _bind(self, spcd: int, division: str):
+        species = REF_SPECIES[spcd]
+        self.spcd = spcd
+        self.division = division
+        try:
+            self.wdsg = float(species["WOOD_SPGR_GREENVOL_DRYWT"])
+        except ValueError:
+            self.wdsg = None
+        self.hardwood = species["SFTWD_HRDWD"] == "H"
+        self._s1 = _bind_model_form("s1", spcd, division)
+        self._s2 = _bind_model_form("s2", spcd, division)
+        self._s6 = _bind_model_form("s6", spcd, division)
+        self._s7 = _bind_model_form("s7", spcd, division)
+        self._s8 = _bind_model_form("s8", spcd, division)
+        self._s9 = _bind_model_form("s9", spcd, division)
+
+    def __repr__(self):
+        return f"TreeModel({self.spcd!r}, {self.division!r})"
+
+    def total_inside_bark_wood_volume(self, dia: float, ht: float) -> float:
+        """
+        See :func:`total_inside_bark_wood_volume`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+
+        Returns:
+            float: Total inside bark wood volume.
+        """
+        return self._s1(dia, ht)
+
+    def total_bark_wood_volume(self, dia: float, ht: float) -> float:
+        """
+        See :func:`total_bark_wood_volume`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+
+        Returns:
+            float: Total bark wood volume.
+        """
+        return self._s2(dia, ht)
+
+    def total_outside_bark_volume(self, dia: float, ht: float) -> float:
+        """
+        See :func:`total_outside_bark_volume`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+
+        Returns:
+            float: Total outside bark volume.
+        """
+        return self._s1(dia, ht) + self._s2(dia, ht)
+
+    def total_stem_wood_dry_weight(
+        self, dia: float, ht: float, cull: float = 0
+    ) -> float:
+        """
+        See :func:`total_stem_wood_dry_weight`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+            cull (int, optional): Rotten and missing cull in percent.
+
+        Returns:
+            float: Total stem wood dry weight in pounds (lb).
+        """
+        return self._stem_wood_weight(self._s1(dia, ht), cull)
+
+    def _stem_wood_weight(self, v_tot_ib: float, cull: float = 0) -> float:
+        """
+        Convert total stem inside-bark wood volume to dry weight, reduced
+        for cull.
+        """
+        if self.wdsg is None:
+            raise ValueError(f"No wood specific gravity for SPCD {self.spcd}")
+
+        if cull > 0:
+            dens_prop = 0.54 if self.hardwood else 0.92
+            return (
+                v_tot_ib
+                * (1 - cull / 100 * (1 - dens_prop))
+                * self.wdsg
+                * WEIGHT_CUBIC_FOOT_WATER
+            )
+
+        return v_tot_ib * self.wdsg * WEIGHT_CUBIC_FOOT_WATER
+
+    def total_stem_bark_weight(self, dia: float, ht: float) -> float:
+        """
+        See :func:`total_stem_bark_weight`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+
+        Returns:
+            float: Total stem bark weight in pounds (lb).
+        """
+        return self._s6(dia, ht)
+
+    def total_branch_weight(self, dia: float, ht: float) -> float:
+        """
+        See :func:`total_branch_weight`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+
+        Returns:
+            float: Total branch weight in pounds (lb).
+        """
+        return self._s7(dia, ht)
+
+    def total_aboveground_biomass(self, dia: float, ht: float) -> float:
+        """
+        See :func:`total_aboveground_biomass`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+
+        Returns:
+            float: Total aboveground biomass in pounds (lb).
+        """
+        return self._s8(dia, ht)
+
+    def total_foliage_dry_weight(self, dia: float, ht: float) -> float:
+        """
+        See :func:`total_foliage_dry_weight`.
+
+        Parameters:
+            dia (float): Diameter of the tree in inches (in).
+            ht (float): Height of the tree in feet (ft).
+
+        Returns:
+            float: Total foliage dry weight in pounds (lb).
+        """
+        return self._s9(dia, ht)
+
+
+def estimate_tree(
+    spcd: int, dia: float, ht: float, division: str = "", cull: float = 0
+) -> dict:
+    """
+    Run every tree-level step for one tree in a single pass.
+
+    Follows the step order of "Examples of Tree-Level Calculations" in the
+    GTR. Coefficients are resolved once per species and division (see
+    :class:`TreeModel`) and each intermediate, such as the inside-bark wood
+    volume used by the stem wood weight, is computed once. Results are
+    identical to the individual estimators.
+
+    Parameters:
+        spcd (int): FIA species code.
+        dia (float): Diameter of the tree in inches (in).
+        ht (float): Height of the tree in feet (ft).
+        division (str, optional): Division code. Default is an empty string.
+        cull (int, optional): Rotten and missing cull in percent.
+
+    Returns:
+        dict: Component values keyed by the names in :data:`COMPONENTS`.
+    """
+    model = TreeModel(spcd, division)
+    v_tot_ib = model.total_inside_bark_wood_volume(dia, ht)
+    v_tot_bk = model.total_bark_wood_volume(dia, ht)
+    w_tot_ib = model._stem_wood_weight(v_tot_ib, cull)
+    return {
+        "v_tot_ib": v_tot_ib,
+        "v_tot_bk": v_tot_bk,
+        "v_tot_ob": v_tot_ib + v_tot_bk,
+        "w_tot_ib": w_tot_ib,
+        "w_tot_bk": model.total_stem_bark_weight(dia, ht),
+        "w_branch": model.total_branch_weight(dia, ht),
+        "agb": model.total_aboveground_biomass(dia, ht),
+        "w_foliage": model.total_foliage_dry_weight(dia, ht),
+    }
@@ -0,0 +1,756 @@
+import hashlib
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from nsvb.aggregate import encode_groups
+from nsvb.batch import _as_arrays, estimate_trees
+from nsvb.estimators import COMPONENTS
+from nsvb.store import cache_dir, source_digest
+from nsvb.tables import DATA_PATH, compiled_species, compiled_table
+
+GRID_VERSION = 2
+
+# Default bound on the relative error of interpolated estimates.
+DEFAULT_RTOL = 1e-3
+
+# Default domain of the grids, as (min, max) diameters in inches (in) and
+# heights in feet (ft). Trees outside it are estimated exactly.
+DIA_RANGE = (1.0, 100.0)
+HT_RANGE = (5.0, 300.0)
+
+# Largest number of nodes along either axis of a grid.
+MAX_NODES = 1024
+
+# Nodes along each axis of a grid before refinement.
+_INITIAL_NODES = 9
+
+# Largest number of buckets locating points along an axis of a grid; axes
+# with narrower cells are searched instead.
+_MAX_BUCKETS = 1 << 16
+
+# Argument u = b * D of the largest |d²/dx² log(1 - exp(-u))|, x = log D,
+# over u > 0, and that largest value, rounded up. The second derivative is
+# unimodal in u, so its largest magnitude over an interval is at an end or
+# at the peak.
+_FORM3_PEAK = 1.8604709482983475
+_FORM3_PEAK_CURVATURE = 0.41253161892
+
+# Directory of grids shipped with the package, if any, in the data
+# directory. Grids are only used when their name matches the source CSVs.
+PACKAGED_GRIDS = "grids"
+
+# Coefficient tables each component is estimated from.
+COMPONENT_TABLES = {
+    "v_tot_ib": ("s1",),
+    "v_tot_bk": ("s2",),
+    "v_tot_ob": ("s1", "s2"),
+    "w_tot_ib": ("s1",),
+    "w_tot_bk": ("s6",),
+    "w_branch": ("s7",),
+    "agb": ("s8",),
+    "w_foliage": ("s9",),
+}
+
+
+class InterpolationGrid:
+    """
+    Estimates of one component of one species (and division) on a grid of
+    diameters and heights, interpolated bilinearly in log space.
+
+    Every model form is a power law in height, and one in diameter up to a
+    segment break or an exponential term, so the log of an estimate is close
+    to bilinear in the logs of the diameter and height, and exactly bilinear
+    for power laws. Segment breaks (k) are nodes of the grid.
+
+    Attributes:
+        log_dia (np.ndarray): Log of the diameter nodes, ascending.
+        log_ht (np.ndarray): Log of the height nodes, ascending.
+        values (np.ndarray): Log of the estimate at each (diameter, height)
+            node, of shape (len(log_dia), len(log_ht)).
+        max_error (float): Bound on the relative error of the interpolation
+            anywhere in the domain (see :func:`build_grid`).
+    """
+
+    def __init__(self, log_dia, log_ht, values, max_error):
+        self.log_dia = log_dia
+        self.log_ht = log_ht
+        self.values = values
+        self.max_error = float(max_error)
+        self._axes = (_Axis(log_dia), _Axis(log_ht))
+
+    @property
+    def dia_range(self) -> tuple:
+        return float(np.exp(self.log_dia[0])), float(np.exp(self.log_dia[-1]))
+
+    @property
+    def ht_range(self) -> tuple:
+        return float(np.exp(self.log_ht[0])), float(np.exp(self.log_ht[-1]))
+
+    def contains(self, dia, ht) -> np.ndarray:
+        """
+        Whether trees are within the domain of the grid.
+
+        Parameters:
+            dia (array_like): Diameters of the trees in inches (in).
+            ht (array_like): Heights of the trees in feet (ft).
+
+        Returns:
+            np.ndarray: True for trees within the domain.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._contains(np.log(dia), np.log(ht))
+
+    def _contains(self, x, y) -> np.ndarray:
+        return (
+            (x >= self.log_dia[0])
+            & (x <= self.log_dia[-1])
+            & (y >= self.log_ht[0])
+            & (y <= self.log_ht[-1])
+        )
+
+    def __call__(self, dia, ht) -> np.ndarray:
+        """
+        Interpolate the estimates of trees.
+
+        Parameters:
+            dia (array_like): Diameters of the trees in inches (in).
+            ht (array_like): Heights of the trees in feet (ft).
+
+        Returns:
+            np.ndarray: Estimate of each tree, NaN outside the domain.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.log(np.asarray(dia, dtype=np.float64))
+            y = np.log(np.asarray(ht, dtype=np.float64))
+        x, y = np.broadcast_arrays(x, y)
+        inside = self._contains(x, y)
+        out = self._interpolate(
+            np.where(inside, x, self.log_dia[0]), np.where(inside, y, self.log_ht[0])
+        )
+        out[~inside] = np.nan
+        return out
+
+    def _interpolate(self, x, y, located=None) -> np.ndarray:
+        """
+        Interpolate at log diameters and log heights within the domain.
+
+        Parameters:
+            x (np.ndarray): Log diameters.
+            y (np.ndarray): Log heights.
+            located (dict, optional): Cells of the same points along axes
+                already located, keyed by axis and nodes, so that grids with
+                the same nodes locate the points once. Updated in place.
+
+        Returns:
+            np.ndarray: Interpolated estimates.
+        """
+        if located is None:
+            located = {}
+        cells = []
+        for axis, (nodes, points) in enumerate(zip(self._axes, (x, y))):
+            key = (axis, nodes.key)
+            if key not in located:
+                located[key] = nodes.locate(points)
+            cells.append(located[key])
+        (i, s), (j, t) = cells
+        v = self.values
+        return np.exp(
+            (v[i, j] * (1 - s) + v[i + 1, j] * s) * (1 - t)
+            + (v[i, j + 1] * (1 - s) + v[i + 1, j + 1] * s) * t
+        )
+
+
+class _Axis:
+    """
+    Nodes of one axis of a grid, with the cell of evenly spaced buckets no
+    wider than the narrowest cell, so that points are located without a
+    binary search.
+    """
+
+    __slots__ = ("nodes", "key", "_scale", "_cells")
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.key = nodes.tobytes()
+        span = nodes[-1] - nodes[0]
+        n_buckets = int(np.ceil(span / np.diff(nodes).min()))
+        self._scale = n_buckets / span
+        self._cells = None
+        if n_buckets <= _MAX_BUCKETS:
+            edges = nodes[0] + np.arange(n_buckets) / self._scale
+            cells = np.searchsorted(nodes, edges, side="right") - 1
+            self._cells = np.minimum(cells, len(nodes) - 2)
+
+    def locate(self, x) -> tuple:
+        """
+        Cell of each point.
+
+        Parameters:
+            x (np.ndarray): Points within the nodes.
+
+        Returns:
+            tuple: Index of the cell's lower node, and the fraction of the
+            cell below each point.
+        """
+        nodes = self.nodes
+        last = len(nodes) - 2
+        if self._cells is None:
+            i = np.clip(np.searchsorted(nodes, x, side="right") - 1, 0, last)
+        else:
+            # A bucket overlaps at most its first cell and the next one.
+            bucket = ((x - nodes[0]) * self._scale).astype(np.intp)
+            np.clip(bucket, 0, len(self._cells) - 1, out=bucket)
+            i = self._cells[bucket]
+            i += (x >= nodes[i + 1]) & (i < last)
+        return i, (x - nodes[i]) / (nodes[i + 1] - nodes[i])
+
+
+@lru_cache(maxsize=None)
+def _grid_division(spcd: int, division: str, component: str) -> str:
+    """
+    Division of a species' grid: the division if any table of the
+    component has a division-specific row for it, otherwise "", so that
+    divisions resolving to the same coefficients share a grid.
+
+    Raises:
+        KeyError: If the species code is unknown.
+    """
+    slots = np.repeat(compiled_species().slots(np.array([spcd])), 2)
+    for table_name in COMPONENT_TABLES[component]:
+        table = compiled_table(table_name)
+        rows = table.rows(slots, table.division_codes([division, ""]))
+        if rows[0] != rows[1]:
+            return division
+    return ""
+
+
+def _component_rows(spcd: int, division: str, component: str) -> list:
+    """
+    Compiled table and coefficient row of each model form a component is
+    the sum of.
+    """
+    slots = compiled_species().slots(np.array([spcd]))
+    rows = []
+    for table_name in COMPONENT_TABLES[component]:
+        table = compiled_table(table_name)
+        rows.append((table, table.rows(slots, table.division_codes([division]))[0]))
+    return rows
+
+
+def _segment_breaks(spcd: int, division: str, component: str) -> np.ndarray:
+    """
+    Diameters at which the segmented model forms of a component change.
+    """
+    breaks = [
+        table.columns["k"][row]
+        for table, row in _component_rows(spcd, division, component)
+        if table.model[row] == 2
+    ]
+    return np.array(breaks, dtype=np.float64)
+
+
+def _log_estimates(spcd, division, component, log_dia, log_ht) -> np.ndarray:
+    """
+    Log of the exact estimates of live, intact trees on the outer product of
+    diameters and heights, of shape (len(log_dia), len(log_ht)).
+
+    Raises:
+        ValueError: If an estimate is not positive.
+    """
+    dia, ht = np.meshgrid(np.exp(log_dia), np.exp(log_ht), indexing="ij")
+    values = estimate_trees(spcd, dia, ht, division, components=[component])
+    values = values[component].reshape(dia.shape)
+    if not (values > 0).all():
+        raise ValueError(
+            f"{component} of SPCD {spcd} is not positive over the grid domain"
+        )
+    return np.log(values)
+
+
+def _form_derivatives(table, row, log_dia) -> tuple:
+    """
+    Range of the first derivative, and largest magnitude of the second
+    derivative, of the log of a model form with respect to the log
+    diameter, over each cell of the diameter nodes.
+
+    A model form is ``a * g(D) * H**c``, so its log is linear in the log
+    height with slope c; only the diameter term g is differentiated.
+
+    Returns:
+        tuple: Lower and upper bounds of the first derivative, and the bound
+        of the second derivative, each of shape (len(log_dia) - 1,).
+    """
+    columns = {name: float(column[row]) for name, column in table.columns.items()}
+    model = int(table.model[row])
+    lo, hi = log_dia[:-1], log_dia[1:]
+    curvature = np.zeros(len(lo))
+    if model == 2:
+        # k is a node, so each cell is on one side of it.
+        below = (lo + hi) / 2 < np.log(columns["k"])
+        slope = np.where(below, columns["b"], columns["b1"])
+        return slope, slope, curvature
+    if model == 3:
+        # log(1 - exp(-u)) * c1 with u = b * D, whose derivative with respect
+        # to log D is c1 * u / (exp(u) - 1), decreasing in u.
+        u_lo, u_hi = columns["b"] * np.exp(lo), columns["b"] * np.exp(hi)
+        slopes = [columns["c1"] * _form3_slope(u) for u in (u_lo, u_hi)]
+        peak = (u_lo <= _FORM3_PEAK) & (u_hi >= _FORM3_PEAK)
+        curvature = np.where(
+            peak,
+            _FORM3_PEAK_CURVATURE,
+            np.maximum(_form3_curvature(u_lo), _form3_curvature(u_hi)),
+        )
+        return np.minimum(*slopes), np.maximum(*slopes), abs(columns["c1"]) * curvature
+    if model == 4:
+        # b * log D - b1 * D, whose derivatives are monotone in D.
+        slopes = [columns["b"] - columns["b1"] * np.exp(x) for x in (lo, hi)]
+        curvature = abs(columns["b1"]) * np.exp(hi)
+        return np.minimum(*slopes), np.maximum(*slopes), curvature
+    slope = np.full(len(lo), columns["b"])
+    return slope, slope, curvature
+
+
+def _form3_slope(u) -> np.ndarray:
+    """
+    Derivative of log(1 - exp(-u)) with respect to log u, u > 0.
+    """
+    return -u * np.exp(-u) / np.expm1(-u)
+
+
+def _form3_curvature(u) -> np.ndarray:
+    """
+    Magnitude of the second derivative of log(1 - exp(-u)) with respect to
+    log u, u > 0.
+    """
+    expm1 = np.expm1(-u)
+    return np.abs(u * np.exp(-u) * (u + expm1) / expm1**2)
+
+
+def _error_bound(spcd, division, component, log_dia, log_ht) -> tuple:
+    """
+    Bound on the error of the bilinear interpolation of the log estimates
+    in each cell, along each axis.
+
+    Bilinear interpolation of a function F over a cell of widths hx and hy
+    is within ``hx**2 / 8 * max|Fxx| + hy**2 / 8 * max|Fyy|`` of it. The log
+    of a single model form is linear in the log height and in the log
+    diameter for power laws, so both terms vanish but for the exponential
+    forms. The log of a sum of forms with weights p of the sum has
+    ``Fxx = sum(p * fxx) + var_p(fx)``, bounded with ``var_p <= range**2 /
+    4``.
+
+    Returns:
+        tuple: Bounds on the log error along the diameter axis, of shape
+        (n_dia - 1, 1), and along the height axis, of shape (1, n_ht - 1).
+    """
+    forms = _component_rows(spcd, division, component)
+    derivatives = [_form_derivatives(table, row, log_dia) for table, row in forms]
+    fxx = np.max([curvature for _, _, curvature in derivatives], axis=0)
+    if len(forms) > 1:
+        slope_lo = np.min([lo for lo, _, _ in derivatives], axis=0)
+        slope_hi = np.max([hi for _, hi, _ in derivatives], axis=0)
+        fxx = fxx + (slope_hi - slope_lo) ** 2 / 4
+    c = [float(table.columns["c"][row]) for table, row in forms]
+    fyy = (max(c) - min(c)) ** 2 / 4
+    along_x = np.diff(log_dia) ** 2 / 8 * fxx
+    along_y = np.diff(log_ht) ** 2 / 8 * fyy
+    return along_x[:, None], along_y[None, :]
+
+
+def build_grid(
+    spcd: int,
+    division: str = "",
+    component: str = "agb",
+    rtol: float = DEFAULT_RTOL,
+    dia_range: tuple = DIA_RANGE,
+    ht_range: tuple = HT_RANGE,
+    max_nodes: int = MAX_NODES,
+) -> InterpolationGrid:
+    """
+    Build the interpolation grid of a component of live, intact trees of a
+    species (and division), without cull.
+
+    The grid starts with nodes evenly spaced in log diameter and log height,
+    plus the segment breaks of the component's model forms. The error of
+    the interpolation in each cell is bounded from the second derivatives of
+    the log of the model forms, ``h**2 / 8 * max|d²log f|`` along each axis
+    (see :func:`_error_bound`), and the cells whose bound exceeds ``rtol``
+    are split along the axis that contributes most to it, until every cell
+    is within ``rtol``. Power-law forms are exactly bilinear in log space,
+    so their grids keep the initial nodes and have no error.
+
+    Parameters:
+        spcd (int): FIA species code.
+        division (str, optional): Division code. Default is "".
+        component (str, optional): Name from
+            :data:`nsvb.estimators.COMPONENTS`. Default is "agb".
+        rtol (float, optional): Bound on the relative error. Default is
+            :data:`DEFAULT_RTOL`.
+        dia_range (tuple, optional): Domain of the diameters in inches (in).
+            Default is :data:`DIA_RANGE`.
+        ht_range (tuple, optional): Domain of the heights in feet (ft).
+            Default is :data:`HT_RANGE`.
+        max_nodes (int, optional): Largest number of nodes along either
+            axis. Default is :data:`MAX_NODES`.
+
+    Returns:
+        InterpolationGrid: The grid, with the bound of its relative error as
+        ``max_error``.
+
+    Raises:
+        KeyError: If the species code is unknown.
+        ValueError: If the species has no coefficients, an estimate is not
+            positive, or ``rtol`` cannot be reached within ``max_nodes``.
+    """
+    if component not in COMPONENTS:
+        raise ValueError(f"Unknown component: {component}")
+    log_dia = np.linspace(*np.log(dia_range), _INITIAL_NODES)
+    log_ht = np.linspace(*np.log(ht_range), _INITIAL_NODES)
+    breaks = np.log(_segment_breaks(spcd, division, component))
+    breaks = breaks[(breaks > log_dia[0]) & (breaks < log_dia[-1])]
+    log_dia = np.unique(np.concatenate([log_dia, breaks]))
+
+    while True:
+        values = _log_estimates(spcd, division, component, log_dia, log_ht)
+        along_x, along_y = _error_bound(spcd, division, component, log_dia, log_ht)
+        error = np.expm1(along_x + along_y)
+        max_error = error.max()
+        if max_error <= rtol:
+            return InterpolationGrid(log_dia, log_ht, values, max_error)
+
+        failed = error > rtol
+        split_x = (failed & (along_x >= along_y / 2)).any(axis=1)
+        split_y = (failed & (along_y >= along_x / 2)).any(axis=0)
+        log_dia = _split(log_dia, split_x)
+        log_ht = _split(log_ht, split_y)
+        if max(len(log_dia), len(log_ht)) > max_nodes:
+            raise ValueError(
+                f"{component} of SPCD {spcd} cannot be interpolated within "
+                f"rtol={rtol} with at most {max_nodes} nodes per axis"
+            )
+
+
+def _split(nodes, split) -> np.ndarray:
+    """
+    Add the midpoints of the selected cells of an axis to its nodes.
+    """
+    midpoints = (nodes[:-1][split] + nodes[1:][split]) / 2
+    return np.sort(np.concatenate([nodes, midpoints]))
+
+
+@lru_cache(maxsize=None)
+def _digest() -> str:
+    return source_digest()
+
+
+def grid_filename(
+    spcd: int,
+    division: str,
+    component: str,
+    rtol: float = DEFAULT_RTOL,
+    dia_range: tuple = DIA_RANGE,
+    ht_range: tuple = HT_RANGE,
+) -> str:
+    """
+    File name of a grid, including a hash of the source CSVs and the grid
+    parameters, so edited CSVs or other parameters never match a stale
+    grid.
+
+    Returns:
+        str: File name, e.g. "agb-202-240-<hash>.npz".
+    """
+    key = f"nsvb-grid-{GRID_VERSION}-{_digest()}-{rtol!r}-{dia_range}-{ht_range}"
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return f"{component}-{spcd}-{division or 'all'}-{digest}.npz"
+
+
+def write_grid(grid: InterpolationGrid, path) -> Path:
+    """
+    Write a grid to a ``.npz`` file.
+
+    The file is written to a temporary name and moved into place, so
+    concurrent writers and readers never see a partial grid.
+
+    Parameters:
+        grid (InterpolationGrid): The grid.
+        path (str or Path): File to write.
+
+    Returns:
+        Path: The written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f,
+                log_dia=grid.log_dia,
+                log_ht=grid.log_ht,
+                values=grid.values,
+                max_error=grid.max_error,
+            )
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def read_grid(path):
+    """
+    Read a grid written by :func:`write_grid`.
+
+    Parameters:
+        path (str or Path): Grid file.
+
+    Returns:
+        InterpolationGrid or None: The grid, or None if the file is missing
+        or invalid.
+    """
+    try:
+        with np.load(path) as data:
+            return InterpolationGrid(
+                data["log_dia"], data["log_ht"], data["values"], data["max_error"]
+            )
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+# Grids (or the errors building them) of this process, keyed by species,
+# division, component, rtol and domain.
+_grids = {}
+
+
+def interpolation_grid(
+    spcd: int,
+    division: str = "",
+    component: str = "agb",
+    rtol: float = DEFAULT_RTOL,
+    dia_range: tuple = DIA_RANGE,
+    ht_range: tuple = HT_RANGE,
+) -> InterpolationGrid:
+    """
+    Interpolation grid of a component of a species (and division), built on
+    first use.
+
+    Divisions without division-specific coefficients share the grid of
+    their species. A grid is kept for the life of the process, and read
+    from the packaged grids directory when it matches the source CSVs, or
+    else read from (or written to) ``grids`` in the cache directory of
+    :func:`nsvb.store.cache_dir`. Grids that cannot be written are only
+    kept in memory.
+
+    Parameters:
+        spcd (int): FIA species code.
+        division (str, optional): Division code. Default is "".
+        component (str, optional): Name from
+            :data:`nsvb.estimators.COMPONENTS`. Default is "agb".
+        rtol (float, optional): Bound on the relative error. Default is
+            :data:`DEFAULT_RTOL`.
+        dia_range (tuple, optional): Domain of the diameters in inches (in).
+            Default is :data:`DIA_RANGE`.
+        ht_range (tuple, optional): Domain of the heights in feet (ft).
+            Default is :data:`HT_RANGE`.
+
+    Returns:
+        InterpolationGrid: The grid.
+
+    Raises:
+        KeyError: If the species code is unknown.
+        ValueError: If the grid cannot be built (see :func:`build_grid`).
+    """
+    if component not in COMPONENTS:
+        raise ValueError(f"Unknown component: {component}")
+    division = _grid_division(int(spcd), str(division), component)
+    key = (int(spcd), division, component, rtol, tuple(dia_range), tuple(ht_range))
+    grid = _grids.get(key)
+    if grid is None:
+        grid = _grids.setdefault(key, _load_grid(*key))
+    if isinstance(grid, ValueError):
+        raise ValueError(*grid.args)
+    return grid
+
+
+def _load_grid(spcd, division, component, rtol, dia_range, ht_range):
+    name = grid_filename(spcd, division, component, rtol, dia_range, ht_range)
+    for directory in (DATA_PATH / PACKAGED_GRIDS, cache_dir() / "grids"):
+        grid = read_grid(directory / name)
+        if grid is not None:
+            return grid
+    try:
+        grid = build_grid(spcd, division, component, rtol, dia_range, ht_range)
+    except ValueError as error:
+        return error
+    try:
+        write_grid(grid, cache_dir() / "grids" / name)
+    except OSError:
+        pass
+    return grid
+
+
+def interpolate_trees(
+    spcd,
+    dia,
+    ht,
+    division="",
+    components=None,
+    errors="raise",
+    rtol: float = DEFAULT_RTOL,
+    dia_range: tuple = DIA_RANGE,
+    ht_range: tuple = HT_RANGE,
+) -> dict:
+    """
+    Approximate :func:`nsvb.batch.estimate_trees` for arrays of live,
+    intact trees without cull, interpolated from precomputed grids.
+
+    Each (species, division) present is interpolated from the grids of
+    :func:`interpolation_grid`, whose relative error is bounded by ``rtol``
+    (see :func:`build_grid`). Trees outside the domain of the grids, and
+    trees of species whose grid cannot be built, are estimated exactly.
+
+    Each tree's cell is located once for the grids of all components with
+    the same nodes, so interpolation pays off most for several components
+    and for the model forms with exponential terms; a single power-law
+    component is about as fast to estimate exactly.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to return. Default is all of
+            them.
+        errors (str, optional): "raise" to raise for trees whose species or
+            coefficients cannot be resolved, or "nan" to return NaN for
+            them. Default is "raise".
+        rtol (float, optional): Bound on the relative error. Default is
+            :data:`DEFAULT_RTOL`.
+        dia_range (tuple, optional): Domain of the diameters in inches (in).
+            Default is :data:`DIA_RANGE`.
+        ht_range (tuple, optional): Domain of the heights in feet (ft).
+            Default is :data:`HT_RANGE`.
+
+    Returns:
+        dict: float64 component arrays keyed by component name.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown components: {', '.join(sorted(unknown))}")
+    if errors not in ("raise", "nan"):
+        raise ValueError(f"errors must be 'raise' or 'nan', not {errors!r}")
+
+    spcd, dia, ht, division = _as_arrays(spcd, dia, ht, division)
+    results = {name: np.full(len(spcd), np.nan) for name in components}
+    inside = (
+        (dia >= dia_range[0])
+        & (dia <= dia_range[1])
+        & (ht >= ht_range[0])
+        & (ht <= ht_range[1])
+    )
+    exact = ~inside
+
+    # Trees within the domain are gathered in group order once, so that
+    # each group is a slice, and their results scattered back once.
+    ids, keys = encode_groups({"spcd": spcd, "division": division}, len(spcd))
+    n_groups = len(keys["spcd"])
+    order = np.flatnonzero(inside)
+    if n_groups > 1:
+        # Stable sorts of 16-bit codes are radix sorts.
+        codes = ids[order]
+        if n_groups <= 1 << 16:
+            codes = codes.astype(np.uint16)
+        order = order[np.argsort(codes, kind="stable")]
+    bounds = np.cumsum(np.bincount(ids[order], minlength=n_groups))
+    x, y = np.log(dia[order]), np.log(ht[order])
+    interpolated = {name: np.full(len(order), np.nan) for name in components}
+    start = 0
+    for group, stop in enumerate(bounds.tolist()):
+        if stop == start:
+            continue
+        trees = slice(start, stop)
+        start = stop
+        try:
+            grids = {
+                name: interpolation_grid(
+                    int(keys["spcd"][group]),
+                    str(keys["division"][group]),
+                    name,
+                    rtol,
+                    dia_range,
+                    ht_range,
+                )
+                for name in components
+            }
+        except (KeyError, ValueError):
+            # Estimated exactly, which raises or returns NaN per ``errors``.
+            exact[order[trees]] = True
+            continue
+        located = {}
+        for name, grid in grids.items():
+            interpolated[name][trees] = grid._interpolate(x[trees], y[trees], located)
+    for name in components:
+        results[name][order] = interpolated[name]
+
+    index = np.flatnonzero(exact)
+    if len(index):
+        values = estimate_trees(
+            spcd[index],
+            dia[index],
+            ht[index],
+            division[index],
+            components=components,
+            errors=errors,
+        )
+        for name in components:
+            results[name][index] = values[name]
+    return results
+
+
+def prebuild_grids(
+    species, components=None, rtol: float = DEFAULT_RTOL, directory=None
+) -> list:
+    """
+    Build grids and write them to a directory, e.g. the packaged grids
+    directory before building a wheel.
+
+    Parameters:
+        species (iterable): (spcd, division) pairs.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS`. Default is all of them.
+        rtol (float, optional): Bound on the relative error. Default is
+            :data:`DEFAULT_RTOL`.
+        directory (str or Path, optional): Directory to write to. Default is
+            the packaged grids directory.
+
+    Returns:
+        list: The written files.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    directory = Path(directory or DATA_PATH / PACKAGED_GRIDS)
+    paths = []
+    for spcd, division in species:
+        for component in components:
+            grid_division = _grid_division(int(spcd), str(division), component)
+            grid = build_grid(spcd, grid_division, component, rtol)
+            name = grid_filename(spcd, grid_division, component, rtol)
+            paths.append(write_grid(grid, directory / name))
+    return paths
+
+
+if __name__ == "__main__":
+    # Prebuild packaged grids for SPCD[:DIVISION] arguments, e.g. 202:240.
+    pairs = [
+        (int(arg.partition(":")[0]), arg.partition(":")[2]) for arg in sys.argv[1:]
+    ]
+    for path in prebuild_grids(pairs):
+        print(path)
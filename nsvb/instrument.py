@@ -0,0 +1,236 @@
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from nsvb import batch, estimators
+
+# Levels at which coefficients are resolved: the division-specific SPCD row,
+# the species-level SPCD row, or the Jenkins species group row.
+RESOLUTION_LEVELS = ("division", "species", "jenkins")
+
+Timing = namedtuple("Timing", ["calls", "seconds"])
+Timing.__doc__ = """
+Cumulative time of an instrumented estimator or batch stage.
+
+Attributes:
+    calls (int): Number of calls.
+    seconds (float): Total wall time in seconds.
+"""
+
+Snapshot = namedtuple("Snapshot", ["resolution", "model_forms", "timings"])
+Snapshot.__doc__ = """
+Counters and timings of an :class:`Instrumentation`.
+
+Attributes:
+    resolution (dict): Number of trees resolved at each of
+        :data:`RESOLUTION_LEVELS`, as a dict keyed by level, keyed by table
+        name, e.g. ``snapshot.resolution["s1"]["jenkins"]``.
+    model_forms (dict): Number of trees evaluated with each model form, as a
+        dict keyed by model number, keyed by table name.
+    timings (dict): :class:`Timing` keyed by estimator or batch stage name.
+"""
+
+
+class Instrumentation:
+    """
+    Thread-safe counters of coefficient resolution and model forms, and
+    cumulative timings, of the estimators.
+
+    The scalar estimators of :mod:`nsvb.estimators` count one tree per model
+    form evaluation, timed under the estimator of its table, so e.g.
+    :func:`total_outside_bark_volume` is timed as the two volume estimators
+    it calls. :class:`TreeModel` methods, which bind their coefficients up
+    front, are not instrumented.
+    :func:`nsvb.batch.estimate_trees` counts every tree of a batch and is
+    timed per stage, named ``"estimate_trees.<stage>"``. Worker processes of
+    :func:`nsvb.parallel.estimate_trees_parallel` are not instrumented.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Zero every counter and timing.
+        """
+        with self._lock:
+            self._resolution = {}
+            self._model_forms = {}
+            self._timings = {}
+
+    def count_resolution(self, table_name: str, level: str, n: int = 1):
+        """
+        Count trees resolved at a level.
+
+        Parameters:
+            table_name (str): Table name, e.g. "s1".
+            level (str): One of :data:`RESOLUTION_LEVELS`.
+            n (int, optional): Number of trees. Default is 1.
+        """
+        with self._lock:
+            counts = self._resolution.setdefault(
+                table_name, dict.fromkeys(RESOLUTION_LEVELS, 0)
+            )
+            counts[level] += n
+
+    def count_model_form(self, table_name: str, model: int, n: int = 1):
+        """
+        Count trees evaluated with a model form.
+
+        Parameters:
+            table_name (str): Table name, e.g. "s1".
+            model (int): Model form number.
+            n (int, optional): Number of trees. Default is 1.
+        """
+        with self._lock:
+            counts = self._model_forms.setdefault(table_name, {})
+            counts[model] = counts.get(model, 0) + n
+
+    def count_rows(self, table, slots, rows):
+        """
+        Count the resolution levels and model forms of a batch of trees.
+
+        Jenkins rows are the only rows with a wdsg, and a division-specific
+        row differs from the species-level row of its species.
+
+        Parameters:
+            table (CompiledTable): Compiled coefficient table.
+            slots (np.ndarray): Species slot of each tree.
+            rows (np.ndarray): Coefficient row of each tree, -1 if unresolved.
+        """
+        resolved = rows >= 0
+        if not resolved.all():
+            slots, rows = slots[resolved], rows[resolved]
+        jenkins = ~np.isnan(table.columns["wdsg"][rows])
+        division = ~jenkins & (rows != table.lookup[slots, 0])
+        n_jenkins = int(np.count_nonzero(jenkins))
+        n_division = int(np.count_nonzero(division))
+        models = np.bincount(table.model[rows])
+        with self._lock:
+            counts = self._resolution.setdefault(
+                table.name, dict.fromkeys(RESOLUTION_LEVELS, 0)
+            )
+            counts["division"] += n_division
+            counts["species"] += len(rows) - n_division - n_jenkins
+            counts["jenkins"] += n_jenkins
+            forms = self._model_forms.setdefault(table.name, {})
+            for model in np.flatnonzero(models).tolist():
+                forms[model] = forms.get(model, 0) + int(models[model])
+
+    def add_time(self, name: str, seconds: float):
+        """
+        Add one call to the cumulative time of an estimator or stage.
+
+        Parameters:
+            name (str): Estimator or stage name.
+            seconds (float): Wall time of the call in seconds.
+        """
+        with self._lock:
+            calls, total = self._timings.get(name, (0, 0.0))
+            self._timings[name] = Timing(calls + 1, total + seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        Time the body of a ``with`` block as one call of an estimator or
+        stage.
+
+        Parameters:
+            name (str): Estimator or stage name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Copy of the current counters and timings.
+
+        Returns:
+            Snapshot: Counters and timings.
+        """
+        with self._lock:
+            return Snapshot(
+                {name: dict(counts) for name, counts in self._resolution.items()},
+                {name: dict(counts) for name, counts in self._model_forms.items()},
+                dict(self._timings),
+            )
+
+
+def _install(instrumentation):
+    estimators._instrumentation = instrumentation
+    batch._instrumentation = instrumentation
+
+
+def enable_instrumentation() -> Instrumentation:
+    """
+    Instrument the scalar and batch estimators, replacing any
+    instrumentation already enabled.
+
+    While disabled, the estimators only check that no instrumentation is
+    installed.
+
+    Returns:
+        Instrumentation: The enabled instrumentation.
+    """
+    instrumentation = Instrumentation()
+    _install(instrumentation)
+    return instrumentation
+
+
+def disable_instrumentation():
+    """
+    Stop instrumenting the estimators.
+    """
+    _install(None)
+
+
+def snapshot():
+    """
+    Counters and timings of the enabled instrumentation.
+
+    Returns:
+        Snapshot or None: Counters and timings, or None if instrumentation
+        is not enabled.
+    """
+    instrumentation = estimators._instrumentation
+    return None if instrumentation is None else instrumentation.snapshot()
+
+
+def reset():
+    """
+    Zero the counters and timings of the enabled instrumentation, if any.
+    """
+    instrumentation = estimators._instrumentation
+    if instrumentation is not None:
+        instrumentation.reset()
+
+
+@contextmanager
+def profile():
+    """
+    Instrument the estimators within a ``with`` block, e.g.::
+
+        with profile() as instrumentation:
+            estimate_trees(spcd, dia, ht, division)
+        print(instrumentation.snapshot().resolution["s1"])
+
+    The block gets its own :class:`Instrumentation`, and whatever was
+    enabled before (or nothing) is restored on exit.
+
+    Yields:
+        Instrumentation: Instrumentation of the block.
+    """
+    previous = estimators._instrumentation
+    instrumentation = Instrumentation()
+    _install(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        _install(previous)
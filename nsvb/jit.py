@@ -0,0 +1,219 @@
+import threading
+import warnings
+
+import numpy as np
+
+from nsvb import batch
+from nsvb.tables import COEFFICIENT_COLUMNS
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Backends of the batch model form evaluation.
+BACKENDS = ("numpy", "numba")
+
+# Relative tolerance of the numba backend against the NumPy kernels. Both
+# evaluate the same expressions in the same order, but the compiled power
+# and exponential functions may differ from NumPy's in the last few bits.
+RTOL = 1e-12
+
+NUMBA_AVAILABLE = numba is not None
+
+# Whether a parallel loop has run in this process, which starts numba's
+# worker threads; see parallel_loops_started.
+_parallel_started = False
+
+_A, _A1, _B, _B1, _C, _C1, _K, _WDSG = (
+    COEFFICIENT_COLUMNS.index(name)
+    for name in ("a", "a1", "b", "b1", "c", "c1", "k", "wdsg")
+)
+
+
+def _evaluate_row(model, coefficients, row, d, h):
+    """
+    Evaluate the model form of one coefficient row for one tree.
+
+    Parameters:
+        model (np.ndarray): Model form of each row.
+        coefficients (np.ndarray): Coefficients of shape
+            (len(COEFFICIENT_COLUMNS), n_rows).
+        row (int): Coefficient row of the tree.
+        d (float): Diameter of the tree.
+        h (float): Height of the tree.
+
+    Returns:
+        float: Model form result, or NaN for an unknown model form.
+    """
+    form = model[row]
+    a = coefficients[_A, row]
+    if form == 1:
+        return a * (d ** coefficients[_B, row]) * (h ** coefficients[_C, row])
+    elif form == 2:
+        k = coefficients[_K, row]
+        b = coefficients[_B, row]
+        if d < k:
+            return a * (d**b) * (h ** coefficients[_C, row])
+        else:
+            b1 = coefficients[_B1, row]
+            return a * (k ** (b - b1)) * (d**b1) * (h ** coefficients[_C, row])
+    elif form == 3:
+        return (
+            a
+            * (
+                coefficients[_A1, row]
+                * ((1 - np.exp(-coefficients[_B, row] * d)) ** coefficients[_C1, row])
+            )
+            * (h ** coefficients[_C, row])
+        )
+    elif form == 4:
+        return (
+            a
+            * (d ** coefficients[_B, row])
+            * (h ** coefficients[_C, row])
+            * np.exp(-(coefficients[_B1, row] * d))
+        )
+    elif form == 5:
+        return (
+            a
+            * (d ** coefficients[_B, row])
+            * (h ** coefficients[_C, row])
+            * coefficients[_WDSG, row]
+        )
+    else:
+        return np.nan
+
+
+def _evaluate_rows(model, coefficients, rows, dia, ht, out):
+    """
+    Evaluate the model form of each tree's coefficient row, gathering its
+    coefficients and computing its result in one pass without temporary
+    arrays, in parallel across cores.
+
+    Parameters:
+        model (np.ndarray): Model form of each row.
+        coefficients (np.ndarray): Coefficients of shape
+            (len(COEFFICIENT_COLUMNS), n_rows).
+        rows (np.ndarray): Coefficient row of each tree.
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+        out (np.ndarray): Output array, one value per tree.
+    """
+    for i in numba.prange(len(rows)):
+        out[i] = _evaluate_row(model, coefficients, rows[i], dia[i], ht[i])
+
+
+def _evaluate_rows_serial(model, coefficients, rows, dia, ht, out):
+    """
+    Serial :func:`_evaluate_rows`, for threads other than the main thread.
+    """
+    for i in range(len(rows)):
+        out[i] = _evaluate_row(model, coefficients, rows[i], dia[i], ht[i])
+
+
+if NUMBA_AVAILABLE:
+    # The parallel loop for the main thread, and a serial one for every other
+    # thread: numba's default workqueue threading layer aborts the process
+    # when parallel kernels are launched from several threads at once. The
+    # serial loop releases the GIL, so the threads of
+    # nsvb.parallel.estimate_trees_threaded still run it concurrently. The
+    # loops are separate functions so that each has its own cache entry.
+    _evaluate_row = numba.njit(cache=True)(_evaluate_row)
+    _evaluate_rows = numba.njit(parallel=True, cache=True)(_evaluate_rows)
+    _evaluate_rows_serial = numba.njit(nogil=True, cache=True)(_evaluate_rows_serial)
+
+
+def _evaluate(table, rows, dia, ht):
+    """
+    Numba counterpart of :func:`nsvb.batch._evaluate`.
+
+    Parameters:
+        table (CompiledTable): Compiled coefficient table.
+        rows (np.ndarray): Coefficient row of each tree.
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+
+    Returns:
+        np.ndarray: Model form results, of the dtype of ``dia``.
+    """
+    out = np.empty(len(rows), dtype=dia.dtype)
+    if threading.current_thread() is threading.main_thread():
+        global _parallel_started
+        _parallel_started = True
+        kernel = _evaluate_rows
+    else:
+        kernel = _evaluate_rows_serial
+    kernel(
+        table.model,
+        table.coefficients,
+        np.ascontiguousarray(rows),
+        np.ascontiguousarray(dia),
+        np.ascontiguousarray(ht, dtype=dia.dtype),
+        out,
+    )
+    return out
+
+
+def set_backend(name: str) -> str:
+    """
+    Select the backend evaluating the model forms in :mod:`nsvb.batch`, and
+    so in the threaded, aggregation and uncertainty paths built on it, in
+    the current process.
+
+    "numpy" evaluates each model form present with one NumPy array kernel
+    over its trees. "numba" evaluates every tree in a single compiled loop
+    that gathers the tree's coefficients and computes its model form without
+    temporary arrays; it is compiled on first use, and results match the
+    NumPy kernels within a relative tolerance of :data:`RTOL`. The loop is
+    parallelized across cores when called from the main thread. Other
+    threads, e.g. those of :func:`nsvb.parallel.estimate_trees_threaded`,
+    run a serial loop that releases the GIL instead, because numba's default
+    threading layer cannot launch parallel loops from several threads at
+    once. If numba is not installed, selecting it warns and keeps the NumPy
+    backend.
+
+    Parameters:
+        name (str): "numpy" or "numba".
+
+    Returns:
+        str: The backend in use.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not {name!r}")
+    if name == "numba" and not NUMBA_AVAILABLE:
+        warnings.warn(
+            "numba is not installed; using the numpy backend. Install it with "
+            "`pip install nsvb[numba]`",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        name = "numpy"
+    batch._kernel = _evaluate if name == "numba" else None
+    return name
+
+
+def parallel_loops_started() -> bool:
+    """
+    Whether the numba backend has run a parallel loop in this process.
+
+    Its threading layer then has worker threads, and the TBB layer in
+    particular is not safe to fork: a forked process can hang.
+
+    Returns:
+        bool: True once a parallel loop has run.
+    """
+    return _parallel_started
+
+
+def get_backend() -> str:
+    """
+    Backend evaluating the model forms in :mod:`nsvb.batch`.
+
+    Returns:
+        str: "numpy" or "numba".
+    """
+    return "numpy" if batch._kernel is None else "numba"
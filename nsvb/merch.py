@@ -0,0 +1,105 @@
+from collections import namedtuple
+
+import numpy as np
+
+from nsvb.batch import _as_arrays, _run_model_form, ratio_coefficients
+from nsvb.models import cumulative_volume_ratio_array
+from nsvb.profile import solve_height
+from nsvb.tables import compiled_species
+
+MerchSpec = namedtuple(
+    "MerchSpec", ["name", "top_dia", "stump_ht", "min_dia"], defaults=(1.0, 0.0)
+)
+MerchSpec.__doc__ = """
+Merchandising specification of a product.
+
+Attributes:
+    name (str): Name of the result.
+    top_dia (float or tuple): Outside-bark top diameter in inches (in), or a
+        (softwood, hardwood) pair.
+    stump_ht (float): Stump height in feet (ft). Default is 1.
+    min_dia (float or tuple): Minimum diameter of merchantable trees in
+        inches (in), or a (softwood, hardwood) pair. Default is 0.
+"""
+
+# FIA merchantable bole: 1-ft stump to a 4-in top on trees of 5 in and up.
+MERCHANTABLE = MerchSpec("v_merch", 4.0, 1.0, 5.0)
+
+# FIA sawlog: 1-ft stump to a 7-in (softwood) or 9-in (hardwood) top on trees
+# of 9 in (softwood) or 11 in (hardwood) and up.
+SAWLOG = MerchSpec("v_saw", (7.0, 9.0), 1.0, (9.0, 11.0))
+
+
+def _by_wood(value, hardwood) -> np.ndarray:
+    """
+    Per-tree value of a specification field that may be a (softwood,
+    hardwood) pair.
+    """
+    if isinstance(value, tuple):
+        return np.where(hardwood, value[1], value[0])
+    return np.full(hardwood.shape, float(value))
+
+
+def merchantable_volumes(
+    spcd, dia, ht, division="", specs=(MERCHANTABLE,), errors="raise"
+) -> dict:
+    """
+    Gross merchantable stem inside-bark wood volume for several
+    merchandising specifications in a single pass.
+
+    The height to each top diameter (outside bark) is solved with
+    :func:`nsvb.profile.solve_height` on the stem profile implied by the
+    outside-bark cumulative volume ratio model (Table S4) and total
+    outside-bark volume. The volume between the stump and that height is
+    then the total inside-bark volume times the difference of the
+    inside-bark cumulative ratios (Table S5). Trees below the minimum
+    diameter, or smaller than the top diameter, have no merchantable
+    volume.
+
+    Species, coefficients and total volumes are resolved once for all
+    specifications.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        specs (iterable, optional): :class:`MerchSpec` of each product.
+            Default is :data:`MERCHANTABLE`.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+
+    Returns:
+        dict: Merchantable volume arrays in cubic feet, keyed by spec name.
+    """
+    if errors not in ("raise", "nan"):
+        raise ValueError(f"errors must be 'raise' or 'nan', not {errors!r}")
+    strict = errors == "raise"
+
+    spcd, dia, ht, division = _as_arrays(spcd, dia, ht, division)
+    species = compiled_species()
+    slots = species.slots(spcd, strict)
+    hardwood = species.hardwood[slots]
+
+    v_tot_ib = _run_model_form("s1", slots, dia, ht, division, strict)
+    v_tot_ob = v_tot_ib + _run_model_form("s2", slots, dia, ht, division, strict)
+    alpha_ob, beta_ob = ratio_coefficients("s4", slots, division, strict)
+    alpha_ib, beta_ib = ratio_coefficients("s5", slots, division, strict)
+
+    results = {}
+    for spec in specs:
+        top_dia = _by_wood(spec.top_dia, hardwood)
+        min_dia = _by_wood(spec.min_dia, hardwood)
+        stump_ht = np.full(dia.shape, float(spec.stump_ht))
+
+        top_ht, _ = solve_height(top_dia, ht, v_tot_ob, alpha_ob, beta_ob)
+        found = ~np.isnan(top_ht)
+        ratio = cumulative_volume_ratio_array(
+            top_ht, ht, alpha_ib, beta_ib
+        ) - cumulative_volume_ratio_array(stump_ht, ht, alpha_ib, beta_ib)
+        merchantable = found & (dia >= min_dia) & (dia >= top_dia) & (top_ht > stump_ht)
+        volume = np.where(merchantable, v_tot_ib * ratio, 0.0)
+        volume[np.isnan(v_tot_ob) | np.isnan(alpha_ib)] = np.nan
+        results[spec.name] = volume
+    return results
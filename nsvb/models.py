@@ -1,5 +1,7 @@
 from math import exp
 
+import numpy as np
+
 
 def schumacher_hall_method(dia: float, ht: float, **kwargs) -> float:
     """
@@ -125,3 +127,194 @@ MODEL_MAP = {
     4: modifed_wiley_model,
     5: modified_schumaker_hall,
 }
+
+
+def schumacher_hall_method_array(dia, ht, a, b, c, e=0, **kwargs):
+    """
+    Schumacher-Hall Method over arrays of trees.
+
+    Array counterpart of :func:`schumacher_hall_method`. The coefficients may
+    be scalars or arrays broadcast against ``dia`` and ``ht``.
+
+    Parameters:
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+        a (float or np.ndarray): Coefficient.
+        b (float or np.ndarray): Exponent for diameter.
+        c (float or np.ndarray): Exponent for height.
+        e (array_like, optional): Constant. Default is 0.
+    """
+    return a * (dia**b) * (ht**c) + e
+
+
+def segmented_model_array(dia, ht, a, b, b1, c, k, e=0, **kwargs):
+    """
+    Segmented Model over arrays of trees.
+
+    Array counterpart of :func:`segmented_model`. The ``k`` threshold is
+    applied by masking the trees on either side of it.
+
+    Parameters:
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+        a (float or np.ndarray): Coefficient.
+        b (float or np.ndarray): Exponent for diameter for dia < k.
+        b1 (float or np.ndarray): Exponent for diameter for dia >= k.
+        c (float or np.ndarray): Exponent for height.
+        k (float or np.ndarray): Segment threshold.
+        e (array_like, optional): Constant. Default is 0.
+    """
+    dia, ht, a, b, b1, c, k, e = np.broadcast_arrays(dia, ht, a, b, b1, c, k, e)
+    out = np.empty(dia.shape, dtype=np.result_type(dia, a, 1.0))
+    small = dia < k
+    large = ~small
+    out[small] = (
+        a[small] * (dia[small] ** b[small]) * (ht[small] ** c[small]) + e[small]
+    )
+    out[large] = (
+        a[large]
+        * (k[large] ** (b[large] - b1[large]))
+        * (dia[large] ** b1[large])
+        * (ht[large] ** c[large])
+        + e[large]
+    )
+    return out
+
+
+def continuously_variable_model_array(dia, ht, a, a1, b, c, c1, e=0, **kwargs):
+    """
+    Continuously Variable Model over arrays of trees.
+
+    Array counterpart of :func:`continuously_variable_model`.
+
+    Parameters:
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+        a (float or np.ndarray): Coefficient.
+        a1 (float or np.ndarray): Coefficient.
+        b (float or np.ndarray): Exponent for diameter.
+        c (float or np.ndarray): Exponent for height.
+        c1 (float or np.ndarray): Exponent.
+        e (array_like, optional): Constant. Default is 0.
+    """
+    return a * (a1 * ((1 - np.exp(-b * dia)) ** c1)) * (ht**c) + e
+
+
+def modifed_wiley_model_array(dia, ht, a, b, b1, c, e=0, **kwargs):
+    """
+    Modified Wiley Model over arrays of trees.
+
+    Array counterpart of :func:`modifed_wiley_model`.
+
+    Parameters:
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+        a (float or np.ndarray): Coefficient.
+        b (float or np.ndarray): Exponent for diameter.
+        b1 (float or np.ndarray): Exponent.
+        c (float or np.ndarray): Exponent for height.
+        e (array_like, optional): Constant. Default is 0.
+    """
+    return a * (dia**b) * (ht**c) * np.exp(-(b1 * dia)) + e
+
+
+def modified_schumaker_hall_array(dia, ht, a, b, c, wdsg, e=0, **kwargs):
+    """
+    Modified Schumacher-Hall Method over arrays of trees.
+
+    Array counterpart of :func:`modified_schumaker_hall`.
+
+    Parameters:
+        dia (np.ndarray): Diameters of the trees.
+        ht (np.ndarray): Heights of the trees.
+        a (float or np.ndarray): Coefficient.
+        b (float or np.ndarray): Exponent for diameter.
+        c (float or np.ndarray): Exponent for height.
+        wdsg (float or np.ndarray): Wood specific gravity.
+        e (array_like, optional): Constant. Default is 0.
+    """
+    return a * (dia**b) * (ht**c) * wdsg + e
+
+
+# Array kernels keyed by the same model number as MODEL_MAP, so batch callers
+# can evaluate every tree that uses a model form with one call.
+ARRAY_MODEL_MAP = {
+    1: schumacher_hall_method_array,
+    2: segmented_model_array,
+    3: continuously_variable_model_array,
+    4: modifed_wiley_model_array,
+    5: modified_schumaker_hall_array,
+}
+
+
+def cumulative_volume_ratio(h: float, ht: float, **kwargs) -> float:
+    """
+    Cumulative Volume Ratio Model.
+
+    Ratio of the stem volume from the ground up to height ``h`` to the total
+    stem volume. Model 6 of Tables S4 (outside bark) and S5 (inside bark).
+
+    Parameters:
+        h (float): Height along the stem.
+        ht (float): Height of the tree.
+        alpha (float): Exponent for the relative distance from the tip.
+        beta (float): Exponent for the ratio.
+    """
+    alpha = kwargs.get("alpha")
+    beta = kwargs.get("beta")
+    return (1 - (1 - h / ht) ** alpha) ** beta
+
+
+def cumulative_volume_ratio_array(h, ht, alpha, beta, **kwargs):
+    """
+    Cumulative Volume Ratio Model over arrays of trees.
+
+    Array counterpart of :func:`cumulative_volume_ratio`. Heights are clipped
+    to the stem, so the ratio is 0 below the ground and 1 above the tip.
+
+    Parameters:
+        h (np.ndarray): Heights along the stems.
+        ht (np.ndarray): Heights of the trees.
+        alpha (float or np.ndarray): Exponent for the relative distance from
+            the tip.
+        beta (float or np.ndarray): Exponent for the ratio.
+    """
+    u = 1 - np.clip(h / ht, 0, 1)
+    return (1 - u**alpha) ** beta
+
+
+def cumulative_volume_ratio_slope_array(h, ht, alpha, beta, **kwargs):
+    """
+    Derivative of the Cumulative Volume Ratio Model with respect to height.
+
+    The derivative of the cumulative volume, i.e. the total volume times this
+    slope, is the cross-sectional area of the stem at height ``h``.
+
+    Parameters:
+        h (np.ndarray): Heights along the stems, strictly inside the stem.
+        ht (np.ndarray): Heights of the trees.
+        alpha (float or np.ndarray): Exponent for the relative distance from
+            the tip.
+        beta (float or np.ndarray): Exponent for the ratio.
+    """
+    u = 1 - h / ht
+    ua = u**alpha
+    return alpha * beta * (1 - ua) ** (beta - 1) * ua / u / ht
+
+
+def cumulative_volume_ratio_curvature_array(h, ht, alpha, beta, **kwargs):
+    """
+    Second derivative of the Cumulative Volume Ratio Model with respect to
+    height, i.e. the derivative of :func:`cumulative_volume_ratio_slope_array`.
+
+    Parameters:
+        h (np.ndarray): Heights along the stems, strictly inside the stem.
+        ht (np.ndarray): Heights of the trees.
+        alpha (float or np.ndarray): Exponent for the relative distance from
+            the tip.
+        beta (float or np.ndarray): Exponent for the ratio.
+    """
+    u = 1 - h / ht
+    ua = u**alpha
+    shape = (alpha - 1) * (1 - ua) - alpha * (beta - 1) * ua
+    return -alpha * beta * (1 - ua) ** (beta - 2) * ua / u**2 * shape / ht**2
@@ -0,0 +1,435 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from nsvb.batch import EncodedDivisions, _as_arrays, _float_dtype, estimate_trees
+from nsvb.estimators import COMPONENTS
+from nsvb.store import STORE_TABLES, CoefficientStore, install_store, pack_store
+from nsvb.tables import (
+    compiled_carbon_fractions,
+    compiled_crown_ratios,
+    compiled_species,
+    compiled_table,
+    compiled_wood_density_proportions,
+)
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Trees per chunk of estimate_trees_threaded, large enough that the NumPy
+# kernels, which release the GIL, dominate the per-chunk Python overhead.
+DEFAULT_THREAD_CHUNK_SIZE = 1 << 16
+
+# Shared memory blocks and array views attached by each worker process.
+_worker = {}
+
+
+def _layout(arrays) -> tuple:
+    """
+    Lay out arrays back to back, each aligned to 64 bytes.
+
+    Parameters:
+        arrays (dict): (dtype, shape) pairs keyed by name.
+
+    Returns:
+        tuple: Specs of (dtype, shape, offset) keyed by name, and the total
+        size in bytes.
+    """
+    specs = {}
+    offset = 0
+    for name, (dtype, shape) in arrays.items():
+        specs[name] = (np.dtype(dtype).str, shape, offset)
+        nbytes = np.dtype(dtype).itemsize * int(np.prod(shape))
+        offset = -(-(offset + nbytes) // 64) * 64
+    return specs, max(offset, 1)
+
+
+def _views(buffer, specs) -> dict:
+    """
+    View the arrays of a layout in a buffer.
+
+    Parameters:
+        buffer (buffer): Shared memory buffer.
+        specs (dict): Specs from :func:`_layout`.
+
+    Returns:
+        dict: Arrays keyed by name.
+    """
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        for name, (dtype, shape, offset) in specs.items()
+    }
+
+
+def _init_worker(store_name, data_name, specs, categories):
+    """
+    Attach a worker to the shared coefficient store and tree columns.
+
+    Parameters:
+        store_name (str): Shared memory block of the packed store.
+        data_name (str): Shared memory block of the inputs and outputs.
+        specs (dict): Layout of the data block.
+        categories (dict): Categories of the dictionary-encoded code
+            columns, keyed by name.
+    """
+    store_block = shared_memory.SharedMemory(store_name)
+    data_block = shared_memory.SharedMemory(data_name)
+    install_store(CoefficientStore.from_buffer(store_block.buf))
+    _worker["blocks"] = (store_block, data_block)
+    _worker["arrays"] = _views(data_block.buf, specs)
+    _worker["categories"] = categories
+
+
+def _run_chunk(start, stop, components, errors, dtype):
+    """
+    Estimate one chunk of trees in a worker and write the results into the
+    shared output columns.
+
+    Parameters:
+        start (int): First tree of the chunk.
+        stop (int): End of the chunk (exclusive).
+        components (tuple): Component names.
+        errors (str): "raise" or "nan".
+        dtype (np.dtype): Floating point dtype of the run.
+    """
+    arrays = _worker["arrays"]
+    chunk = {name: array[start:stop] for name, array in arrays.items() if name != "out"}
+    for name, categories in _worker["categories"].items():
+        chunk[name] = EncodedDivisions(chunk[name], categories)
+
+    results = estimate_trees(**chunk, components=components, errors=errors, dtype=dtype)
+    out = arrays["out"]
+    for i, name in enumerate(components):
+        out[i, start:stop] = results[name]
+
+
+def _mp_context():
+    """
+    Start method of the worker processes.
+
+    The platform default, except once the numba backend has run parallel
+    loops in this process: forking its threading layer can hang, so workers
+    are started from a fork server instead.
+
+    Returns:
+        multiprocessing.context.BaseContext or None: The context, or None
+        for the default.
+    """
+    jit = sys.modules.get("nsvb.jit")
+    if jit is None or not jit.parallel_loops_started():
+        return None
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+def estimate_trees_parallel(
+    spcd,
+    dia,
+    ht,
+    division="",
+    cull=0,
+    components=None,
+    errors="raise",
+    processes: int = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    decaycd=0,
+    actual_ht=np.nan,
+    cr=np.nan,
+    province=None,
+    dtype=np.float64,
+) -> dict:
+    """
+    Run :func:`nsvb.batch.estimate_trees` across a pool of worker processes.
+
+    The compiled coefficient store and the tree columns are published once
+    through shared memory. Workers attach to them when they start, so no
+    per-tree data is pickled and no coefficient table is rebuilt. Each
+    worker estimates contiguous chunks of trees and writes the results
+    directly into a shared output buffer. Chunk boundaries depend only on
+    the number of trees and ``chunk_size``, and every tree is computed
+    exactly as by ``estimate_trees``, so results do not depend on the number
+    of processes or on scheduling. With ``errors="raise"`` the error of the
+    first failing chunk is raised.
+
+    Once the numba backend of :mod:`nsvb.jit` has run parallel loops in this
+    process, workers are started from a fork server rather than forked, so
+    scripts must then guard their entry point with
+    ``if __name__ == "__main__":``. Workers evaluate with the NumPy backend.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        cull (array_like, optional): Rotten and missing cull in percent.
+            Default is 0.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to return. Default is all of
+            them.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+        processes (int, optional): Number of worker processes. Default is
+            the number of CPUs.
+        chunk_size (int, optional): Number of trees per chunk. Default is
+            1,000,000.
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 for live trees. Default is 0.
+        actual_ht (array_like, optional): Actual heights of broken-top trees
+            in feet (ft). Default is NaN.
+        cr (array_like, optional): Observed crown ratios in percent. Default
+            is NaN.
+        province (array_like or EncodedDivisions, optional): Province codes
+            for Table S11. Default is the division codes.
+        dtype (np.dtype, optional): np.float64 or np.float32, as for
+            :func:`nsvb.batch.estimate_trees`. Default is np.float64.
+
+    Returns:
+        dict: Component arrays keyed by component name.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown components: {', '.join(sorted(unknown))}")
+    if errors not in ("raise", "nan"):
+        raise ValueError(f"errors must be 'raise' or 'nan', not {errors!r}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    dtype = _float_dtype(dtype)
+
+    spcd, dia, ht, division, cull, decaycd, actual_ht, cr = _as_arrays(
+        spcd, dia, ht, division, cull, decaycd, actual_ht, cr, dtype=dtype
+    )
+    n = len(spcd)
+    inputs = {
+        "spcd": spcd,
+        "dia": dia,
+        "ht": ht,
+        "cull": cull,
+        "decaycd": decaycd,
+        "actual_ht": actual_ht,
+        "cr": cr,
+        "division": division,
+    }
+    if province is not None:
+        if not isinstance(province, EncodedDivisions):
+            province = np.broadcast_to(np.asarray(province).astype(str), (n,))
+        inputs["province"] = province
+    categories = {}
+    for name in ("division", "province"):
+        if isinstance(inputs.get(name), EncodedDivisions):
+            categories[name] = inputs[name].categories
+            inputs[name] = inputs[name].indices
+
+    specs, size = _layout(
+        {
+            **{name: (array.dtype, array.shape) for name, array in inputs.items()},
+            "out": (dtype, (len(components), n)),
+        }
+    )
+    packed = pack_store(
+        compiled_species(),
+        {name: compiled_table(name) for name in STORE_TABLES},
+        carbon_fractions=compiled_carbon_fractions(),
+        wood_density_proportions=compiled_wood_density_proportions(),
+        crown_ratios=compiled_crown_ratios(),
+    )
+
+    store_block = shared_memory.SharedMemory(create=True, size=len(packed))
+    data_block = shared_memory.SharedMemory(create=True, size=size)
+    arrays = None
+    try:
+        store_block.buf[: len(packed)] = packed
+        arrays = _views(data_block.buf, specs)
+        for name, array in inputs.items():
+            arrays[name][...] = array
+
+        bounds = [
+            (start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)
+        ]
+        processes = min(processes or os.cpu_count() or 1, max(len(bounds), 1))
+        with ProcessPoolExecutor(
+            processes,
+            mp_context=_mp_context(),
+            initializer=_init_worker,
+            initargs=(store_block.name, data_block.name, specs, categories),
+        ) as pool:
+            futures = [
+                pool.submit(_run_chunk, start, stop, components, errors, dtype)
+                for start, stop in bounds
+            ]
+            try:
+                for future in futures:
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        out = arrays["out"].copy()
+    finally:
+        # The views must be released before the blocks can be closed.
+        arrays = None
+        for block in (store_block, data_block):
+            block.close()
+            block.unlink()
+
+    return {name: out[i] for i, name in enumerate(components)}
+
+
+def _encode_codes(values) -> EncodedDivisions:
+    """
+    Dictionary-encode division or province codes once for every chunk and
+    coefficient table.
+
+    Codes are encoded against the divisions of the coefficient tables and
+    the Table S11 provinces; any other code resolves like a missing one in
+    every table and gets index -1.
+
+    Parameters:
+        values (np.ndarray or EncodedDivisions): Codes of each tree.
+
+    Returns:
+        EncodedDivisions: The encoded codes; encoded input is returned as is.
+    """
+    if isinstance(values, EncodedDivisions):
+        return values
+    known = [compiled_table(name).divisions for name in STORE_TABLES]
+    known.append(compiled_crown_ratios().provinces)
+    categories = np.unique(np.concatenate(known).astype(str))
+    indices = np.searchsorted(categories, values)
+    indices[indices == len(categories)] = 0
+    indices[categories[indices] != values] = -1
+    return EncodedDivisions(indices, categories)
+
+
+def estimate_trees_threaded(
+    spcd,
+    dia,
+    ht,
+    division="",
+    cull=0,
+    components=None,
+    errors="raise",
+    threads: int = None,
+    chunk_size: int = DEFAULT_THREAD_CHUNK_SIZE,
+    decaycd=0,
+    actual_ht=np.nan,
+    cr=np.nan,
+    province=None,
+    dtype=np.float64,
+) -> dict:
+    """
+    Run :func:`nsvb.batch.estimate_trees` across a pool of threads in this
+    process.
+
+    The batch pipeline only reads the compiled coefficient tables, which are
+    read-only arrays, and every chunk writes to its own slice of the output
+    columns, so threads share no mutable state. The NumPy kernels release
+    the GIL while they run, so chunks are estimated concurrently without the
+    start-up cost of worker processes or copies of the inputs, and without
+    the GIL at all on free-threaded builds of CPython. String division and
+    province codes are dictionary-encoded once up front, so each chunk only
+    maps the categories per table.
+
+    Gathering coefficients by species and division still holds the GIL, so
+    the engine does not scale with the number of threads on stages that
+    gather rather than compute; how much it gains depends on the components
+    and on the cores available. As with
+    :func:`estimate_trees_parallel`, results do not depend on the number of
+    threads, and with ``errors="raise"`` the error of the first failing
+    chunk is raised.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        cull (array_like, optional): Rotten and missing cull in percent.
+            Default is 0.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS` to return. Default is all of
+            them.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+        threads (int, optional): Number of threads. Default is the number of
+            CPUs.
+        chunk_size (int, optional): Number of trees per chunk. Default is
+            65,536.
+        decaycd (array_like, optional): Decay codes (1-5) of dead trees, or
+            0 for live trees. Default is 0.
+        actual_ht (array_like, optional): Actual heights of broken-top trees
+            in feet (ft). Default is NaN.
+        cr (array_like, optional): Observed crown ratios in percent. Default
+            is NaN.
+        province (array_like or EncodedDivisions, optional): Province codes
+            for Table S11. Default is the division codes.
+        dtype (np.dtype, optional): np.float64 or np.float32, as for
+            :func:`nsvb.batch.estimate_trees`. Default is np.float64.
+
+    Returns:
+        dict: Component arrays keyed by component name.
+    """
+    components = COMPONENTS if components is None else tuple(components)
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown components: {', '.join(sorted(unknown))}")
+    if errors not in ("raise", "nan"):
+        raise ValueError(f"errors must be 'raise' or 'nan', not {errors!r}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    dtype = _float_dtype(dtype)
+
+    spcd, dia, ht, division, cull, decaycd, actual_ht, cr = _as_arrays(
+        spcd, dia, ht, division, cull, decaycd, actual_ht, cr, dtype=dtype
+    )
+    n = len(spcd)
+    inputs = {
+        "spcd": spcd,
+        "dia": dia,
+        "ht": ht,
+        "division": _encode_codes(division),
+        "cull": cull,
+        "decaycd": decaycd,
+        "actual_ht": actual_ht,
+        "cr": cr,
+    }
+    if province is not None:
+        if not isinstance(province, EncodedDivisions):
+            province = np.broadcast_to(np.asarray(province).astype(str), (n,))
+        inputs["province"] = _encode_codes(province)
+    out = np.empty((len(components), n), dtype=dtype)
+
+    def run_chunk(start, stop):
+        chunk = {name: array[start:stop] for name, array in inputs.items()}
+        results = estimate_trees(
+            **chunk, components=components, errors=errors, dtype=dtype
+        )
+        for i, name in enumerate(components):
+            out[i, start:stop] = results[name]
+
+    # Compile the coefficient tables once up front rather than in every
+    # thread that first needs them.
+    compiled_species()
+    for name in STORE_TABLES:
+        compiled_table(name)
+
+    bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    threads = min(threads or os.cpu_count() or 1, max(len(bounds), 1))
+    with ThreadPoolExecutor(threads) as pool:
+        futures = [pool.submit(run_chunk, start, stop) for start, stop in bounds]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    return {name: out[i] for i, name in enumerate(components)}
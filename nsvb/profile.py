@@ -0,0 +1,186 @@
+from collections import namedtuple
+from math import pi
+
+import numpy as np
+
+from nsvb.batch import _as_arrays, _run_model_form, ratio_coefficients
+from nsvb.models import (
+    cumulative_volume_ratio_curvature_array,
+    cumulative_volume_ratio_slope_array,
+)
+from nsvb.tables import compiled_species
+
+# Cubic feet per foot of stem length per square inch of diameter, i.e. the
+# cross-sectional area in ft^2 of a stem 1 in in diameter.
+FOOT_CUBED_PER_INCH_SQUARED = pi / 576
+
+SolverInfo = namedtuple("SolverInfo", ["iterations", "converged", "residual"])
+SolverInfo.__doc__ = """
+Convergence diagnostics of :func:`solve_height`.
+
+Attributes:
+    iterations (int): Iterations run for the batch.
+    converged (np.ndarray): True for trees whose height converged, False for
+        trees that did not converge or never reach the diameter.
+    residual (np.ndarray): Absolute difference in inches (in) between the
+        stem diameter at the returned height and the target diameter (NaN
+        where the stem never reaches the diameter).
+"""
+
+
+def stem_diameter(h, ht, v_tot, alpha, beta) -> np.ndarray:
+    """
+    Stem diameter implied by the cumulative volume ratio model.
+
+    The cross-sectional area at height ``h`` is the derivative of the
+    cumulative volume, ``v_tot * dR/dh``.
+
+    Parameters:
+        h (np.ndarray): Heights along the stems in feet (ft).
+        ht (np.ndarray): Heights of the trees in feet (ft).
+        v_tot (np.ndarray): Total stem volume in cubic feet, outside bark for
+            the S4 coefficients and inside bark for S5.
+        alpha (np.ndarray): Ratio model exponent.
+        beta (np.ndarray): Ratio model exponent.
+
+    Returns:
+        np.ndarray: Stem diameters in inches (in).
+    """
+    slope = cumulative_volume_ratio_slope_array(h, ht, alpha, beta)
+    return np.sqrt(v_tot * slope / FOOT_CUBED_PER_INCH_SQUARED)
+
+
+def solve_height(
+    target_dia, ht, v_tot, alpha, beta, tol: float = 1e-10, max_iter: int = 100
+) -> tuple:
+    """
+    Height at which each stem tapers to a diameter, solved for all trees at
+    once.
+
+    Each iteration takes a Newton step on the cross-sectional area, using
+    the analytic derivative of the ratio slope, for every unconverged tree.
+    Steps that leave the bracket around the root fall back to bisection, so
+    every tree converges. Converged trees drop out of later iterations.
+
+    With beta <= 1 the implied diameter decreases from the ground to the
+    tip. With beta > 1 it first rises to a peak, and the root above the
+    peak is taken.
+
+    Parameters:
+        target_dia (array_like): Diameters in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        v_tot (array_like): Total stem volume in cubic feet, outside bark
+            with the S4 coefficients and inside bark with S5.
+        alpha (array_like): Ratio model exponent.
+        beta (array_like): Ratio model exponent.
+        tol (float, optional): Convergence tolerance relative to the tree
+            height. Default is 1e-10.
+        max_iter (int, optional): Maximum number of iterations. Default is
+            100.
+
+    Returns:
+        tuple: Heights in feet (ft), NaN where the stem never reaches the
+        diameter, and the :class:`SolverInfo` of the batch.
+    """
+    arrays = np.broadcast_arrays(target_dia, ht, v_tot, alpha, beta)
+    target_dia, ht, v_tot, alpha, beta = (
+        np.ravel(np.asarray(array, dtype=np.float64)) for array in arrays
+    )
+    target_area = FOOT_CUBED_PER_INCH_SQUARED * target_dia**2
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # Relative distance from the tip at the peak of the profile, which
+        # is at the ground for beta <= 1.
+        u_peak = ((alpha - 1) / ((alpha - 1) + (beta - 1) * alpha)) ** (1 / alpha)
+        lo = np.where(beta > 1, (1 - u_peak) * ht, 0.0)
+        hi = ht.copy()
+        peak_area = v_tot * cumulative_volume_ratio_slope_array(lo, ht, alpha, beta)
+        reachable = (beta <= 1) | (peak_area >= target_area)
+        reachable &= np.isfinite(v_tot + alpha + beta + ht + target_dia) & (ht > 0)
+        h = (lo + hi) / 2
+
+        active = np.flatnonzero(reachable)
+        iterations = 0
+        while active.size and iterations < max_iter:
+            iterations += 1
+            args = (ht[active], alpha[active], beta[active])
+            x, v = h[active], v_tot[active]
+            f = v * cumulative_volume_ratio_slope_array(x, *args) - target_area[active]
+            df = v * cumulative_volume_ratio_curvature_array(x, *args)
+
+            # The area decreases through the root: above the target the root
+            # is higher up the stem.
+            x_lo = np.where(f > 0, x, lo[active])
+            x_hi = np.where(f > 0, hi[active], x)
+            step = x - f / df
+            inside = (step >= x_lo) & (step <= x_hi)
+            new = np.where(inside, step, (x_lo + x_hi) / 2)
+            new[f == 0] = x[f == 0]
+
+            lo[active], hi[active], h[active] = x_lo, x_hi, new
+            scale = tol * args[0]
+            done = (np.abs(new - x) <= scale) | (x_hi - x_lo <= scale) | (f == 0)
+            active = active[~done]
+
+        converged = reachable.copy()
+        converged[active] = False
+        h[~reachable] = np.nan
+        residual = np.abs(stem_diameter(h, ht, v_tot, alpha, beta) - target_dia)
+    return h, SolverInfo(iterations, converged, residual)
+
+
+def height_to_diameter(
+    spcd,
+    dia,
+    ht,
+    top_dia,
+    division="",
+    bark="ob",
+    errors="raise",
+    tol: float = 1e-10,
+    max_iter: int = 100,
+) -> tuple:
+    """
+    Height at which each stem reaches a given outside- or inside-bark
+    diameter.
+
+    The stem profile is the derivative of the cumulative volume ratio model
+    times the total volume: Table S4 with total outside-bark volume for
+    outside-bark diameters, and Table S5 with total inside-bark volume for
+    inside-bark diameters.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        top_dia (array_like): Diameters to solve for in inches (in).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        bark (str, optional): "ob" for outside-bark or "ib" for inside-bark
+            diameters. Default is "ob".
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+        tol (float, optional): Convergence tolerance relative to the tree
+            height. Default is 1e-10.
+        max_iter (int, optional): Maximum number of iterations. Default is
+            100.
+
+    Returns:
+        tuple: Heights in feet (ft) and the :class:`SolverInfo` of the batch,
+        as for :func:`solve_height`.
+    """
+    if bark not in ("ob", "ib"):
+        raise ValueError(f"bark must be 'ob' or 'ib', not {bark!r}")
+    if errors not in ("raise", "nan"):
+        raise ValueError(f"errors must be 'raise' or 'nan', not {errors!r}")
+    strict = errors == "raise"
+
+    spcd, dia, ht, division, top_dia = _as_arrays(spcd, dia, ht, division, top_dia)
+    slots = compiled_species().slots(spcd, strict)
+    v_tot = _run_model_form("s1", slots, dia, ht, division, strict)
+    if bark == "ob":
+        v_tot = v_tot + _run_model_form("s2", slots, dia, ht, division, strict)
+    alpha, beta = ratio_coefficients(
+        "s4" if bark == "ob" else "s5", slots, division, strict
+    )
+    return solve_height(top_dia, ht, v_tot, alpha, beta, tol, max_iter)
@@ -0,0 +1,460 @@
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from nsvb.tables import (
+    DATA_PATH,
+    REF_SPECIES,
+    TABLES,
+    WOOD_DENSITY_PROPORTIONS,
+    CompiledCrownRatios,
+    CompiledSpecies,
+    CompiledTable,
+    compile_carbon_fractions,
+    compile_crown_ratios,
+    compile_species,
+    compile_table,
+    compile_wood_density_proportions,
+)
+
+MAGIC = b"NSVBCOEF"
+STORE_VERSION = 3
+
+# Packed store shipped with the package, if any. It is only used when its
+# content hash matches the CSVs in the data directory.
+PACKAGED_STORE = "coefficients.nsvb"
+
+# Components whose compiled coefficient tables are packed into the store.
+STORE_TABLES = ("s1", "s2", "s4", "s5", "s6", "s7", "s8", "s9")
+
+# Lookup tables packed into the store next to the coefficient tables.
+STORE_LOOKUPS = ("s10a", "s10b", "s11")
+
+# Alignment of the header end and of every array in the file, in bytes.
+_ALIGNMENT = 64
+_PREAMBLE = len(MAGIC) + 8
+
+
+class CoefficientStore:
+    """
+    Compiled species columns, coefficient tables and lookup tables backed by
+    a read-only memory map of a packed store file.
+
+    The file starts with ``MAGIC``, the store version and the header length
+    (two little-endian uint32), followed by a JSON header and the arrays in
+    fixed-width little-endian layout, each aligned to 64 bytes. The arrays
+    are views of the mapping, so processes that open the same file share
+    one page-cache copy.
+
+    The store serves the dense arrays of the vectorized paths
+    (:func:`~nsvb.tables.compiled_species`,
+    :func:`~nsvb.tables.compiled_table` and the compiled carbon fraction,
+    wood density and crown ratio tables). The scalar estimators and
+    :class:`~nsvb.estimators.TreeModel` resolve single trees from the
+    lazily parsed CSV tables and do not read the store.
+
+    Attributes:
+        path (Path): Store file, or None for a store opened from a buffer.
+        digest (str): Content hash of the source CSVs the store was built
+            from.
+        species (CompiledSpecies): Dense per-species columns.
+        tables (dict): Compiled coefficient tables keyed by table name.
+        carbon_fractions (np.ndarray): Dense carbon fractions of Tables S10a
+            and S10b.
+        wood_density_proportions (np.ndarray): Dense wood density
+            proportions of Table 1.
+        crown_ratios (CompiledCrownRatios): Mean crown ratios of Table S11.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._read(self._mmap)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Open a packed store held in memory, e.g. a shared memory block.
+
+        Parameters:
+            buffer (buffer): Bytes of a packed store file. The arrays are
+                views of the buffer, which must outlive the store.
+
+        Returns:
+            CoefficientStore: The store, with ``path`` set to None.
+        """
+        store = cls.__new__(cls)
+        store.path = None
+        store._read(buffer)
+        return store
+
+    def _read(self, buffer):
+        name = self.path or "buffer"
+        preamble = bytes(buffer[:_PREAMBLE])
+        if preamble[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{name} is not an nsvb coefficient store")
+        version, header_size = np.frombuffer(preamble, "<u4", offset=len(MAGIC))
+        if version != STORE_VERSION:
+            raise ValueError(f"{name} has store version {version}")
+        header_end = _PREAMBLE + int(header_size)
+        header = json.loads(bytes(buffer[_PREAMBLE:header_end]))
+        data_start = _align(header_end)
+
+        self.digest = header["digest"]
+        arrays = {
+            name: _read_only(
+                np.frombuffer(
+                    buffer,
+                    dtype=spec["dtype"],
+                    count=int(np.prod(spec["shape"])),
+                    offset=data_start + spec["offset"],
+                ).reshape(spec["shape"])
+            )
+            for name, spec in header["arrays"].items()
+        }
+        self.species = CompiledSpecies(
+            arrays["species/spcd"],
+            arrays["species/wdsg"],
+            arrays["species/hardwood"],
+            arrays["species/jenkins_spgrpcd"],
+            index=arrays["species/index"],
+        )
+        self.tables = {
+            name: CompiledTable(
+                name,
+                arrays[f"{name}/model"],
+                arrays[f"{name}/coefficients"],
+                np.array(divisions),
+                arrays[f"{name}/lookup"],
+            )
+            for name, divisions in header["divisions"].items()
+        }
+        self.carbon_fractions = arrays["carbon/fractions"]
+        self.wood_density_proportions = arrays["density/proportions"]
+        self.crown_ratios = CompiledCrownRatios(
+            np.array(header["provinces"]), arrays["crown/ratios"]
+        )
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def source_files() -> list:
+    """
+    Data files the packed store is built from.
+
+    Returns:
+        list: File names in the data directory.
+    """
+    names = [REF_SPECIES.filename, WOOD_DENSITY_PROPORTIONS.filename]
+    for table_name in STORE_TABLES:
+        names += [TABLES[f"{table_name}a"].filename]
+        names += [TABLES[f"{table_name}b"].filename]
+    for table_name in STORE_LOOKUPS:
+        names += [TABLES[table_name].filename]
+    return names
+
+
+def source_digest() -> str:
+    """
+    Content hash of the source CSVs and the store layout version.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256(f"nsvb-store-{STORE_VERSION}".encode())
+    for name in source_files():
+        digest.update(name.encode())
+        digest.update((DATA_PATH / name).read_bytes())
+    return digest.hexdigest()
+
+
+def source_stamp() -> str:
+    """
+    Cheap key of the source CSVs from their names, sizes and modification
+    times, used to skip re-hashing their content at every start.
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    stamp = hashlib.sha256(f"nsvb-store-{STORE_VERSION}".encode())
+    for name in source_files():
+        stat = (DATA_PATH / name).stat()
+        stamp.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return stamp.hexdigest()
+
+
+def cached_source_digest() -> str:
+    """
+    Content hash of the source CSVs, remembered per :func:`source_stamp`.
+
+    The hash is recorded in a small ``digest-<stamp>`` file in the cache
+    directory, so the CSVs are only read again when a file's size or
+    modification time changes. If the record cannot be written, the hash is
+    computed every time.
+
+    Returns:
+        str: Hex SHA-256 digest, as returned by :func:`source_digest`.
+    """
+    path = cache_dir() / f"digest-{source_stamp()[:16]}"
+    try:
+        digest = path.read_text().strip()
+    except OSError:
+        digest = ""
+    if len(digest) == 64:
+        return digest
+
+    digest = source_digest()
+    try:
+        _write_atomic(path, digest.encode())
+    except OSError:
+        pass
+    return digest
+
+
+def pack_store(
+    species=None,
+    tables=None,
+    digest: str = None,
+    carbon_fractions=None,
+    wood_density_proportions=None,
+    crown_ratios=None,
+) -> bytes:
+    """
+    Pack compiled species columns, coefficient tables and lookup tables into
+    the store file layout.
+
+    Parameters:
+        species (CompiledSpecies, optional): Species columns. Default is
+            compiled from the CSVs.
+        tables (dict, optional): Compiled tables keyed by table name. Default
+            is the ``STORE_TABLES`` compiled from the CSVs.
+        digest (str, optional): Content hash to record. Default is the hash
+            of the current source CSVs.
+        carbon_fractions (np.ndarray, optional): Dense carbon fractions.
+            Default is compiled from the CSVs for ``species``.
+        wood_density_proportions (np.ndarray, optional): Dense wood density
+            proportions. Default is compiled from the CSVs.
+        crown_ratios (CompiledCrownRatios, optional): Mean crown ratios.
+            Default is compiled from the CSVs.
+
+    Returns:
+        bytes: The packed store.
+    """
+    if species is None:
+        species = compile_species()
+    if tables is None:
+        tables = {name: compile_table(name, species) for name in STORE_TABLES}
+    if carbon_fractions is None:
+        carbon_fractions = compile_carbon_fractions(species)
+    if wood_density_proportions is None:
+        wood_density_proportions = compile_wood_density_proportions()
+    if crown_ratios is None:
+        crown_ratios = compile_crown_ratios()
+
+    arrays = {
+        "species/spcd": species.spcd,
+        "species/wdsg": species.wdsg,
+        "species/hardwood": species.hardwood,
+        "species/jenkins_spgrpcd": species.jenkins_spgrpcd,
+        "species/index": species.index,
+    }
+    for name, table in tables.items():
+        arrays[f"{name}/model"] = table.model
+        arrays[f"{name}/coefficients"] = table.coefficients
+        arrays[f"{name}/lookup"] = table.lookup
+    arrays["carbon/fractions"] = carbon_fractions
+    arrays["density/proportions"] = wood_density_proportions
+    arrays["crown/ratios"] = crown_ratios.ratios
+
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<"))
+        arrays[name] = array
+        specs[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps(
+        {
+            "digest": digest or source_digest(),
+            "divisions": {name: t.divisions.tolist() for name, t in tables.items()},
+            "provinces": crown_ratios.provinces.tolist(),
+            "arrays": specs,
+        }
+    ).encode()
+    data_start = _align(_PREAMBLE + len(header))
+
+    packed = bytearray(data_start + offset)
+    packed[: len(MAGIC)] = MAGIC
+    packed[len(MAGIC) : _PREAMBLE] = np.array(
+        [STORE_VERSION, len(header)], dtype="<u4"
+    ).tobytes()
+    packed[_PREAMBLE : _PREAMBLE + len(header)] = header
+    for name, array in arrays.items():
+        start = data_start + specs[name]["offset"]
+        packed[start : start + array.nbytes] = array.tobytes()
+    return bytes(packed)
+
+
+def write_store(path, digest: str = None) -> Path:
+    """
+    Compile the species columns, coefficient tables and lookup tables from
+    the CSVs and write them to a packed store file.
+
+    The file is written to a temporary name and moved into place, so
+    concurrent writers and readers never see a partial store.
+
+    Parameters:
+        path (str or Path): Store file to write.
+        digest (str, optional): Content hash to record. Default is the hash
+            of the current source CSVs.
+
+    Returns:
+        Path: The written store file.
+    """
+    path = Path(path)
+    _write_atomic(path, pack_store(digest=digest))
+    return path
+
+
+def _write_atomic(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def cache_dir() -> Path:
+    """
+    Directory for store files built on first use.
+
+    ``NSVB_CACHE_DIR`` if set, otherwise ``nsvb`` under ``XDG_CACHE_HOME``
+    (default ``~/.cache``).
+
+    Returns:
+        Path: Cache directory.
+    """
+    if os.environ.get("NSVB_CACHE_DIR"):
+        return Path(os.environ["NSVB_CACHE_DIR"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "nsvb"
+
+
+def open_store(path, digest: str):
+    """
+    Open a store file if it exists and was built from matching sources.
+
+    Parameters:
+        path (str or Path): Store file.
+        digest (str): Expected content hash of the source CSVs.
+
+    Returns:
+        CoefficientStore or None: The store, or None if the file is missing,
+        invalid or stale.
+    """
+    try:
+        store = CoefficientStore(path)
+    except (OSError, ValueError):
+        return None
+    return store if store.digest == digest else None
+
+
+# Store set by install_store, served by load_store in place of the files.
+_installed_store = None
+
+
+def install_store(store):
+    """
+    Serve the compiled species, coefficient tables and lookup tables of this
+    process from the given store, e.g. one opened from shared memory in a
+    worker.
+
+    Parameters:
+        store (CoefficientStore or None): The store, or None to go back to
+            the store files.
+    """
+    from nsvb.tables import (
+        compiled_carbon_fractions,
+        compiled_crown_ratios,
+        compiled_species,
+        compiled_table,
+        compiled_wood_density_proportions,
+    )
+
+    global _installed_store
+    _installed_store = store
+    compiled_species.cache_clear()
+    compiled_table.cache_clear()
+    compiled_carbon_fractions.cache_clear()
+    compiled_wood_density_proportions.cache_clear()
+    compiled_crown_ratios.cache_clear()
+
+
+def load_store():
+    """
+    Open the packed coefficient store, building it on first use.
+
+    The packaged store is used when it matches the source CSVs; otherwise a
+    store named after the content hash is opened from (or written to) the
+    cache directory. Edited CSVs therefore produce a new hash and a rebuilt
+    store. The content hash is only recomputed when the size or
+    modification time of a CSV changes (see :func:`cached_source_digest`).
+    A store set by :func:`install_store` takes precedence.
+
+    Only the compiled (vectorized) lookups are served from the store; the
+    scalar estimators keep reading the CSV tables.
+
+    Returns:
+        CoefficientStore or None: The store, or None if it cannot be built,
+        e.g. because the cache directory is not writable.
+    """
+    if _installed_store is not None:
+        return _installed_store
+    return _load_store_files()
+
+
+@lru_cache(maxsize=None)
+def _load_store_files():
+    digest = cached_source_digest()
+    store = open_store(DATA_PATH / PACKAGED_STORE, digest)
+    if store is not None:
+        return store
+
+    path = cache_dir() / f"coefficients-{digest[:16]}.nsvb"
+    store = open_store(path, digest)
+    if store is not None:
+        return store
+    try:
+        write_store(path, digest)
+    except OSError:
+        return None
+    return open_store(path, digest)
+
+
+if __name__ == "__main__":
+    # Prebuild the packaged store, e.g. before building a wheel.
+    print(write_store(DATA_PATH / PACKAGED_STORE))
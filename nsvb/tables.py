@@ -1,5 +1,11 @@
 import csv
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
 from importlib.resources import files
+from types import MappingProxyType
+
+import numpy as np
 
 DATA_PATH = files("nsvb").joinpath("data")
 
@@ -9,6 +15,66 @@ K_VALUES = {
 }
 
 
+class LazyTable(Mapping):
+    """
+    Read-only mapping that reads its table on first access.
+
+    Parameters:
+        reader (callable): Table reader, e.g. :func:`read_coefficient_table_fia`.
+        filename (str): File name in the data directory passed to ``reader``.
+    """
+
+    def __init__(self, reader, filename):
+        self._reader = reader
+        self._filename = filename
+        self._data = None
+        self._lock = threading.Lock()
+
+    @property
+    def filename(self) -> str:
+        """File name of the table in the data directory."""
+        return self._filename
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the table has been read."""
+        return self._data is not None
+
+    def _load(self):
+        with self._lock:
+            if self._data is None:
+                self._data = self._reader(self._filename)
+        return self._data
+
+    def __getitem__(self, key):
+        data = self._data
+        if data is None:
+            data = self._load()
+        return data[key]
+
+    def __contains__(self, key):
+        data = self._data
+        if data is None:
+            data = self._load()
+        return key in data
+
+    def get(self, key, default=None):
+        data = self._data
+        if data is None:
+            data = self._load()
+        return data.get(key, default)
+
+    def __iter__(self):
+        return iter(self._data if self._data is not None else self._load())
+
+    def __len__(self):
+        return len(self._data if self._data is not None else self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<{type(self).__name__} {self._filename!r} ({state})>"
+
+
 def read_ref_species_table(filename):
     with open(DATA_PATH / filename, "r") as f:
         reader = csv.DictReader(f)
@@ -20,9 +86,9 @@ def read_wood_density_proportions_table(filename):
         reader = csv.DictReader(f)
         return {
             (row["class"], int(row["DECAYCD"])): {
-                float(row["DensProp"]),
-                float(row["BarkProp"]),
-                float(row["BranchProp"]),
+                "DensProp": float(row["DensProp"]),
+                "BarkProp": float(row["BarkProp"]),
+                "BranchProp": float(row["BranchProp"]),
             }
             for row in reader
         }
@@ -32,16 +98,18 @@ def read_coefficient_table_fia(filename):
     with open(DATA_PATH / filename, "r") as f:
         reader = csv.DictReader(f)
         return {
-            (int(row["SPCD"]), row["DIVISION"]): {
-                "model": int(row["model"]),
-                "a": float(row["a"]),
-                "a1": float(row["a1"]) if row.get("a1") else None,
-                "b": float(row["b"]),
-                "b1": float(row["b1"]) if row.get("b1") else None,
-                "c": float(row["c"]),
-                "c1": float(row["c1"]) if row.get("c1") else None,
-                "k": K_VALUES[REF_SPECIES[int(row["SPCD"])]["SFTWD_HRDWD"]],
-            }
+            (int(row["SPCD"]), row["DIVISION"]): MappingProxyType(
+                {
+                    "model": int(row["model"]),
+                    "a": float(row["a"]),
+                    "a1": float(row["a1"]) if row.get("a1") else None,
+                    "b": float(row["b"]),
+                    "b1": float(row["b1"]) if row.get("b1") else None,
+                    "c": float(row["c"]),
+                    "c1": float(row["c1"]) if row.get("c1") else None,
+                    "k": K_VALUES[REF_SPECIES[int(row["SPCD"])]["SFTWD_HRDWD"]],
+                }
+            )
             for row in reader
         }
 
@@ -50,75 +118,229 @@ def read_coefficient_table_jenkins(filename):
     with open(DATA_PATH / filename, "r") as f:
         reader = csv.DictReader(f)
         return {
-            int(row["JENKINS_SPGRPCD"]): {
-                "model": int(row["model"]),
-                "a": float(row["a"]),
-                "b": float(row["b"]),
-                "c": float(row["c"]),
+            int(row["JENKINS_SPGRPCD"]): MappingProxyType(
+                {
+                    "model": int(row["model"]),
+                    "a": float(row["a"]),
+                    "b": float(row["b"]),
+                    "c": float(row["c"]),
+                }
+            )
+            for row in reader
+        }
+
+
+def read_ratio_table_fia(filename):
+    with open(DATA_PATH / filename, "r") as f:
+        reader = csv.DictReader(f)
+        return {
+            (int(row["SPCD"]), row["DIVISION"]): MappingProxyType(
+                {
+                    "model": int(row["model"]),
+                    "alpha": float(row["alpha"]),
+                    "beta": float(row["beta"]),
+                }
+            )
+            for row in reader
+        }
+
+
+def read_ratio_table_jenkins(filename):
+    with open(DATA_PATH / filename, "r") as f:
+        reader = csv.DictReader(f)
+        return {
+            int(row["JENKINS_SPGRPCD"]): MappingProxyType(
+                {
+                    "model": int(row["model"]),
+                    "alpha": float(row["alpha"]),
+                    "beta": float(row["beta"]),
+                }
+            )
+            for row in reader
+        }
+
+
+def read_carbon_fraction_table_live(filename):
+    with open(DATA_PATH / filename, "r") as f:
+        reader = csv.DictReader(f)
+        return {int(row["SPCD"]): float(row["fia.wood.c"]) for row in reader}
+
+
+def read_carbon_fraction_table_dead(filename):
+    with open(DATA_PATH / filename, "r") as f:
+        reader = csv.DictReader(f)
+        return {
+            (row["S/H"][0], int(row["Decay code"])): float(row["C fraction"])
+            for row in reader
+        }
+
+
+def read_crown_ratio_table(filename):
+    with open(DATA_PATH / filename, "r", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        return {
+            (row["Division"], row["HWD Y/N"]): float(row["Mean CR"]) for row in reader
+        }
+
+
+def read_scorecard_table(filename):
+    with open(DATA_PATH / filename, "r", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        keys = [
+            name
+            for name in reader.fieldnames[2 : reader.fieldnames.index("N")]
+            if name != "DIVISION_DESCRIPTION"
+        ]
+        return {
+            (
+                (
+                    row["VAR3"],
+                    *(int(row[k]) if k in ("SPCD", "DCLASS") else row[k] for k in keys),
+                )
+                if keys
+                else row["VAR3"]
+            ): {
+                "N": int(row["N"]),
+                "SIGMA": float(row["SIGMA"]),
+                "RMSE": float(row["RMSE"]),
             }
             for row in reader
         }
 
 
-REF_SPECIES = read_ref_species_table("REF_SPECIES.csv")
-WOOD_DENSITY_PROPORTIONS = read_wood_density_proportions_table(
-    "WOOD_DENSITY_PROPORTIONS.csv"
+# Tables are read from the data directory on first access, so importing the
+# package does not parse any CSV file.
+REF_SPECIES = LazyTable(read_ref_species_table, "REF_SPECIES.csv")
+WOOD_DENSITY_PROPORTIONS = LazyTable(
+    read_wood_density_proportions_table, "WOOD_DENSITY_PROPORTIONS.csv"
 )
 
 
 # Table S1a Coefficients for predicting total stem inside-bark wood
 # cubic-foot volume based on FIA species code (SPCD).
-table_s1a = read_coefficient_table_fia("Table S1a_volib_coefs_spcd.csv")
+table_s1a = LazyTable(read_coefficient_table_fia, "Table S1a_volib_coefs_spcd.csv")
 
 # Table S1b.—Coefficients for predicting total stem inside-bark wood
 # cubic-foot volume based on Jenkins species group (JENKINS_SPGRPCD).
-table_s1b = read_coefficient_table_jenkins("Table S1b_volib_coefs_jenkins.csv")
+table_s1b = LazyTable(
+    read_coefficient_table_jenkins, "Table S1b_volib_coefs_jenkins.csv"
+)
 
 # Table S2a.—Coefficients for predicting total stem bark cubic-foot volume
 # based on FIA species code (SPCD).
-table_s2a = read_coefficient_table_fia("Table S2a_volbk_coefs_spcd.csv")
+table_s2a = LazyTable(read_coefficient_table_fia, "Table S2a_volbk_coefs_spcd.csv")
 
 # Table S2b.—Coefficients for predicting total stem bark cubic-foot volume
 # based on Jenkins species group (JENKINS_SPGRPCD).
-table_s2b = read_coefficient_table_jenkins("Table S2b_volbk_coefs_jenkins.csv")
+table_s2b = LazyTable(
+    read_coefficient_table_jenkins, "Table S2b_volbk_coefs_jenkins.csv"
+)
+
+# Table S4a.—Coefficients for predicting the cumulative outside-bark volume
+# ratio based on FIA species code (SPCD).
+table_s4a = LazyTable(read_ratio_table_fia, "Table S4a_rcumob_coefs_spcd.csv")
+
+# Table S4b.—Coefficients for predicting the cumulative outside-bark volume
+# ratio based on Jenkins species group (JENKINS_SPGRPCD).
+table_s4b = LazyTable(read_ratio_table_jenkins, "Table S4b_rcumob_coefs_jenkins.csv")
+
+# Table S5a.—Coefficients for predicting the cumulative inside-bark volume
+# ratio based on FIA species code (SPCD).
+table_s5a = LazyTable(read_ratio_table_fia, "Table S5a_rcumib_coefs_spcd.csv")
+
+# Table S5b.—Coefficients for predicting the cumulative inside-bark volume
+# ratio based on Jenkins species group (JENKINS_SPGRPCD).
+table_s5b = LazyTable(read_ratio_table_jenkins, "Table S5b_rcumib_coefs_jenkins.csv")
 
 # Table S6a.—Coefficients for predicting total stem bark biomass based on FIA
 # species code (SPCD).
-table_s6a = read_coefficient_table_fia("Table S6a_bark_biomass_coefs_spcd.csv")
+table_s6a = LazyTable(
+    read_coefficient_table_fia, "Table S6a_bark_biomass_coefs_spcd.csv"
+)
 
 # Table S6b.—Coefficients for predicting total stem bark biomass based on
 # Jenkins species group (JENKINS_SPGRPCD).
-table_s6b = read_coefficient_table_jenkins("Table S6b_bark_biomass_coefs_jenkins.csv")
+table_s6b = LazyTable(
+    read_coefficient_table_jenkins, "Table S6b_bark_biomass_coefs_jenkins.csv"
+)
 
 # Table S7a.—Coefficients for predicting total branch biomass based on FIA
 # species code (SPCD).
-table_7a = read_coefficient_table_fia("Table S7a_branch_biomass_coefs_spcd.csv")
+table_7a = LazyTable(
+    read_coefficient_table_fia, "Table S7a_branch_biomass_coefs_spcd.csv"
+)
 
 # Table S7b.—Coefficients for predicting total branch biomass based on Jenkins
 # species group (JENKINS_SPGRPCD).
-table_7b = read_coefficient_table_jenkins("Table S7b_branch_biomass_coefs_jenkins.csv")
+table_7b = LazyTable(
+    read_coefficient_table_jenkins, "Table S7b_branch_biomass_coefs_jenkins.csv"
+)
 
 # Table S8a.—Coefficients for predicting total tree biomass based on FIA
 # species code (SPCD).
-table_8a = read_coefficient_table_fia("Table S8a_total_biomass_coefs_spcd.csv")
+table_8a = LazyTable(
+    read_coefficient_table_fia, "Table S8a_total_biomass_coefs_spcd.csv"
+)
 
 # Table S8b.—Coefficients for predicting total tree biomass based on Jenkins
 # species group (JENKINS_SPGRPCD).
-table_8b = read_coefficient_table_jenkins("Table S8b_total_biomass_coefs_jenkins.csv")
+table_8b = LazyTable(
+    read_coefficient_table_jenkins, "Table S8b_total_biomass_coefs_jenkins.csv"
+)
 
 # Table S9a.—Coefficients for predicting total foliage biomass based on FIA
 # species code (SPCD).
-table_9a = read_coefficient_table_fia("Table S9a_foliage_coefs_spcd.csv")
+table_9a = LazyTable(read_coefficient_table_fia, "Table S9a_foliage_coefs_spcd.csv")
 
 # Table S9b.—Coefficients for predicting total foliage biomass based on Jenkins
 # species group (JENKINS_SPGRPCD).
-table_9b = read_coefficient_table_jenkins("Table S9b_foliage_coefs_jenkins.csv")
+table_9b = LazyTable(
+    read_coefficient_table_jenkins, "Table S9b_foliage_coefs_jenkins.csv"
+)
+
+# Table S10a.—Wood carbon fraction (percent) of live trees by FIA species
+# code (SPCD).
+table_s10a = LazyTable(
+    read_carbon_fraction_table_live, "Table S10a_fia_wood_c_frac_live.csv.csv"
+)
+
+# Table S10b.—Wood carbon fraction (percent) of dead trees by softwood (S) or
+# hardwood (H) class and decay code (DECAYCD).
+table_s10b = LazyTable(
+    read_carbon_fraction_table_dead, "Table S10b_fia_wood_c_frac_dead.csv.csv"
+)
+
+# Table S11.—Mean crown ratio (percent) of live trees by ecological province
+# and hardwood (Y/N) class.
+table_s11 = LazyTable(read_crown_ratio_table, "Table S11_mean_crprop.csv")
+
+# Tables S12-S20.—Fit statistics (N, SIGMA and RMSE) of each component
+# (VAR3), overall and by species, region, state, division and diameter
+# class. Keys are VAR3 for Table S12 and (VAR3, *groups) for the others.
+table_s12 = LazyTable(read_scorecard_table, "Table S12_component_scorecard.csv")
+table_s13 = LazyTable(read_scorecard_table, "Table S13_component_spcd_scorecard.csv")
+table_s14 = LazyTable(read_scorecard_table, "Table S14_component_region_scorecard.csv")
+table_s15 = LazyTable(
+    read_scorecard_table, "Table S15_component_region_spcd_scorecard.csv"
+)
+table_s16 = LazyTable(read_scorecard_table, "Table S16_component_state_scorecard.csv")
+table_s18 = LazyTable(
+    read_scorecard_table, "Table S18_component_division_scorecard.csv"
+)
+table_s19 = LazyTable(
+    read_scorecard_table, "Table S19_component_division_spcd_scorecard.csv"
+)
+table_s20 = LazyTable(read_scorecard_table, "Table S20_component_dclass_scorecard.csv")
 
 TABLES = {
     "s1a": table_s1a,
     "s1b": table_s1b,
     "s2a": table_s2a,
     "s2b": table_s2b,
+    "s4a": table_s4a,
+    "s4b": table_s4b,
+    "s5a": table_s5a,
+    "s5b": table_s5b,
     "s6a": table_s6a,
     "s6b": table_s6b,
     "s7a": table_7a,
@@ -127,4 +349,441 @@ TABLES = {
     "s8b": table_8b,
     "s9a": table_9a,
     "s9b": table_9b,
+    "s10a": table_s10a,
+    "s10b": table_s10b,
+    "s11": table_s11,
+    "s12": table_s12,
+    "s13": table_s13,
+    "s14": table_s14,
+    "s15": table_s15,
+    "s16": table_s16,
+    "s18": table_s18,
+    "s19": table_s19,
+    "s20": table_s20,
 }
+
+
+# Coefficient columns of a compiled table. Columns that a row does not use are
+# NaN; wdsg is only set on the Jenkins rows, where it is bound per species,
+# and alpha and beta only on the cumulative volume ratio rows (model 6).
+COEFFICIENT_COLUMNS = ("a", "a1", "b", "b1", "c", "c1", "k", "wdsg", "alpha", "beta")
+
+
+class CompiledSpecies:
+    """
+    Dense per-species columns of REF_SPECIES used by the estimators.
+
+    Species are stored in ascending SPCD order and addressed by their slot in
+    that order; ``index`` maps an SPCD directly to its slot (-1 if unknown).
+
+    Attributes:
+        spcd (np.ndarray): Species codes in ascending order.
+        index (np.ndarray): Slot of each SPCD, or -1 for unknown codes.
+        wdsg (np.ndarray): Wood specific gravity (NaN if missing).
+        hardwood (np.ndarray): True for hardwood species.
+        jenkins_spgrpcd (np.ndarray): Jenkins species group (-1 if missing).
+    """
+
+    def __init__(self, spcd, wdsg, hardwood, jenkins_spgrpcd, index=None):
+        self.spcd = spcd
+        self.wdsg = wdsg
+        self.hardwood = hardwood
+        self.jenkins_spgrpcd = jenkins_spgrpcd
+        if index is None:
+            index = np.full(int(spcd.max()) + 1, -1, dtype=np.int32)
+            index[spcd] = np.arange(len(spcd), dtype=np.int32)
+        self.index = index
+
+    def slots(self, spcd, strict: bool = True) -> np.ndarray:
+        """
+        Resolve species codes to species slots.
+
+        Parameters:
+            spcd (array_like): FIA species codes.
+            strict (bool, optional): Raise for unknown species codes. If
+                False, their slot is -1 instead. Default is True.
+
+        Returns:
+            np.ndarray: Species slot of each code.
+
+        Raises:
+            KeyError: If a species code is not in REF_SPECIES and ``strict``
+                is True.
+        """
+        spcd = np.asarray(spcd, dtype=np.int64)
+        if spcd.size and (spcd.min() < 0 or spcd.max() >= len(self.index)):
+            outside = (spcd < 0) | (spcd >= len(self.index))
+            if strict:
+                raise KeyError(int(spcd[outside][0]))
+            slots = np.full(spcd.shape, -1, dtype=self.index.dtype)
+            slots[~outside] = self.index[spcd[~outside]]
+            return slots
+        slots = self.index[spcd]
+        if strict and spcd.size and slots.min() < 0:
+            raise KeyError(int(spcd[slots < 0][0]))
+        return slots
+
+
+class CompiledTable:
+    """
+    Contiguous coefficient arrays for one component, with a lookup from
+    (species slot, division code) to coefficient row.
+
+    The lookup already applies the fallbacks of the scalar estimators: the
+    division-specific SPCD row, then the species-level SPCD row, then the
+    Jenkins species group row (bound to the species wdsg).
+
+    Attributes:
+        name (str): Table name without the a/b suffix, e.g. "s1".
+        model (np.ndarray): Model form of each row.
+        coefficients (np.ndarray): Array of shape (len(COEFFICIENT_COLUMNS),
+            n_rows); each column is a contiguous row of this array.
+        divisions (np.ndarray): Sorted division codes, "" first.
+        lookup (np.ndarray): Row for each (species slot, division code), or
+            -1 if the species has no coefficients.
+    """
+
+    def __init__(self, name, model, coefficients, divisions, lookup):
+        self.name = name
+        self.model = model
+        self.coefficients = coefficients
+        self.divisions = divisions
+        self.lookup = lookup
+        self.columns = dict(zip(COEFFICIENT_COLUMNS, coefficients))
+        self._cast = {}
+
+    def astype(self, dtype) -> "CompiledTable":
+        """
+        The table with its coefficients cast to a floating point dtype.
+
+        The cast is made once per table and dtype; the lookup is shared.
+
+        Parameters:
+            dtype (np.dtype): Floating point dtype, e.g. np.float32.
+
+        Returns:
+            CompiledTable: This table if it already has the dtype, otherwise
+            a cast copy.
+        """
+        dtype = np.dtype(dtype)
+        if dtype == self.coefficients.dtype:
+            return self
+        table = self._cast.get(dtype)
+        if table is None:
+            coefficients = self.coefficients.astype(dtype)
+            coefficients.flags.writeable = False
+            table = self._cast.setdefault(
+                dtype,
+                CompiledTable(
+                    self.name, self.model, coefficients, self.divisions, self.lookup
+                ),
+            )
+        return table
+
+    def division_codes(self, division) -> np.ndarray:
+        """
+        Encode division codes as indices into ``divisions``.
+
+        Divisions without rows in this table map to the species-level column.
+
+        Parameters:
+            division (array_like): Division codes.
+
+        Returns:
+            np.ndarray: Division index of each code.
+        """
+        division = np.asarray(division).astype(str)
+        codes = np.searchsorted(self.divisions, division)
+        codes[codes == len(self.divisions)] = 0
+        codes[self.divisions[codes] != division] = 0
+        return codes
+
+    def rows(self, slots, division_codes, strict: bool = True) -> np.ndarray:
+        """
+        Resolve species slots and division codes to coefficient rows.
+
+        Parameters:
+            slots (np.ndarray): Species slots from :meth:`CompiledSpecies.slots`.
+            division_codes (np.ndarray): Codes from :meth:`division_codes`.
+            strict (bool, optional): Raise for species without coefficients.
+                If False, their row (and the row of slot -1) is -1 instead.
+                Default is True.
+
+        Returns:
+            np.ndarray: Coefficient row of each tree.
+
+        Raises:
+            ValueError: If a species has no coefficients in this table and
+                ``strict`` is True.
+        """
+        rows = self.lookup[slots, division_codes]
+        if strict:
+            if rows.size and rows.min() < 0:
+                spcd = compiled_species().spcd[slots[rows < 0][0]]
+                raise ValueError(f"No {self.name} coefficients for SPCD {spcd}")
+        else:
+            rows[slots < 0] = -1
+        return rows
+
+
+def compile_species() -> CompiledSpecies:
+    """
+    Compile the REF_SPECIES columns used by the estimators from the CSV.
+
+    Returns:
+        CompiledSpecies: Dense per-species columns.
+    """
+    spcd = np.array(sorted(REF_SPECIES), dtype=np.int64)
+    rows = [REF_SPECIES[s] for s in spcd.tolist()]
+    wdsg = np.array([float(row["WOOD_SPGR_GREENVOL_DRYWT"] or "nan") for row in rows])
+    hardwood = np.array([row["SFTWD_HRDWD"] == "H" for row in rows])
+    jenkins_spgrpcd = np.array(
+        [int(row["JENKINS_SPGRPCD"] or -1) for row in rows], dtype=np.int64
+    )
+    return CompiledSpecies(spcd, wdsg, hardwood, jenkins_spgrpcd)
+
+
+def compile_table(table_name: str, species: CompiledSpecies) -> CompiledTable:
+    """
+    Compile the SPCD and Jenkins coefficient tables of one component from
+    the CSVs.
+
+    Parameters:
+        table_name (str): Table name without the a/b suffix, e.g. "s1".
+        species (CompiledSpecies): Species the lookup is built for.
+
+    Returns:
+        CompiledTable: The compiled coefficient index.
+    """
+    fia = TABLES[f"{table_name}a"]
+    jenkins = TABLES[f"{table_name}b"]
+
+    records = list(fia.values())
+    row_of = {key: row for row, key in enumerate(fia)}
+    divisions = np.array(sorted({division for _, division in fia} | {""}))
+    division_code = {division: code for code, division in enumerate(divisions)}
+
+    lookup = np.full((len(species.spcd), len(divisions)), -1, dtype=np.int32)
+    for (spcd, division), row in row_of.items():
+        if division == "" and (spcd, "") in row_of and spcd in REF_SPECIES:
+            lookup[species.index[spcd], :] = row
+    for (spcd, division), row in row_of.items():
+        if division != "" and (spcd, "") in row_of and spcd in REF_SPECIES:
+            lookup[species.index[spcd], division_code[division]] = row
+
+    # Species without a species-level row fall back to their Jenkins group,
+    # with one row per species so that wdsg is bound to the row.
+    for slot in np.flatnonzero(lookup[:, 0] < 0).tolist():
+        group = int(species.jenkins_spgrpcd[slot])
+        wdsg = float(species.wdsg[slot])
+        if group in jenkins and not np.isnan(wdsg):
+            lookup[slot, :] = len(records)
+            records.append({**jenkins[group], "wdsg": wdsg})
+
+    model = np.array([data["model"] for data in records], dtype=np.int8)
+    coefficients = np.array(
+        [
+            [np.nan if data.get(name) is None else data[name] for data in records]
+            for name in COEFFICIENT_COLUMNS
+        ],
+        dtype=np.float64,
+    )
+    return CompiledTable(table_name, model, coefficients, divisions, lookup)
+
+
+@lru_cache(maxsize=None)
+def compiled_species() -> CompiledSpecies:
+    """
+    Dense per-species REF_SPECIES columns, from the packed coefficient store
+    when available and otherwise compiled from the CSV.
+
+    Returns:
+        CompiledSpecies: Dense per-species columns.
+    """
+    from nsvb.store import load_store
+
+    store = load_store()
+    if store is not None:
+        return store.species
+    return compile_species()
+
+
+@lru_cache(maxsize=None)
+def compiled_table(table_name: str) -> CompiledTable:
+    """
+    Compiled coefficient index of one component, from the packed coefficient
+    store when available and otherwise compiled from the CSVs.
+
+    Parameters:
+        table_name (str): Table name without the a/b suffix, e.g. "s1".
+
+    Returns:
+        CompiledTable: The compiled coefficient index.
+    """
+    from nsvb.store import load_store
+
+    store = load_store()
+    if store is not None and table_name in store.tables:
+        return store.tables[table_name]
+    return compile_table(table_name, compiled_species())
+
+
+def compile_carbon_fractions(species=None) -> np.ndarray:
+    """
+    Compile Tables S10a and S10b into a dense carbon fraction array.
+
+    Parameters:
+        species (CompiledSpecies, optional): Species the array is built for.
+            Default is :func:`compiled_species`.
+
+    Returns:
+        np.ndarray: Array of shape (max SPCD + 1, 6) indexed by SPCD and
+        DECAYCD, where DECAYCD 0 is a live tree. Fractions are proportions,
+        not percent; they are NaN for unknown species, species without a live
+        fraction and, for dead trees, species without a softwood/hardwood
+        class.
+    """
+    if species is None:
+        species = compiled_species()
+    fractions = np.full((len(species.index), 6), np.nan)
+    for spcd, percent in table_s10a.items():
+        if spcd < len(species.index):
+            fractions[spcd, 0] = percent / 100
+    for spcd, row in REF_SPECIES.items():
+        for decaycd in range(1, 6):
+            percent = table_s10b.get((row["SFTWD_HRDWD"], decaycd))
+            if percent is not None:
+                fractions[spcd, decaycd] = percent / 100
+    return fractions
+
+
+@lru_cache(maxsize=None)
+def compiled_carbon_fractions() -> np.ndarray:
+    """
+    Dense carbon fractions of Tables S10a and S10b, from the packed
+    coefficient store when available and otherwise compiled on first use.
+
+    Returns:
+        np.ndarray: Read-only array from :func:`compile_carbon_fractions`.
+    """
+    from nsvb.store import load_store
+
+    store = load_store()
+    if store is not None:
+        return store.carbon_fractions
+    fractions = compile_carbon_fractions()
+    fractions.flags.writeable = False
+    return fractions
+
+
+# Columns of the compiled wood density proportions, in Table 1 order.
+DECAY_PROPORTIONS = ("DensProp", "BarkProp", "BranchProp")
+
+
+def compile_wood_density_proportions() -> np.ndarray:
+    """
+    Compile the dead tree wood density and structural loss proportions of
+    Table 1 into a dense array.
+
+    Returns:
+        np.ndarray: Array of shape (2, 6, 3) indexed by softwood (0) or
+        hardwood (1), DECAYCD and proportion, in :data:`DECAY_PROPORTIONS`
+        order. DECAYCD 0 is a live tree, with every proportion 1.
+    """
+    proportions = np.ones((2, 6, len(DECAY_PROPORTIONS)))
+    for (wood, decaycd), row in WOOD_DENSITY_PROPORTIONS.items():
+        proportions[int(wood == "H"), decaycd] = [
+            row[name] for name in DECAY_PROPORTIONS
+        ]
+    return proportions
+
+
+@lru_cache(maxsize=None)
+def compiled_wood_density_proportions() -> np.ndarray:
+    """
+    Dense wood density proportions of Table 1, from the packed coefficient
+    store when available and otherwise compiled on first use.
+
+    Returns:
+        np.ndarray: Read-only array from
+        :func:`compile_wood_density_proportions`.
+    """
+    from nsvb.store import load_store
+
+    store = load_store()
+    if store is not None:
+        return store.wood_density_proportions
+    proportions = compile_wood_density_proportions()
+    proportions.flags.writeable = False
+    return proportions
+
+
+class CompiledCrownRatios:
+    """
+    Mean crown ratios of Table S11 as a dense (province, softwood/hardwood)
+    array.
+
+    Provinces without a row, and classes a province has no row for, take
+    the UNDEFINED row.
+
+    Attributes:
+        provinces (np.ndarray): Sorted province codes.
+        ratios (np.ndarray): Array of shape (len(provinces), 2) of the mean
+            crown ratios of softwoods (0) and hardwoods (1) as proportions.
+        undefined (int): Index of the UNDEFINED row.
+    """
+
+    def __init__(self, provinces, ratios):
+        self.provinces = provinces
+        self.ratios = ratios
+        self.undefined = int(np.searchsorted(provinces, "UNDEFINED"))
+
+    def province_codes(self, province) -> np.ndarray:
+        """
+        Encode province codes as indices into ``provinces``.
+
+        Parameters:
+            province (array_like): Province codes.
+
+        Returns:
+            np.ndarray: Province index of each code.
+        """
+        province = np.asarray(province).astype(str)
+        codes = np.searchsorted(self.provinces, province)
+        codes[codes == len(self.provinces)] = self.undefined
+        codes[self.provinces[codes] != province] = self.undefined
+        return codes
+
+
+def compile_crown_ratios() -> CompiledCrownRatios:
+    """
+    Compile Table S11 into dense crown ratio columns.
+
+    Returns:
+        CompiledCrownRatios: Compiled crown ratios.
+    """
+    provinces = np.array(sorted({province for province, _ in table_s11}))
+    ratios = np.full((len(provinces), 2), np.nan)
+    codes = dict(zip(provinces.tolist(), range(len(provinces))))
+    for (province, hardwood), percent in table_s11.items():
+        ratios[codes[province], int(hardwood == "Y")] = percent / 100
+    undefined = ratios[codes["UNDEFINED"]]
+    ratios = np.where(np.isnan(ratios), undefined, ratios)
+    return CompiledCrownRatios(provinces, ratios)
+
+
+@lru_cache(maxsize=None)
+def compiled_crown_ratios() -> CompiledCrownRatios:
+    """
+    Compiled Table S11 crown ratios, from the packed coefficient store when
+    available and otherwise compiled on first use.
+
+    Returns:
+        CompiledCrownRatios: Compiled crown ratios.
+    """
+    from nsvb.store import load_store
+
+    store = load_store()
+    if store is not None:
+        return store.crown_ratios
+    return compile_crown_ratios()
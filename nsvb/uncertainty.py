@@ -0,0 +1,311 @@
+from collections import namedtuple
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+from nsvb.aggregate import encode_groups
+from nsvb.batch import EncodedDivisions, _as_arrays, estimate_trees
+from nsvb.estimators import COMPONENTS
+from nsvb.tables import compiled_species, table_s12, table_s13, table_s18, table_s19
+
+# Scorecard component (VAR3) of each estimate_trees component.
+SCORECARD_COMPONENTS = {
+    "v_tot_ib": "ST_WD_CV_TOT",
+    "v_tot_bk": "ST_BK_CV_TOT",
+    "v_tot_ob": "ST_WDBK_CV_TOT",
+    "w_tot_ib": "ST_WD_DW_TOT",
+    "w_tot_bk": "ST_BK_DW_TOT",
+    "w_branch": "BRT_WDBK_DW_TOT",
+    "agb": "TT_WDBK_DW_ADJ",
+    "w_foliage": "FOL_DW",
+}
+
+# Minimum number of observations behind a scorecard SIGMA.
+DEFAULT_MIN_N = 30
+
+# Number of simulated tree values generated at once.
+DEFAULT_BLOCK_SIZE = 1 << 22
+
+TotalsSummary = namedtuple(
+    "TotalsSummary", ["groups", "total", "mean", "std", "n_draws"]
+)
+TotalsSummary.__doc__ = """
+Monte Carlo summary of the group totals of one component.
+
+Attributes:
+    groups (np.ndarray or dict): Key of each group, as returned by
+        :func:`nsvb.aggregate.encode_groups`.
+    total (np.ndarray): Group totals of the predictions.
+    mean (np.ndarray): Mean of the simulated group totals.
+    std (np.ndarray): Standard deviation of the simulated group totals.
+    n_draws (int): Number of draws.
+"""
+
+
+class RunningMoments:
+    """
+    Streaming mean and variance of vectors, merged one block of samples at a
+    time with the parallel form of Welford's algorithm (Chan et al. 1979), so
+    the samples never need to be held at once.
+
+    Parameters:
+        shape (tuple): Shape of each sample.
+    """
+
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+
+    def update(self, samples):
+        """
+        Merge a block of samples.
+
+        Parameters:
+            samples (np.ndarray): Array of shape (n, *shape).
+        """
+        n = len(samples)
+        if n == 0:
+            return
+        mean = samples.mean(axis=0)
+        m2 = ((samples - mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self._m2 = self._m2 + m2 + delta**2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Sample variance (ddof=1), NaN with fewer than two samples."""
+        if self.count < 2:
+            return np.full(self.mean.shape, np.nan)
+        return self._m2 / (self.count - 1)
+
+
+def _division_index(codes, division) -> np.ndarray:
+    """
+    Index of each tree's division into sorted scorecard division codes.
+
+    Parameters:
+        codes (np.ndarray): Sorted division codes.
+        division (np.ndarray or EncodedDivisions): Division codes.
+
+    Returns:
+        np.ndarray: Index of each tree's division, or -1 if it has none.
+    """
+    if isinstance(division, EncodedDivisions):
+        index = _division_index(codes, division.categories)
+        return np.append(index, -1)[division.indices]
+    division = np.asarray(division).astype(str)
+    index = np.searchsorted(codes, division)
+    index[index == len(codes)] = 0
+    index[codes[index] != division] = -1
+    return index
+
+
+@lru_cache(maxsize=None)
+def _compiled_sigmas(var3, min_n) -> tuple:
+    """
+    Dense scorecard SIGMA lookups of a component, compiled on first use.
+
+    Parameters:
+        var3 (str): Scorecard component.
+        min_n (int): Minimum number of observations.
+
+    Returns:
+        tuple: Sorted division codes, SIGMA by division (Table S18), by
+        species (Table S13) and by species and division (Table S19), each
+        NaN where unusable and with a trailing NaN division, and the SIGMA of
+        all trees (Table S12).
+    """
+    n_species = len(compiled_species().index)
+
+    def usable(stats):
+        return stats["N"] >= min_n and np.isfinite(stats["SIGMA"])
+
+    codes = np.array(
+        sorted({key[1] for key in table_s18} | {key[2] for key in table_s19})
+    )
+    by_division = np.full(len(codes) + 1, np.nan)
+    by_species = np.full(n_species, np.nan)
+    by_both = np.full((n_species, len(codes) + 1), np.nan)
+    for (name, code), stats in table_s18.items():
+        if name == var3 and usable(stats):
+            by_division[np.searchsorted(codes, code)] = stats["SIGMA"]
+    for (name, species), stats in table_s13.items():
+        if name == var3 and species < n_species and usable(stats):
+            by_species[species] = stats["SIGMA"]
+    for (name, species, code), stats in table_s19.items():
+        if name == var3 and species < n_species and usable(stats):
+            by_both[species, np.searchsorted(codes, code)] = stats["SIGMA"]
+    for array in (by_division, by_species, by_both):
+        array.flags.writeable = False
+    return codes, by_division, by_species, by_both, table_s12[var3]["SIGMA"]
+
+
+def residual_sigma(component, spcd, division="", min_n=DEFAULT_MIN_N) -> np.ndarray:
+    """
+    Scorecard SIGMA of each tree for a component.
+
+    The most specific scorecard with at least ``min_n`` observations and a
+    finite SIGMA is used: species and division (Table S19), species (Table
+    S13), division (Table S18), then all trees (Table S12).
+
+    Parameters:
+        component (str): Name from :data:`nsvb.estimators.COMPONENTS`.
+        spcd (array_like): FIA species codes.
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        min_n (int, optional): Minimum number of observations. Default is
+            30.
+
+    Returns:
+        np.ndarray: SIGMA of each tree.
+    """
+    codes, by_division, by_species, by_both, overall = _compiled_sigmas(
+        SCORECARD_COMPONENTS[component], min_n
+    )
+    spcd = np.ravel(np.asarray(spcd, dtype=np.int64))
+    if not isinstance(division, EncodedDivisions):
+        division = np.broadcast_to(np.asarray(division).astype(str), spcd.shape)
+    known = (spcd >= 0) & (spcd < len(by_species))
+    spcd = np.where(known, spcd, 0)
+
+    # Index -1 (no scorecard division) picks the trailing NaN.
+    index = _division_index(codes, division)
+    sigma = np.where(np.isnan(by_division[index]), overall, by_division[index])
+    for level in (by_species[spcd], by_both[spcd, index]):
+        sigma = np.where(known & ~np.isnan(level), level, sigma)
+    return sigma
+
+
+def simulate_totals(
+    spcd,
+    dia,
+    ht,
+    division="",
+    groups=None,
+    expansion=1.0,
+    components=("agb",),
+    n_draws: int = 1000,
+    seed=None,
+    min_n: int = DEFAULT_MIN_N,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    errors: str = "raise",
+    **inputs,
+) -> dict:
+    """
+    Monte Carlo distribution of group totals (e.g. plots or stands) under
+    the residual error of the NSVB models.
+
+    Each draw adds an independent normal residual to every tree's
+    prediction. Its standard deviation is the scorecard SIGMA of the tree
+    (see :func:`residual_sigma`) times its diameter, the residual variance
+    model behind the scorecards. Simulated values are truncated at zero,
+    and trees with a zero prediction, such as the foliage of dead trees,
+    have no residual.
+
+    Draws are generated in blocks of at most ``block_size`` tree values and
+    reduced to group totals before the next block, and the totals are
+    merged into streaming moments (:class:`RunningMoments`), so memory
+    does not grow with the number of draws. Results are reproducible for a
+    given ``seed`` and ``block_size``.
+
+    Parameters:
+        spcd (array_like): FIA species codes.
+        dia (array_like): Diameters of the trees in inches (in).
+        ht (array_like): Heights of the trees in feet (ft).
+        division (array_like or EncodedDivisions, optional): Division codes.
+            Default is an empty string.
+        groups (array_like, EncodedDivisions or dict, optional): Group key
+            of each tree, or several keys keyed by name, as for
+            :func:`nsvb.aggregate.aggregate_trees`. Default is a single
+            group.
+        expansion (array_like, optional): Expansion factor of each tree,
+            e.g. TPA_UNADJ. Default is 1.
+        components (iterable, optional): Names from
+            :data:`nsvb.estimators.COMPONENTS`. Default is ("agb",).
+        n_draws (int, optional): Number of draws. Default is 1,000.
+        seed (int or np.random.Generator, optional): Seed of the random
+            generator. Default is None (unseeded).
+        min_n (int, optional): Minimum number of observations behind a
+            scorecard SIGMA. Default is 30.
+        block_size (int, optional): Maximum number of tree values simulated
+            at once. Default is 4,194,304.
+        errors (str, optional): "raise" or "nan", as for
+            :func:`nsvb.batch.estimate_trees`. Default is "raise".
+        **inputs: Other :func:`nsvb.batch.estimate_trees` inputs, e.g.
+            ``cull`` or ``decaycd``.
+
+    Returns:
+        dict: :class:`TotalsSummary` keyed by component name.
+    """
+    components = tuple(components)
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown components: {', '.join(sorted(unknown))}")
+    if n_draws < 1:
+        raise ValueError("n_draws must be at least 1")
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+
+    spcd, dia, ht, division, expansion = _as_arrays(spcd, dia, ht, division, expansion)
+    n = len(spcd)
+    index, keys = encode_groups(groups, n)
+    n_groups = int(index.max()) + 1 if n else 0
+    rng = np.random.default_rng(seed)
+    predictions = estimate_trees(
+        spcd, dia, ht, division, components=components, errors=errors, **inputs
+    )
+
+    # Trees per block and draws per block, keeping their product within the
+    # block size.
+    tree_block = min(n, block_size) or 1
+    draw_block = max(1, min(n_draws, block_size // tree_block))
+
+    results = {}
+    for name in components:
+        prediction = predictions[name]
+        sd = residual_sigma(name, spcd, division, min_n) * dia
+        sd = np.where(prediction > 0, sd, 0.0)
+        moments = RunningMoments(n_groups)
+        for first in range(0, n_draws, draw_block):
+            draws = min(draw_block, n_draws - first)
+            totals = np.zeros(draws * n_groups)
+            offsets = np.arange(draws)[:, None] * n_groups
+            for start in range(0, n, tree_block):
+                stop = min(start + tree_block, n)
+                values = prediction[start:stop] + sd[start:stop] * rng.standard_normal(
+                    (draws, stop - start)
+                )
+                np.maximum(values, 0.0, out=values)
+                values *= expansion[start:stop]
+                totals += np.bincount(
+                    (offsets + index[start:stop]).ravel(),
+                    weights=values.ravel(),
+                    minlength=draws * n_groups,
+                )
+            moments.update(totals.reshape(draws, n_groups))
+
+        total = np.bincount(index, weights=prediction * expansion, minlength=n_groups)
+        results[name] = TotalsSummary(
+            keys, total, moments.mean, np.sqrt(moments.variance), n_draws
+        )
+    return results
+
+
+def confidence_interval(summary, level: float = 0.95) -> tuple:
+    """
+    Normal-approximation confidence interval of simulated group totals.
+
+    Parameters:
+        summary (TotalsSummary): Result of :func:`simulate_totals`.
+        level (float, optional): Confidence level. Default is 0.95.
+
+    Returns:
+        tuple: Lower and upper bounds of each group total.
+    """
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    return summary.mean - z * summary.std, summary.mean + z * summary.std
@@ -49,8 +49,10 @@ setup(
     ],
     package_dir={"": "."},
     packages=find_packages(exclude=["docs", "tests"]),
-    package_data={"nsvb": ["data/*"]},
+    package_data={"nsvb": ["data/*", "data/grids/*"]},
     include_package_data=True,
     python_requires=">=3.9",
-    install_requires=[],
+    install_requires=["numpy"],
+    extras_require={"arrow": ["pyarrow"], "numba": ["numba"], "pandas": ["pandas"]},
+    entry_points={"console_scripts": ["nsvb=nsvb.cli:main"]},
 )
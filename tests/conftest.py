@@ -0,0 +1,16 @@
+import pytest
+
+from nsvb.store import _load_store_files
+
+
+@pytest.fixture(scope="session", autouse=True)
+def nsvb_cache_dir(tmp_path_factory):
+    """
+    Keep store files and digest records written by the tests out of the
+    user's cache directory.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("NSVB_CACHE_DIR", str(tmp_path_factory.mktemp("nsvb-cache")))
+        _load_store_files.cache_clear()
+        yield
+    _load_store_files.cache_clear()
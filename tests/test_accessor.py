@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import nsvb.accessor  # noqa: E402, F401
+from nsvb import batch  # noqa: E402
+
+TREES = {
+    "SPCD": [202, 631, 316, 802, 202, 316],
+    "DIA": [20.0, 11.3, 11.1, 18.1, 5.0, 25.0],
+    "HT": [110, 28, 38, 65, 40, 90],
+    "DIVISION": ["240", "M240", "M210", "M220", "240", None],
+    "CULL": [0, 10, 3, 2, 0, np.nan],
+}
+
+
+def _expected(components=None):
+    return batch.estimate_trees(
+        TREES["SPCD"],
+        TREES["DIA"],
+        TREES["HT"],
+        ["" if d is None else d for d in TREES["DIVISION"]],
+        np.nan_to_num(TREES["CULL"]),
+        components=components,
+    )
+
+
+class TestAccessor:
+    """
+    Runs the DataFrame accessor against the batch estimators.
+    """
+
+    def test_estimate(self):
+        df = pd.DataFrame(TREES)
+        result = df.nsvb.estimate()
+        assert result is df
+        for name, values in _expected().items():
+            np.testing.assert_array_equal(df[name].to_numpy(), values)
+
+    def test_categorical_columns(self):
+        df = pd.DataFrame(TREES).astype({"SPCD": "category", "DIVISION": "category"})
+        df.nsvb.estimate(components=["agb", "w_tot_ib"])
+        assert list(df.columns[-2:]) == ["agb", "w_tot_ib"]
+        for name, values in _expected(["agb", "w_tot_ib"]).items():
+            np.testing.assert_array_equal(df[name].to_numpy(), values)
+
+    def test_column_names(self):
+        df = pd.DataFrame(TREES).rename(columns={"SPCD": "sp", "DIVISION": "ecodiv"})
+        df = df.drop(columns="CULL")
+        df.nsvb.estimate(components=["agb"], spcd="sp", division="ecodiv")
+        np.testing.assert_array_equal(df["agb"].to_numpy(), _expected(["agb"])["agb"])
+
+    def test_missing_species(self):
+        df = pd.DataFrame(TREES).astype({"SPCD": "Int64"})
+        df.loc[0, "SPCD"] = pd.NA
+        with pytest.raises(KeyError):
+            df.nsvb.estimate()
+        df.nsvb.estimate(components=["agb"], errors="nan")
+        assert np.isnan(df["agb"].iloc[0])
+        np.testing.assert_array_equal(
+            df["agb"].to_numpy()[1:], _expected(["agb"])["agb"][1:]
+        )
@@ -0,0 +1,144 @@
+import numpy as np
+import pytest
+
+from nsvb.aggregate import aggregate_trees, encode_groups
+from nsvb.batch import EncodedDivisions, estimate_trees
+
+
+@pytest.fixture(scope="module")
+def trees():
+    rng = np.random.default_rng(0)
+    n = 5000
+    return {
+        "spcd": rng.choice([202, 316, 802, 631, 12], n),
+        "dia": rng.uniform(5, 30, n),
+        "ht": rng.uniform(30, 100, n),
+        "division": rng.choice(["240", "M220", "210", ""], n),
+        "plot": rng.integers(10**12, 10**12 + 50, n),
+        "tpa": rng.choice([6.018, 74.965], n),
+        "cull": rng.choice([0, 5, 10], n),
+    }
+
+
+def _expected(trees, keys, component):
+    """
+    Totals by sorting the keys, for comparison.
+    """
+    results = estimate_trees(
+        trees["spcd"],
+        trees["dia"],
+        trees["ht"],
+        trees["division"],
+        cull=trees["cull"],
+    )
+    unique, inverse = np.unique(np.stack(keys, axis=1), axis=0, return_inverse=True)
+    totals = np.bincount(inverse.ravel(), weights=results[component] * trees["tpa"])
+    return unique, totals
+
+
+class TestEncodeGroups:
+    """
+    Checks the group IDs against sorting the keys.
+    """
+
+    def test_single_key(self, trees):
+        ids, keys = encode_groups(trees["plot"], len(trees["plot"]))
+        unique, inverse = np.unique(trees["plot"], return_inverse=True)
+        np.testing.assert_array_equal(keys, unique)
+        np.testing.assert_array_equal(ids, inverse)
+
+    def test_several_keys(self, trees):
+        groups = {"plot": trees["plot"], "spcd": trees["spcd"]}
+        ids, keys = encode_groups(groups, len(trees["plot"]))
+        unique, inverse = np.unique(
+            np.stack([trees["plot"], trees["spcd"]], axis=1),
+            axis=0,
+            return_inverse=True,
+        )
+        np.testing.assert_array_equal(keys["plot"], unique[:, 0])
+        np.testing.assert_array_equal(keys["spcd"], unique[:, 1])
+        np.testing.assert_array_equal(ids, inverse.ravel())
+
+    def test_sparse_keys(self):
+        plot = np.array([3 * 10**15, 7, 3 * 10**15, -2])
+        ids, keys = encode_groups({"plot": plot, "x": [1, 1, 2, 1]}, 4)
+        np.testing.assert_array_equal(keys["plot"], [-2, 7, 3 * 10**15, 3 * 10**15])
+        np.testing.assert_array_equal(keys["x"], [1, 1, 1, 2])
+        np.testing.assert_array_equal(ids, [2, 1, 3, 0])
+
+    def test_string_and_encoded_keys(self):
+        division = EncodedDivisions([1, -1, 0, 1], ["M220", "240"])
+        ids, keys = encode_groups({"division": division, "state": "OR"}, 4)
+        np.testing.assert_array_equal(keys["division"], ["M220", "240", ""])
+        np.testing.assert_array_equal(keys["state"], ["OR"] * 3)
+        np.testing.assert_array_equal(ids, [1, 2, 0, 1])
+
+    def test_boolean_keys(self):
+        ids, keys = encode_groups(np.array([True, False, True]), 3)
+        np.testing.assert_array_equal(keys, [False, True])
+        np.testing.assert_array_equal(ids, [1, 0, 1])
+
+        ids, keys = encode_groups({"live": [True, True], "x": [2, 1]}, 2)
+        np.testing.assert_array_equal(keys["live"], [True, True])
+        np.testing.assert_array_equal(keys["x"], [1, 2])
+        np.testing.assert_array_equal(ids, [1, 0])
+
+
+class TestAggregateTrees:
+    """
+    Runs the single-pass aggregation against per-tree estimates.
+    """
+
+    def test_matches_per_tree_totals(self, trees):
+        result = aggregate_trees(
+            trees["spcd"],
+            trees["dia"],
+            trees["ht"],
+            trees["division"],
+            groups={"plot": trees["plot"], "spcd": trees["spcd"]},
+            expansion=trees["tpa"],
+            chunk_size=777,
+            cull=trees["cull"],
+        )
+        keys, expected = _expected(trees, [trees["plot"], trees["spcd"]], "agb")
+        np.testing.assert_array_equal(result.keys["plot"], keys[:, 0])
+        np.testing.assert_array_equal(result.keys["spcd"], keys[:, 1])
+        np.testing.assert_allclose(result.totals["agb"], expected, rtol=1e-12)
+        assert result.n_trees.sum() == len(trees["spcd"])
+
+    def test_single_group(self, trees):
+        result = aggregate_trees(
+            trees["spcd"],
+            trees["dia"],
+            trees["ht"],
+            trees["division"],
+            expansion=trees["tpa"],
+            components=["v_tot_ib"],
+            cull=trees["cull"],
+        )
+        _, expected = _expected(trees, [np.zeros(len(trees["spcd"]))], "v_tot_ib")
+        np.testing.assert_allclose(result.totals["v_tot_ib"], expected, rtol=1e-12)
+        assert list(result.totals) == ["v_tot_ib"]
+
+    def test_float32(self, trees):
+        args = (trees["spcd"], trees["dia"], trees["ht"], trees["division"])
+        expected = aggregate_trees(*args, groups=trees["plot"], expansion=trees["tpa"])
+        result = aggregate_trees(
+            *args, groups=trees["plot"], expansion=trees["tpa"], dtype=np.float32
+        )
+        for name, totals in expected.totals.items():
+            assert result.totals[name].dtype == np.float64
+            np.testing.assert_allclose(result.totals[name], totals, rtol=1e-6)
+
+    def test_unresolved_trees(self):
+        result = aggregate_trees(
+            [202, 1, 202], 10.0, 50.0, groups=[1, 1, 2], errors="nan"
+        )
+        assert np.isnan(result.totals["agb"][0])
+        assert np.isfinite(result.totals["agb"][1])
+
+    def test_invalid_arguments(self, trees):
+        with pytest.raises(ValueError):
+            aggregate_trees(202, 10.0, 50.0, components=["volume"])
+        with pytest.raises(ValueError):
+            aggregate_trees(202, 10.0, 50.0, chunk_size=0)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from nsvb import arrow, batch  # noqa: E402
+
+SPCD = [202, 631, 316, 802, 202, 1]
+DIA = [20.0, 11.3, 11.1, 18.1, 5.0, 10.0]
+HT = [110, 28, 38, 65, 40, 50]
+DIVISION = ["240", "M240", "M210", "M220", None, "240"]
+
+
+@pytest.fixture
+def table():
+    return pa.table({"SPCD": SPCD, "DIA": DIA, "HT": HT, "DIVISION": DIVISION})
+
+
+def _expected(components=None):
+    division = ["" if d is None else d for d in DIVISION]
+    return batch.estimate_trees(
+        SPCD, DIA, HT, division, components=components, errors="nan"
+    )
+
+
+class TestArrow:
+    """
+    Runs the Arrow and Parquet paths against the batch estimators.
+    """
+
+    def test_estimate_table(self, table):
+        result = arrow.estimate_table(table, errors="nan")
+        assert result.column_names[:4] == table.column_names
+        for name, values in _expected().items():
+            column = result.column(name)
+            assert column.type == pa.float64()
+            assert column.null_count == 1
+            np.testing.assert_array_equal(column.to_numpy()[:-1], values[:-1])
+
+    def test_dictionary_division(self, table):
+        encoded = table.set_column(
+            3, "DIVISION", table.column("DIVISION").dictionary_encode()
+        )
+        result = arrow.estimate_table(encoded, components=["agb"], errors="nan")
+        np.testing.assert_array_equal(
+            result.column("agb").to_numpy()[:-1], _expected(["agb"])["agb"][:-1]
+        )
+
+    def test_zero_copy_inputs(self, table):
+        batch_ = table.to_batches()[0]
+        inputs = arrow._inputs(batch_, batch.INPUT_COLUMNS)
+        assert np.shares_memory(
+            inputs["dia"], np.frombuffer(batch_.column("DIA").buffers()[1], "f8")
+        )
+        assert isinstance(inputs["division"], batch.EncodedDivisions)
+
+    def test_missing_column(self, table):
+        with pytest.raises(ValueError):
+            arrow.estimate_table(table.drop_columns(["HT"]))
+
+    def test_errors_raise(self, table):
+        with pytest.raises(KeyError):
+            arrow.estimate_table(table)
+
+    def test_estimate_parquet(self, table, tmp_path):
+        source, dest = tmp_path / "trees.parquet", tmp_path / "out.parquet"
+        pq.write_table(table, source, row_group_size=4)
+        assert arrow.estimate_parquet(source, dest, errors="nan") == len(SPCD)
+
+        parquet_file = pq.ParquetFile(dest)
+        assert parquet_file.num_row_groups == 2
+        result = parquet_file.read()
+        for name, values in _expected().items():
+            np.testing.assert_array_equal(
+                result.column(name).to_numpy()[:-1], values[:-1]
+            )
+
+    def test_integer_columns_with_nulls(self, table):
+        table = table.set_column(
+            2, "HT", pa.array(HT[:-1] + [None], type=pa.int64())
+        ).append_column("DECAYCD", pa.array([None] * 5 + [2], type=pa.int64()))
+        result = arrow.estimate_table(table, components=["agb"], errors="nan")
+        assert result.column("agb").null_count == 1
+        np.testing.assert_array_equal(
+            result.column("agb").to_numpy()[:-1], _expected(["agb"])["agb"][:-1]
+        )
@@ -0,0 +1,322 @@
+import numpy as np
+import pytest
+
+from nsvb import batch, estimators
+from nsvb.tables import TABLES
+
+# The batch kernels use NumPy's vectorized pow/exp, which may round the last
+# bit differently from the C library used by the scalar functions.
+RTOL = 1e-13
+
+COMPONENTS = [
+    "total_inside_bark_wood_volume",
+    "total_bark_wood_volume",
+    "total_outside_bark_volume",
+    "total_stem_wood_dry_weight",
+    "total_stem_bark_weight",
+    "total_branch_weight",
+    "total_aboveground_biomass",
+    "total_foliage_dry_weight",
+]
+
+# Trees from the GTR examples plus extra species covering every model form,
+# unknown divisions and the Jenkins group fallback.
+TREES = [
+    (202, 20.0, 110, "240"),
+    (316, 11.1, 38, "M210"),
+    (631, 11.3, 28, "M240"),
+    (802, 18.1, 65, "M220"),
+    (202, 5.0, 40, "240"),
+    (12, 8.2, 45, "210"),
+    (12, 14.0, 70, "130"),
+    (316, 25.0, 90, ""),
+    (611, 2.5, 15, "230"),
+    (833, 16.4, 80, "M999"),
+]
+
+
+@pytest.fixture(scope="module")
+def trees():
+    spcd, dia, ht, division = zip(*TREES)
+    return np.array(spcd), np.array(dia), np.array(ht), np.array(division)
+
+
+class TestBatchEstimators:
+    """
+    Runs the vectorized estimators against the scalar estimators.
+    """
+
+    @pytest.mark.parametrize("component", COMPONENTS)
+    def test_matches_scalar(self, component, trees):
+        scalar_function = getattr(estimators, component)
+        batch_function = getattr(batch, component)
+        expected = [scalar_function(*tree) for tree in TREES]
+        np.testing.assert_allclose(batch_function(*trees), expected, rtol=RTOL)
+
+    def test_matches_scalar_with_cull(self, trees):
+        cull = np.array([0, 3, 10, 2, 0, 5, 0, 50, 1, 0])
+        expected = [
+            estimators.total_stem_wood_dry_weight(*tree, cull=c)
+            for tree, c in zip(TREES, cull.tolist())
+        ]
+        np.testing.assert_allclose(
+            batch.total_stem_wood_dry_weight(*trees, cull=cull), expected, rtol=RTOL
+        )
+
+    def test_broadcasts_scalars(self):
+        """
+        Scalar inputs are broadcast against the array inputs.
+        """
+        dia = np.array([10.0, 20.0])
+        result = batch.total_aboveground_biomass(202, dia, 110, "240")
+        expected = [
+            estimators.total_aboveground_biomass(202, d, 110, "240") for d in dia
+        ]
+        assert result.shape == (2,)
+        np.testing.assert_allclose(result, expected, rtol=RTOL)
+
+    def test_empty_input(self):
+        result = batch.total_inside_bark_wood_volume([], [], [], [])
+        assert result.shape == (0,)
+
+    def test_unknown_species(self):
+        with pytest.raises(KeyError):
+            batch.total_inside_bark_wood_volume([202, 1], [10.0, 10.0], [50, 50])
+
+
+class TestEstimateTrees:
+    """
+    Runs the vectorized full-tree pipeline against the scalar pipeline.
+    """
+
+    def test_matches_estimate_tree(self, trees):
+        cull = np.array([0, 3, 10, 2, 0, 5, 0, 50, 1, 0])
+        result = batch.estimate_trees(*trees, cull=cull)
+        assert list(result) == list(estimators.COMPONENTS)
+        for i, (tree, c) in enumerate(zip(TREES, cull.tolist())):
+            expected = estimators.estimate_tree(*tree, cull=c)
+            for name, value in expected.items():
+                np.testing.assert_allclose(result[name][i], value, rtol=RTOL)
+
+    def test_selected_components(self, trees):
+        result = batch.estimate_trees(*trees, components=["agb", "w_tot_ib"])
+        assert list(result) == ["agb", "w_tot_ib"]
+        np.testing.assert_array_equal(
+            result["agb"], batch.total_aboveground_biomass(*trees)
+        )
+
+    def test_unknown_component(self, trees):
+        with pytest.raises(ValueError):
+            batch.estimate_trees(*trees, components=["carbon"])
+
+    def test_errors_nan(self, trees):
+        """
+        Unknown species and species without coefficients give NaN.
+        """
+        spcd, dia, ht, division = (
+            np.append(a, b) for a, b in zip(trees, (1, 10.0, 50, ""))
+        )
+        result = batch.estimate_trees(spcd, dia, ht, division, errors="nan")
+        expected = batch.estimate_trees(*trees)
+        for name, values in result.items():
+            np.testing.assert_array_equal(values[:-1], expected[name])
+            assert np.isnan(values[-1])
+
+
+class TestEncodedDivisions:
+    """
+    Checks dictionary-encoded divisions against division strings.
+    """
+
+    def test_matches_strings(self):
+        categories = np.array(["M240", "240", "M999"])
+        indices = np.array([0, 1, 2, -1, 1])
+        divisions = np.append(categories, "")[indices]
+        spcd, dia, ht = [631, 202, 316, 802, 202], 12.0, 40.0
+        expected = batch.estimate_trees(spcd, dia, ht, divisions)
+        result = batch.estimate_trees(
+            spcd, dia, ht, batch.EncodedDivisions(indices, categories)
+        )
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
+
+
+class TestCarbon:
+    """
+    Runs the vectorized carbon conversion against the scalar lookups.
+    """
+
+    def test_matches_scalar(self):
+        spcd = sorted(TABLES["s10a"])
+        for decaycd in range(6):
+            expected = []
+            for s in spcd:
+                try:
+                    expected.append(estimators.carbon_fraction(s, decaycd))
+                except KeyError:
+                    expected.append(np.nan)
+            np.testing.assert_array_equal(
+                batch.carbon_fraction(spcd, decaycd), expected
+            )
+
+    def test_to_carbon(self, trees):
+        agb = batch.total_aboveground_biomass(*trees)
+        decaycd = np.array([0, 2, 0, 5, 1, 0, 3, 0, 4, np.nan])
+        expected = [
+            estimators.to_carbon(s, b, int(d) if d == d else 0)
+            for s, b, d in zip(trees[0].tolist(), agb.tolist(), decaycd.tolist())
+        ]
+        np.testing.assert_array_equal(batch.to_carbon(trees[0], agb, decaycd), expected)
+
+    def test_invalid_inputs(self):
+        with pytest.raises(KeyError):
+            batch.carbon_fraction([202, 99999])
+        with pytest.raises(ValueError):
+            batch.carbon_fraction(202, 6)
+
+
+class TestDeadTrees:
+    """
+    Runs the dead tree reductions against GTR example 3, a dead (DECAYCD = 2)
+    tanoak, before its broken top reductions.
+    """
+
+    # Reduced weights of example 3 divided by its broken top ratios (Rm for
+    # wood and bark, BranchRem for branches).
+    W_TOT_IB = 204.13865566837 / 0.968066877159
+    W_TOT_BK = 29.005863664008 / 0.968066877159
+    W_BRANCH = 30.718374921312 / 0.338624338624
+
+    # The GTR rounds its intermediate volumes.
+    RTOL = 1e-6
+
+    def test_example_3(self):
+        result = batch.estimate_trees(631, 11.3, 28, "M240", cull=10, decaycd=2)
+        np.testing.assert_allclose(result["w_tot_ib"], self.W_TOT_IB, rtol=self.RTOL)
+        np.testing.assert_allclose(result["w_tot_bk"], self.W_TOT_BK, rtol=self.RTOL)
+        np.testing.assert_allclose(result["w_branch"], self.W_BRANCH, rtol=self.RTOL)
+        assert result["w_foliage"][0] == 0
+
+        live = estimators.estimate_tree(631, 11.3, 28, "M240")
+        gross = live["w_tot_ib"] + live["w_tot_bk"] + live["w_branch"]
+        reduced = self.W_TOT_IB + self.W_TOT_BK + self.W_BRANCH
+        np.testing.assert_allclose(
+            result["agb"], live["agb"] * reduced / gross, rtol=self.RTOL
+        )
+
+    def test_live_trees_unchanged(self, trees):
+        cull = np.array([0, 3, 10, 2, 0, 5, 0, 50, 1, 0])
+        decaycd = np.array([0, 2, 0, 5, 1, 0, 3, 0, 4, np.nan])
+        result = batch.estimate_trees(*trees, cull=cull, decaycd=decaycd)
+        expected = batch.estimate_trees(*trees, cull=cull)
+        live = (decaycd == 0) | np.isnan(decaycd)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name][live], values[live])
+            if name.startswith("v_"):
+                np.testing.assert_array_equal(result[name], values)
+
+    def test_selected_components(self, trees):
+        decaycd = np.arange(len(TREES)) % 6
+        result = batch.estimate_trees(*trees, decaycd=decaycd)
+        for name in ("w_tot_ib", "agb"):
+            selected = batch.estimate_trees(*trees, components=[name], decaycd=decaycd)
+            np.testing.assert_array_equal(selected[name], result[name])
+
+    def test_component_estimators(self, trees):
+        cull = np.array([0, 3, 10, 2, 0, 5, 0, 50, 1, 0])
+        decaycd = np.arange(len(TREES)) % 6
+        expected = batch.estimate_trees(*trees, cull=cull, decaycd=decaycd)
+        estimators_ = {
+            "w_tot_bk": batch.total_stem_bark_weight,
+            "w_branch": batch.total_branch_weight,
+            "agb": batch.total_aboveground_biomass,
+            "w_foliage": batch.total_foliage_dry_weight,
+        }
+        np.testing.assert_array_equal(
+            batch.total_stem_wood_dry_weight(*trees, cull, decaycd=decaycd),
+            expected["w_tot_ib"],
+        )
+        for name, estimator in estimators_.items():
+            np.testing.assert_array_equal(
+                estimator(*trees, decaycd=decaycd), expected[name]
+            )
+
+    def test_invalid_decay_code(self, trees):
+        with pytest.raises(ValueError):
+            batch.estimate_trees(*trees, decaycd=6)
+        with pytest.raises(ValueError):
+            batch.total_stem_bark_weight(*trees, decaycd=6)
+
+
+class TestBrokenTops:
+    """
+    Runs the broken top reductions against GTR examples 3 and 4.
+    """
+
+    # The GTR rounds its intermediate volumes.
+    RTOL = 1e-6
+
+    def test_example_3(self):
+        """
+        Dead tanoak with an actual height of 21 ft and the Table S11 mean
+        crown ratio of its province (M242).
+        """
+        result = batch.estimate_trees(
+            631, 11.3, 28, "M240", cull=10, decaycd=2, actual_ht=21, province="M242"
+        )
+        np.testing.assert_allclose(result["w_tot_ib"], 204.13865566837, rtol=self.RTOL)
+        np.testing.assert_allclose(result["w_tot_bk"], 29.005863664008, rtol=self.RTOL)
+        np.testing.assert_allclose(result["w_branch"], 30.718374921312, rtol=self.RTOL)
+
+    def test_example_4(self):
+        """
+        Live white oak with an actual height of 59 ft and an observed crown
+        ratio of 30 percent.
+        """
+        result = batch.estimate_trees(
+            802, 18.1, 65, "M220", cull=2, actual_ht=59, cr=30
+        )
+        np.testing.assert_allclose(
+            result["w_tot_ib"], 1564.617593936140, rtol=self.RTOL
+        )
+        np.testing.assert_allclose(result["w_tot_bk"], 236.594620449755, rtol=self.RTOL)
+        np.testing.assert_allclose(result["w_branch"], 575.250923828242, rtol=self.RTOL)
+        np.testing.assert_allclose(result["w_foliage"], 35.716121518954, rtol=self.RTOL)
+
+        intact = batch.estimate_trees(802, 18.1, 65, "M220", cull=2)
+        for name in ("v_tot_ib", "v_tot_bk", "v_tot_ob"):
+            assert result[name][0] == intact[name][0]
+        assert result["agb"][0] < intact["agb"][0]
+
+    def test_cull_does_not_reduce_agb_of_intact_tops(self):
+        """
+        A top broken just below the height leaves the AGB of a culled live
+        tree as it is without an actual height.
+        """
+        intact = batch.estimate_trees(802, 18.1, 65, "M220", cull=50, cr=30)
+        result = batch.estimate_trees(
+            802, 18.1, 65, "M220", cull=50, actual_ht=64.999, cr=30
+        )
+        np.testing.assert_allclose(result["agb"], intact["agb"], rtol=1e-4)
+
+    def test_intact_trees_unchanged(self, trees):
+        actual_ht = np.array([100, np.nan, 0, 65, 40, 50, 35, np.nan, 15, 80])
+        result = batch.estimate_trees(*trees, actual_ht=actual_ht, cr=40)
+        expected = batch.estimate_trees(*trees)
+        intact = ~((actual_ht > 0) & (actual_ht < trees[2]))
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name][intact], values[intact])
+            assert (result[name][~intact] <= values[~intact]).all()
+
+    def test_encoded_provinces(self, trees):
+        actual_ht = trees[2] * 0.75
+        provinces = np.array(["M242", "", "212", "M242", "212"] * 2)
+        categories, indices = np.unique(provinces, return_inverse=True)
+        result = batch.estimate_trees(
+            *trees,
+            actual_ht=actual_ht,
+            province=batch.EncodedDivisions(indices, categories),
+        )
+        expected = batch.estimate_trees(*trees, actual_ht=actual_ht, province=provinces)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from nsvb import estimators
+from nsvb.cache import ResultCache, cache_info, disable_cache, enable_cache
+
+
+@pytest.fixture
+def cache():
+    yield enable_cache(maxsize=4)
+    disable_cache()
+
+
+class TestResultCache:
+    """
+    Checks the opt-in LRU cache in front of the scalar estimators.
+    """
+
+    def test_disabled_by_default(self):
+        assert cache_info() is None
+
+    def test_same_results(self, cache):
+        expected = [
+            estimators._evaluate(name, 202, 20.0, 110, "240") for name in ("s1", "s8")
+        ]
+        for _ in range(2):
+            assert (
+                estimators.total_inside_bark_wood_volume(202, 20.0, 110, "240")
+                == expected[0]
+            )
+            assert (
+                estimators.total_aboveground_biomass(202, 20.0, 110, "240")
+                == expected[1]
+            )
+        info = cache.info()
+        assert (info.hits, info.misses, info.currsize) == (2, 2, 2)
+
+    def test_lru_eviction(self, cache):
+        for dia in (10.0, 11.0, 12.0, 13.0):
+            estimators.total_aboveground_biomass(202, dia, 60)
+        estimators.total_aboveground_biomass(202, 10.0, 60)
+        estimators.total_aboveground_biomass(202, 14.0, 60)
+        assert cache.info().evictions == 1
+        estimators.total_aboveground_biomass(202, 10.0, 60)
+        estimators.total_aboveground_biomass(202, 11.0, 60)
+        info = cache.info()
+        assert (info.hits, info.misses, info.evictions, info.currsize) == (2, 6, 2, 4)
+
+    def test_quantization(self):
+        cache = enable_cache(dia_decimals=1, ht_decimals=0)
+        try:
+            first = estimators.total_aboveground_biomass(202, 20.04, 110.2)
+            second = estimators.total_aboveground_biomass(202, 19.96, 109.8)
+        finally:
+            disable_cache()
+        assert first == second == estimators.total_aboveground_biomass(202, 20.0, 110.0)
+        assert cache.info().hits == 1
+
+    def test_errors_are_not_cached(self, cache):
+        for _ in range(2):
+            with pytest.raises(KeyError):
+                estimators.total_aboveground_biomass(1, 10.0, 50)
+        assert cache.info().currsize == 0
+
+    def test_threads(self):
+        cache = ResultCache(maxsize=16)
+        calls = []
+
+        def evaluate(*args):
+            calls.append(args)
+            return estimators._evaluate(*args)
+
+        def work():
+            for dia in range(1, 33):
+                cache.get("s8", 202, "", float(dia), 60.0, evaluate)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = cache.info()
+        assert info.hits + info.misses == 8 * 32
+        assert info.misses == len(calls)
+        assert info.currsize == 16
+        assert info.evictions == info.misses - 16
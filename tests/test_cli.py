@@ -0,0 +1,136 @@
+import csv
+import io
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from nsvb import batch
+from nsvb.cli import main, process_csv
+
+CSV = (
+    "TREE,SPCD,DIA,HT,DIVISION,CULL\n"
+    "1,202,20.0,110,240,\n"
+    "2,631,11.3,28,M240,10\n"
+    "3,1,5.0,30,,\n"
+    "4,,5.0,30,,\n"
+    "5,316,11.1,38,M210,3\n"
+)
+
+
+def _read(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+class TestProcessCsv:
+    """
+    Streams CSVs through the batch engine.
+    """
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 100])
+    def test_matches_estimate_trees(self, chunk_size):
+        dest = io.StringIO()
+        total = process_csv(io.StringIO(CSV), dest, chunk_size=chunk_size)
+        assert total == 5
+
+        rows = _read(dest.getvalue())
+        assert [row["TREE"] for row in rows] == ["1", "2", "3", "4", "5"]
+        expected = batch.estimate_trees(
+            [202, 631, 316],
+            [20.0, 11.3, 11.1],
+            [110, 28, 38],
+            ["240", "M240", "M210"],
+            [0, 10, 3],
+        )
+        for name, values in expected.items():
+            result = [float(rows[i][name]) for i in (0, 1, 4)]
+            np.testing.assert_array_equal(result, values)
+            assert rows[2][name] == rows[3][name] == ""
+
+    def test_column_mapping(self):
+        source = io.StringIO("species,d,h\n202,20.0,110\n")
+        dest = io.StringIO()
+        process_csv(
+            source,
+            dest,
+            components=["v_tot_ib"],
+            columns={"spcd": "species", "dia": "d", "ht": "h"},
+        )
+        rows = _read(dest.getvalue())
+        assert list(rows[0]) == ["species", "d", "h", "v_tot_ib"]
+        assert (
+            float(rows[0]["v_tot_ib"])
+            == batch.total_inside_bark_wood_volume(202, 20.0, 110)[0]
+        )
+
+    def test_missing_column(self):
+        with pytest.raises(ValueError):
+            process_csv(io.StringIO("SPCD,DIA\n202,20\n"), io.StringIO())
+
+    def test_errors_raise(self):
+        with pytest.raises(KeyError):
+            process_csv(io.StringIO(CSV), io.StringIO(), errors="raise")
+
+    def test_bad_rows_nan(self):
+        source = CSV + "6,202,x,110,240,\n7,202,20.0\n\n8,202,20.0,110,240,\n"
+        dest = io.StringIO()
+        assert process_csv(io.StringIO(source), dest) == 8
+
+        rows = _read(dest.getvalue())
+        assert [row["TREE"] for row in rows[5:]] == ["6", "7", "8"]
+        assert rows[5]["agb"] == rows[6]["agb"] == ""
+        assert rows[6]["DIVISION"] == ""
+        assert rows[7]["agb"] == rows[0]["agb"]
+
+    @pytest.mark.parametrize(
+        "row, message",
+        [("6,202,x,110,240,", "Line 3 .*DIA value 'x'"), ("6,202,20.0", "Line 3 ")],
+    )
+    def test_bad_rows_raise(self, row, message):
+        source = "TREE,SPCD,DIA,HT,DIVISION,CULL\n1,202,20.0,110,240,\n" + row
+        with pytest.raises(ValueError, match=message):
+            process_csv(io.StringIO(source), io.StringIO(), errors="raise")
+
+
+class TestMain:
+    """
+    Runs the ``nsvb`` command.
+    """
+
+    def test_files(self, tmp_path, capsys):
+        source = tmp_path / "trees.csv"
+        source.write_text(CSV)
+        dest = tmp_path / "out.csv"
+        assert main([str(source), "-o", str(dest), "-c", "agb, w_foliage"]) == 0
+
+        rows = _read(dest.read_text())
+        assert list(rows[0])[-2:] == ["agb", "w_foliage"]
+        assert "5 trees in" in capsys.readouterr().err
+
+    def test_stdin_stdout(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "nsvb", "-q", "-c", "agb"],
+            input=CSV,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        rows = _read(result.stdout)
+        assert len(rows) == 5
+        assert result.stderr == ""
+
+    def test_short_row_raise(self, tmp_path, capsys):
+        source = tmp_path / "trees.csv"
+        source.write_text("SPCD,DIA,HT\n202,20.0\n")
+        with pytest.raises(SystemExit) as e:
+            main([str(source), "-o", str(tmp_path / "out.csv"), "--errors", "raise"])
+        assert e.value.code == 1
+        assert "Line 2" in capsys.readouterr().err
+
+    def test_unknown_component(self, tmp_path):
+        source = tmp_path / "trees.csv"
+        source.write_text(CSV)
+        with pytest.raises(SystemExit) as e:
+            main([str(source), "-c", "carbon"])
+        assert e.value.code == 1
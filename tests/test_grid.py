@@ -0,0 +1,223 @@
+import numpy as np
+import pytest
+
+from nsvb import grid
+from nsvb.batch import EncodedDivisions, estimate_trees
+from nsvb.estimators import COMPONENTS
+from nsvb.grid import (
+    DEFAULT_RTOL,
+    DIA_RANGE,
+    HT_RANGE,
+    build_grid,
+    grid_filename,
+    interpolate_trees,
+    interpolation_grid,
+    read_grid,
+    write_grid,
+)
+
+# Species with a segmented (12), continuously variable (800) and
+# exponential (11) s1 model form, division-specific coefficients (202) and
+# Jenkins coefficients (631).
+SPECIES = [(12, ""), (800, ""), (11, ""), (202, "240"), (631, "M240")]
+
+
+def _random_trees(n, seed=0):
+    rng = np.random.default_rng(seed)
+    dia = np.exp(rng.uniform(*np.log(DIA_RANGE), n))
+    ht = np.exp(rng.uniform(*np.log(HT_RANGE), n))
+    return dia, ht
+
+
+@pytest.fixture(autouse=True)
+def grid_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("NSVB_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(grid, "_grids", {})
+    return tmp_path / "grids"
+
+
+class TestBuildGrid:
+    """
+    Checks the interpolation error of built grids against the model forms.
+    """
+
+    @pytest.mark.parametrize("spcd, division", SPECIES)
+    def test_error_within_rtol(self, spcd, division):
+        dia, ht = _random_trees(5000)
+        exact = estimate_trees(spcd, dia, ht, division)
+        for component in COMPONENTS:
+            result = build_grid(spcd, division, component)
+            assert result.max_error <= DEFAULT_RTOL
+            np.testing.assert_allclose(
+                result(dia, ht), exact[component], rtol=DEFAULT_RTOL
+            )
+
+    @pytest.mark.parametrize("spcd, division", SPECIES)
+    def test_error_within_bound(self, spcd, division):
+        """
+        The error at dense points inside every cell is within the recorded
+        bound, up to rounding.
+        """
+        fractions = np.array([0.05, 0.15, 0.35, 0.45, 0.55, 0.65, 0.85, 0.95])
+        for component in COMPONENTS:
+            result = build_grid(spcd, division, component)
+            log_dia = result.log_dia[:-1, None] + np.outer(
+                np.diff(result.log_dia), fractions
+            )
+            log_ht = result.log_ht[:-1, None] + np.outer(
+                np.diff(result.log_ht), fractions
+            )
+            dia, ht = (
+                np.exp(a).ravel()
+                for a in np.meshgrid(log_dia.ravel(), log_ht.ravel(), indexing="ij")
+            )
+            exact = estimate_trees(spcd, dia, ht, division, components=[component])
+            error = np.abs(result(dia, ht) / exact[component] - 1).max()
+            assert error <= result.max_error + 1e-12
+
+    def test_power_law_is_exact(self):
+        # SPCD 202 has segmented s1 and power-law s8 forms, which are not
+        # refined past the initial nodes and segment breaks.
+        for component in ("v_tot_ib", "agb"):
+            result = build_grid(202, "240", component)
+            breaks = grid._segment_breaks(202, "240", component)
+            assert result.max_error == 0
+            assert len(result.log_dia) == grid._INITIAL_NODES + len(breaks)
+            assert len(result.log_ht) == grid._INITIAL_NODES
+
+    def test_form3_peak(self):
+        u = np.linspace(1e-3, 50, 1_000_001)
+        curvature = grid._form3_curvature(u)
+        assert curvature.max() <= grid._FORM3_PEAK_CURVATURE
+        assert u[curvature.argmax()] == pytest.approx(grid._FORM3_PEAK, abs=1e-4)
+
+    def test_exact_at_nodes(self):
+        result = build_grid(202, "240", "v_tot_ob")
+        dia, ht = np.meshgrid(
+            np.exp(result.log_dia), np.exp(result.log_ht), indexing="ij"
+        )
+        expected = estimate_trees(202, dia, ht, "240", components=["v_tot_ob"])
+        np.testing.assert_allclose(
+            result(dia, ht), expected["v_tot_ob"].reshape(dia.shape), rtol=1e-12
+        )
+
+    def test_segment_break_is_a_node(self):
+        result = build_grid(12, "", "v_tot_ib")
+        k = grid._segment_breaks(12, "", "v_tot_ib")
+        assert len(k) == 1
+        assert np.log(k[0]) in result.log_dia
+
+    def test_tighter_rtol_refines(self):
+        coarse = build_grid(202, "240", "v_tot_ob", rtol=1e-2)
+        fine = build_grid(202, "240", "v_tot_ob", rtol=1e-4)
+        assert fine.values.size > coarse.values.size
+        dia, ht = _random_trees(2000)
+        exact = estimate_trees(202, dia, ht, "240", components=["v_tot_ob"])
+        np.testing.assert_allclose(fine(dia, ht), exact["v_tot_ob"], rtol=1e-4)
+
+    def test_unreachable_rtol(self):
+        with pytest.raises(ValueError, match="cannot be interpolated"):
+            build_grid(202, "240", "v_tot_ob", rtol=1e-12, max_nodes=64)
+
+    def test_unknown_species(self):
+        with pytest.raises(KeyError):
+            build_grid(1, "", "agb")
+
+    def test_outside_domain_is_nan(self):
+        result = build_grid(202, "240", "agb")
+        values = result([0.5, 10.0, 150.0, 10.0], [50.0, 2.0, 50.0, 50.0])
+        assert np.isnan(values[:3]).all()
+        assert np.isfinite(values[3])
+
+
+class TestGridCache:
+    """
+    Checks the lazy build, memory and file caches of the grids.
+    """
+
+    def test_written_and_read_back(self, grid_cache, monkeypatch):
+        built = interpolation_grid(202, "240", "agb")
+        path = grid_cache / grid_filename(202, "240", "agb")
+        assert path.exists()
+
+        monkeypatch.setattr(grid, "_grids", {})
+        monkeypatch.setattr(grid, "build_grid", None)
+        read = interpolation_grid(202, "240", "agb")
+        assert read is not built
+        np.testing.assert_array_equal(read.values, built.values)
+        np.testing.assert_array_equal(read.log_dia, built.log_dia)
+        assert read.max_error == built.max_error
+
+    def test_memoized(self):
+        assert interpolation_grid(316, "", "agb") is interpolation_grid(316, "", "agb")
+
+    def test_divisions_share_species_grid(self):
+        # SPCD 316 has no agb coefficients specific to division 240.
+        assert interpolation_grid(316, "240", "agb") is interpolation_grid(316)
+
+    def test_parameters_in_filename(self):
+        assert grid_filename(202, "240", "agb") != grid_filename(
+            202, "240", "agb", rtol=1e-4
+        )
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "grid.npz"
+        assert read_grid(path) is None
+        path.write_bytes(b"not a grid")
+        assert read_grid(path) is None
+
+    def test_round_trip(self, tmp_path):
+        built = build_grid(800, "", "w_foliage")
+        read = read_grid(write_grid(built, tmp_path / "grid.npz"))
+        dia, ht = _random_trees(100)
+        np.testing.assert_array_equal(read(dia, ht), built(dia, ht))
+
+    def test_unwritable_cache(self, tmp_path, monkeypatch):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        monkeypatch.setenv("NSVB_CACHE_DIR", str(blocker))
+        assert interpolation_grid(202, "240", "agb").max_error <= DEFAULT_RTOL
+
+
+class TestInterpolateTrees:
+    """
+    Checks the interpolated estimates of arrays of trees against the exact
+    batch estimates.
+    """
+
+    def test_matches_estimate_trees(self):
+        dia, ht = _random_trees(2000)
+        spcd = np.resize([spcd for spcd, _ in SPECIES], len(dia))
+        division = np.resize([division for _, division in SPECIES], len(dia))
+        expected = estimate_trees(spcd, dia, ht, division)
+        result = interpolate_trees(spcd, dia, ht, division)
+        assert set(result) == set(COMPONENTS)
+        for name in COMPONENTS:
+            np.testing.assert_allclose(result[name], expected[name], rtol=DEFAULT_RTOL)
+
+    def test_outside_domain_is_exact(self):
+        dia = [0.5, 150.0, 10.0, 10.0]
+        ht = [20.0, 120.0, 3.0, 500.0]
+        expected = estimate_trees(202, dia, ht, "240", components=["agb"])
+        result = interpolate_trees(202, dia, ht, "240", components=["agb"])
+        np.testing.assert_array_equal(result["agb"], expected["agb"])
+
+    def test_encoded_divisions(self):
+        dia, ht = _random_trees(100)
+        division = EncodedDivisions(np.resize([0, 1, -1], 100), ["240", "M240"])
+        expected = estimate_trees(202, dia, ht, division, components=["v_tot_ob"])
+        result = interpolate_trees(202, dia, ht, division, components=["v_tot_ob"])
+        np.testing.assert_allclose(
+            result["v_tot_ob"], expected["v_tot_ob"], rtol=DEFAULT_RTOL
+        )
+
+    def test_unresolved_species(self):
+        with pytest.raises(KeyError):
+            interpolate_trees([202, 1], 10.0, 50.0)
+        result = interpolate_trees([202, 1], 10.0, 50.0, errors="nan")
+        assert np.isfinite(result["agb"][0])
+        assert np.isnan(result["agb"][1])
+
+    def test_unknown_component(self):
+        with pytest.raises(ValueError, match="Unknown components"):
+            interpolate_trees(202, 10.0, 50.0, components=["volume"])
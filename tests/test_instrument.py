@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from nsvb import estimators
+from nsvb.batch import estimate_trees
+from nsvb.instrument import (
+    disable_instrumentation,
+    enable_instrumentation,
+    profile,
+    reset,
+    snapshot,
+)
+
+# A division-specific, a species-level, a Jenkins and an unknown species.
+SPCD = [202, 316, 631, 1]
+DIVISION = ["240", "M210", "M240", ""]
+
+# Scalar estimators evaluating one model form each.
+ESTIMATORS = [
+    "total_inside_bark_wood_volume",
+    "total_bark_wood_volume",
+    "total_stem_bark_weight",
+    "total_branch_weight",
+    "total_aboveground_biomass",
+    "total_foliage_dry_weight",
+]
+
+
+@pytest.fixture
+def instrumentation():
+    yield enable_instrumentation()
+    disable_instrumentation()
+
+
+class TestInstrumentation:
+    """
+    Checks the resolution counters, model form counters and timings.
+    """
+
+    def test_scalar_resolution(self, instrumentation):
+        for spcd, division in zip(SPCD[:3], DIVISION[:3]):
+            estimators.total_inside_bark_wood_volume(spcd, 10.0, 50.0, division)
+        estimators.total_aboveground_biomass(202, 10.0, 50.0, "240")
+        result = snapshot()
+        assert result.resolution["s1"] == {"division": 1, "species": 1, "jenkins": 1}
+        assert result.resolution["s8"] == {"division": 1, "species": 0, "jenkins": 0}
+        assert sum(result.model_forms["s1"].values()) == 3
+        assert result.timings["total_inside_bark_wood_volume"].calls == 3
+        assert result.timings["total_aboveground_biomass"].seconds > 0
+
+    def test_batch_matches_scalar(self, instrumentation):
+        estimate_trees(SPCD, 10.0, 50.0, DIVISION, errors="nan")
+        batch = snapshot()
+        reset()
+        for spcd, division in zip(SPCD[:3], DIVISION[:3]):
+            for name in ESTIMATORS:
+                getattr(estimators, name)(spcd, 10.0, 50.0, division)
+        scalar = snapshot()
+        assert batch.resolution == scalar.resolution
+        assert batch.model_forms == scalar.model_forms
+        assert batch.timings["estimate_trees.s1"].calls == 1
+        assert "estimate_trees.reductions" not in batch.timings
+
+    def test_reset(self, instrumentation):
+        estimators.total_branch_weight(202, 10.0, 50.0)
+        reset()
+        result = snapshot()
+        assert result.resolution == {}
+        assert result.timings == {}
+
+    def test_disabled(self):
+        disable_instrumentation()
+        assert snapshot() is None
+        estimators.total_branch_weight(202, 10.0, 50.0)
+        assert estimators._instrumentation is None
+
+    def test_profile_restores_previous(self, instrumentation):
+        with profile() as scoped:
+            estimate_trees(202, 10.0, 50.0, "240", decaycd=2)
+        assert estimators._instrumentation is instrumentation
+        assert snapshot().resolution == {}
+        timings = scoped.snapshot().timings
+        assert timings["estimate_trees.reductions"].calls == 1
+
+    def test_results_unchanged(self):
+        expected = estimate_trees(SPCD, 10.0, 50.0, DIVISION, errors="nan")
+        with profile():
+            result = estimate_trees(SPCD, 10.0, 50.0, DIVISION, errors="nan")
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from nsvb import batch
+from nsvb.jit import NUMBA_AVAILABLE, RTOL, get_backend, set_backend
+from nsvb.tables import compiled_table
+
+TABLE_NAMES = ["s1", "s2", "s6", "s7", "s8", "s9"]
+
+
+@pytest.fixture
+def numba_backend():
+    pytest.importorskip("numba")
+    yield set_backend("numba")
+    set_backend("numpy")
+
+
+class TestBackendSelection:
+    """
+    Checks backend selection with and without numba.
+    """
+
+    def test_default_is_numpy(self):
+        assert get_backend() == "numpy"
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            set_backend("cuda")
+
+    @pytest.mark.skipif(NUMBA_AVAILABLE, reason="numba is installed")
+    def test_falls_back_without_numba(self):
+        with pytest.warns(RuntimeWarning):
+            assert set_backend("numba") == "numpy"
+        assert get_backend() == "numpy"
+
+
+class TestNumbaBackend:
+    """
+    Runs the compiled kernel against the NumPy kernels.
+    """
+
+    @pytest.mark.parametrize("table_name", TABLE_NAMES)
+    def test_every_row(self, numba_backend, table_name):
+        table = compiled_table(table_name)
+        rng = np.random.default_rng(0)
+        # Every row, i.e. every model form and coefficient set, in a random
+        # order with diameters on both sides of the segment thresholds.
+        rows = rng.permutation(np.repeat(np.arange(len(table.model)), 3))
+        dia = rng.uniform(1.0, 40.0, len(rows))
+        ht = rng.uniform(10.0, 150.0, len(rows))
+        result = batch._evaluate(table, rows, dia, ht)
+        set_backend("numpy")
+        expected = batch._evaluate(table, rows, dia, ht)
+        np.testing.assert_allclose(result, expected, rtol=RTOL)
+
+    def test_estimate_trees(self, numba_backend):
+        spcd = [202, 631, 316, 802, 1]
+        division = ["240", "M240", "M210", "M220", ""]
+        result = batch.estimate_trees(spcd, 11.0, 60.0, division, errors="nan")
+        set_backend("numpy")
+        expected = batch.estimate_trees(spcd, 11.0, 60.0, division, errors="nan")
+        for name, values in expected.items():
+            np.testing.assert_allclose(result[name], values, rtol=RTOL)
+
+    def test_estimate_trees_threaded(self, numba_backend):
+        from nsvb.parallel import estimate_trees_threaded
+
+        rng = np.random.default_rng(0)
+        spcd = rng.choice([202, 631, 316, 802], 2000)
+        dia = rng.uniform(1.0, 40.0, 2000)
+        ht = rng.uniform(10.0, 150.0, 2000)
+        result = estimate_trees_threaded(
+            spcd, dia, ht, "240", threads=4, chunk_size=100
+        )
+        set_backend("numpy")
+        expected = batch.estimate_trees(spcd, dia, ht, "240")
+        for name, values in expected.items():
+            np.testing.assert_allclose(result[name], values, rtol=RTOL)
+
+    def test_threaded_with_workqueue_layer(self, numba_backend):
+        """
+        The threaded engine must not launch parallel loops from its threads,
+        which aborts the process with numba's workqueue threading layer.
+        """
+        script = (
+            "import numpy as np\n"
+            "from nsvb.jit import set_backend\n"
+            "from nsvb.parallel import estimate_trees_threaded\n"
+            "set_backend('numba')\n"
+            "n = 20000\n"
+            "result = estimate_trees_threaded(\n"
+            "    np.full(n, 202), np.linspace(5, 30, n), 80.0, '240',\n"
+            "    threads=4, chunk_size=500,\n"
+            ")\n"
+            "assert np.isfinite(result['agb']).all()\n"
+        )
+        env = {
+            **os.environ,
+            "NUMBA_THREADING_LAYER": "workqueue",
+            "NUMBA_NUM_THREADS": "4",
+        }
+        subprocess.run([sys.executable, "-c", script], env=env, check=True)
+
+    def test_process_engine_after_parallel_loops(self, numba_backend):
+        """
+        Once parallel loops have started numba's threading layer, the
+        process engine must not fork it, which can hang the process.
+        """
+        script = (
+            "import numpy as np\n"
+            "from nsvb import batch\n"
+            "from nsvb.jit import parallel_loops_started, set_backend\n"
+            "from nsvb.parallel import estimate_trees_parallel\n"
+            "if __name__ == '__main__':\n"
+            "    set_backend('numba')\n"
+            "    n = 20000\n"
+            "    dia = np.linspace(5, 30, n)\n"
+            "    expected = batch.estimate_trees(202, dia, 80.0, '240')['agb']\n"
+            "    assert parallel_loops_started()\n"
+            "    result = estimate_trees_parallel(\n"
+            "        202, dia, 80.0, '240', processes=2, chunk_size=5000\n"
+            "    )\n"
+            "    np.testing.assert_allclose(result['agb'], expected, rtol=1e-12)\n"
+        )
+        subprocess.run([sys.executable, "-c", script], check=True, timeout=60)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from nsvb import batch
+from nsvb.estimators import _resolve_coefficients
+from nsvb.merch import MERCHANTABLE, SAWLOG, MerchSpec, merchantable_volumes
+from nsvb.models import cumulative_volume_ratio
+from nsvb.profile import solve_height
+
+SPCD = [202, 631, 802, 316, 12, 202, 611]
+DIA = [20.0, 11.3, 18.1, 11.1, 3.0, 8.0, 30.0]
+HT = [110, 28, 65, 38, 20, 50, 95]
+DIVISION = ["240", "M240", "M220", "M210", "", "", "230"]
+
+
+def _ratio_coefficients(table_name):
+    data = [_resolve_coefficients(table_name, s, d)[1] for s, d in zip(SPCD, DIVISION)]
+    return (
+        np.array([row["alpha"] for row in data]),
+        np.array([row["beta"] for row in data]),
+    )
+
+
+class TestMerchantableVolumes:
+    """
+    Checks the merchantable volume engine against the ratio model evaluated
+    tree by tree.
+    """
+
+    def test_matches_ratio_model(self):
+        spec = MerchSpec("v", 4.0, 1.0)
+        result = merchantable_volumes(SPCD, DIA, HT, DIVISION, specs=[spec])["v"]
+
+        alpha, beta = _ratio_coefficients("s4")
+        ht = np.array(HT, dtype=float)
+        v_tot_ob = batch.total_outside_bark_volume(SPCD, DIA, HT, DIVISION)
+        v_tot_ib = batch.total_inside_bark_wood_volume(SPCD, DIA, HT, DIVISION)
+        top_ht, _ = solve_height(np.full(len(HT), 4.0), ht, v_tot_ob, alpha, beta)
+        for i, (s, d) in enumerate(zip(SPCD, DIVISION)):
+            if DIA[i] < 4.0:
+                assert result[i] == 0
+                continue
+            data = _resolve_coefficients("s5", s, d)[1]
+            ratio = cumulative_volume_ratio(top_ht[i], HT[i], **data)
+            ratio -= cumulative_volume_ratio(1.0, HT[i], **data)
+            assert result[i] == pytest.approx(v_tot_ib[i] * ratio, rel=1e-12)
+
+    def test_several_specs(self):
+        result = merchantable_volumes(
+            SPCD, DIA, HT, DIVISION, specs=[MERCHANTABLE, SAWLOG]
+        )
+        v_tot_ib = batch.total_inside_bark_wood_volume(SPCD, DIA, HT, DIVISION)
+        assert list(result) == ["v_merch", "v_saw"]
+        assert (result["v_saw"] <= result["v_merch"]).all()
+        assert (result["v_merch"] < v_tot_ib).all()
+        # Below the minimum diameters: 3 in for both, 8 in softwood for saw.
+        assert result["v_merch"][4] == 0
+        assert result["v_saw"][5] == 0
+        assert result["v_saw"][0] > 0
+
+    def test_errors_nan(self):
+        result = merchantable_volumes([202, 1], 20.0, 110, errors="nan")["v_merch"]
+        assert result[0] > 0
+        assert np.isnan(result[1])
+        with pytest.raises(KeyError):
+            merchantable_volumes([202, 1], 20.0, 110)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from nsvb.models import (
+    ARRAY_MODEL_MAP,
+    MODEL_MAP,
+    cumulative_volume_ratio,
+    cumulative_volume_ratio_array,
+    cumulative_volume_ratio_slope_array,
+)
+
+RTOL = 1e-13
+
+COEFFICIENTS = {
+    "a": 0.0019,
+    "a1": 1.65,
+    "b": 2.16,
+    "b1": 1.69,
+    "c": 0.98,
+    "c1": -0.04,
+    "k": 9.0,
+    "wdsg": 0.45,
+}
+
+
+class TestArrayModels:
+    """
+    Runs the array kernels against the scalar model forms.
+    """
+
+    dia = np.array([1.0, 5.5, 8.999, 9.0, 9.001, 20.0, 45.3])
+    ht = np.array([6.0, 30.0, 55.0, 60.0, 61.0, 110.0, 150.0])
+
+    @pytest.mark.parametrize("model", sorted(MODEL_MAP))
+    def test_scalar_coefficients(self, model):
+        expected = [
+            MODEL_MAP[model](d, h, **COEFFICIENTS)
+            for d, h in zip(self.dia.tolist(), self.ht.tolist())
+        ]
+        result = ARRAY_MODEL_MAP[model](self.dia, self.ht, **COEFFICIENTS)
+        np.testing.assert_allclose(result, expected, rtol=RTOL)
+
+    @pytest.mark.parametrize("model", sorted(MODEL_MAP))
+    def test_coefficient_arrays(self, model):
+        """
+        Each tree can carry its own coefficients.
+        """
+        scale = np.linspace(0.9, 1.1, len(self.dia))
+        coefficients = {name: value * scale for name, value in COEFFICIENTS.items()}
+        expected = [
+            MODEL_MAP[model](
+                d, h, **{name: values[i] for name, values in coefficients.items()}
+            )
+            for i, (d, h) in enumerate(zip(self.dia.tolist(), self.ht.tolist()))
+        ]
+        result = ARRAY_MODEL_MAP[model](self.dia, self.ht, **coefficients)
+        np.testing.assert_allclose(result, expected, rtol=RTOL)
+
+    def test_segmented_threshold(self):
+        """
+        Trees exactly at k use the large-tree segment.
+        """
+        result = ARRAY_MODEL_MAP[2](np.array([9.0]), np.array([60.0]), **COEFFICIENTS)
+        a, b, b1, c, k = (COEFFICIENTS[name] for name in ("a", "b", "b1", "c", "k"))
+        assert result[0] == pytest.approx(
+            a * k ** (b - b1) * 9.0**b1 * 60.0**c, rel=RTOL
+        )
+
+
+class TestCumulativeVolumeRatio:
+    """
+    Checks the cumulative volume ratio model (model 6) and its slope.
+    """
+
+    ht = np.array([20.0, 65.0, 110.0])
+    h = np.array([4.5, 59.0, 100.0])
+    alpha = np.array([2.3, 2.466800456, 1.9])
+    beta = np.array([0.92, 0.842271677, 1.03])
+
+    def test_gtr_example_4(self):
+        """
+        Ratio at the actual height of example 4 (SPCD 802, M220).
+        """
+        ratio = cumulative_volume_ratio(59, 65, alpha=2.466800456, beta=0.842271677)
+        assert ratio == pytest.approx(0.997639540140, abs=1e-12)
+
+    def test_array_matches_scalar(self):
+        expected = [
+            cumulative_volume_ratio(h, ht, alpha=a, beta=b)
+            for h, ht, a, b in zip(self.h, self.ht, self.alpha, self.beta)
+        ]
+        result = cumulative_volume_ratio_array(self.h, self.ht, self.alpha, self.beta)
+        np.testing.assert_allclose(result, expected, rtol=RTOL)
+
+    def test_array_clips_to_stem(self):
+        result = cumulative_volume_ratio_array(
+            np.array([-1.0, 0.0, 65.0, 70.0]), 65.0, 2.4, 0.9
+        )
+        np.testing.assert_array_equal(result, [0, 0, 1, 1])
+
+    def test_slope(self):
+        step = 1e-6
+        slope = cumulative_volume_ratio_slope_array(
+            self.h, self.ht, self.alpha, self.beta
+        )
+        upper = cumulative_volume_ratio_array(
+            self.h + step, self.ht, self.alpha, self.beta
+        )
+        lower = cumulative_volume_ratio_array(
+            self.h - step, self.ht, self.alpha, self.beta
+        )
+        np.testing.assert_allclose(slope, (upper - lower) / (2 * step), rtol=1e-6)
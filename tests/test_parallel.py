@@ -0,0 +1,148 @@
+import numpy as np
+import pytest
+
+from nsvb import batch
+from nsvb.parallel import estimate_trees_parallel, estimate_trees_threaded
+
+SPCD = [202, 631, 316, 802, 202, 12, 611, 833, 1]
+DIA = [20.0, 11.3, 11.1, 18.1, 5.0, 8.2, 2.5, 16.4, 10.0]
+HT = [110, 28, 38, 65, 40, 45, 15, 80, 50]
+DIVISION = ["240", "M240", "M210", "M220", "240", "210", "230", "M999", ""]
+CULL = [0, 10, 3, 2, 0, 5, 1, 0, 0]
+
+
+class TestEstimateTreesParallel:
+    """
+    Runs the multiprocess engine against the single-process pipeline.
+    """
+
+    @pytest.mark.parametrize("chunk_size", [1, 4, 100])
+    def test_matches_estimate_trees(self, chunk_size):
+        expected = batch.estimate_trees(SPCD, DIA, HT, DIVISION, CULL, errors="nan")
+        result = estimate_trees_parallel(
+            SPCD,
+            DIA,
+            HT,
+            DIVISION,
+            CULL,
+            errors="nan",
+            processes=2,
+            chunk_size=chunk_size,
+        )
+        assert list(result) == list(expected)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
+
+    def test_encoded_divisions(self):
+        divisions = batch.EncodedDivisions(np.arange(len(DIVISION)), DIVISION)
+        result = estimate_trees_parallel(
+            SPCD, DIA, HT, divisions, components=["agb"], errors="nan", chunk_size=3
+        )
+        expected = batch.estimate_trees(
+            SPCD, DIA, HT, DIVISION, components=["agb"], errors="nan"
+        )
+        np.testing.assert_array_equal(result["agb"], expected["agb"])
+
+    def test_errors_raise(self):
+        with pytest.raises(KeyError):
+            estimate_trees_parallel(SPCD, DIA, HT, DIVISION, processes=2, chunk_size=2)
+
+    def test_empty_input(self):
+        result = estimate_trees_parallel([], [], [], [], components=["agb"])
+        assert result["agb"].shape == (0,)
+
+    def test_float32(self):
+        expected = batch.estimate_trees(
+            SPCD, DIA, HT, DIVISION, CULL, errors="nan", dtype=np.float32
+        )
+        result = estimate_trees_parallel(
+            SPCD, DIA, HT, DIVISION, CULL, errors="nan", processes=2, dtype=np.float32
+        )
+        for name, values in expected.items():
+            assert result[name].dtype == np.float32
+            np.testing.assert_array_equal(result[name], values)
+
+
+class TestEstimateTreesThreaded:
+    """
+    Runs the thread-pool engine against the single-threaded pipeline.
+    """
+
+    @pytest.mark.parametrize("chunk_size", [1, 4, 100])
+    def test_matches_estimate_trees(self, chunk_size):
+        expected = batch.estimate_trees(
+            SPCD, DIA, HT, DIVISION, CULL, errors="nan", decaycd=2, province="M240"
+        )
+        result = estimate_trees_threaded(
+            SPCD,
+            DIA,
+            HT,
+            DIVISION,
+            CULL,
+            errors="nan",
+            threads=4,
+            chunk_size=chunk_size,
+            decaycd=2,
+            province="M240",
+        )
+        assert list(result) == list(expected)
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
+
+    def test_encoded_divisions(self):
+        divisions = batch.EncodedDivisions(np.arange(len(DIVISION)), DIVISION)
+        result = estimate_trees_threaded(
+            SPCD, DIA, HT, divisions, components=["agb"], errors="nan", chunk_size=2
+        )
+        expected = batch.estimate_trees(
+            SPCD, DIA, HT, DIVISION, components=["agb"], errors="nan"
+        )
+        np.testing.assert_array_equal(result["agb"], expected["agb"])
+
+    @pytest.mark.parametrize(
+        "province", [None, ["M242", "212", "X", "", "M242", "212", "X", "", ""]]
+    )
+    def test_string_codes_encoded_once(self, province):
+        actual_ht = np.array(HT) * 0.7
+        expected = batch.estimate_trees(
+            SPCD,
+            DIA,
+            HT,
+            DIVISION,
+            CULL,
+            errors="nan",
+            actual_ht=actual_ht,
+            province=province,
+        )
+        result = estimate_trees_threaded(
+            SPCD,
+            DIA,
+            HT,
+            DIVISION,
+            CULL,
+            errors="nan",
+            chunk_size=2,
+            actual_ht=actual_ht,
+            province=province,
+        )
+        for name, values in expected.items():
+            np.testing.assert_array_equal(result[name], values)
+
+    def test_errors_raise(self):
+        with pytest.raises(KeyError):
+            estimate_trees_threaded(SPCD, DIA, HT, DIVISION, threads=2, chunk_size=2)
+
+    def test_empty_input(self):
+        result = estimate_trees_threaded([], [], [], [], components=["agb"])
+        assert result["agb"].shape == (0,)
+
+    def test_float32(self):
+        expected = batch.estimate_trees(
+            SPCD, DIA, HT, DIVISION, CULL, errors="nan", dtype=np.float32
+        )
+        result = estimate_trees_threaded(
+            SPCD, DIA, HT, DIVISION, CULL, errors="nan", chunk_size=2, dtype=np.float32
+        )
+        for name, values in expected.items():
+            assert result[name].dtype == np.float32
+            np.testing.assert_array_equal(result[name], values)
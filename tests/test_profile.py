@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from nsvb.profile import height_to_diameter, solve_height, stem_diameter
+
+SPCD = [202, 631, 802, 316, 12, 202, 611]
+DIA = [20.0, 11.3, 18.1, 11.1, 3.0, 8.0, 30.0]
+HT = [110, 28, 65, 38, 20, 50, 95]
+DIVISION = ["240", "M240", "M220", "M210", "", "", "230"]
+
+
+def _bisect(target, ht, v_tot, alpha, beta):
+    """
+    Reference root by plain bisection above the peak of the profile.
+    """
+    lo, hi = 1e-9 * ht, ht * (1 - 1e-12)
+    if beta > 1:
+        u = ((alpha - 1) / ((alpha - 1) + (beta - 1) * alpha)) ** (1 / alpha)
+        lo = (1 - u) * ht
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if stem_diameter(mid, ht, v_tot, alpha, beta) >= target:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+class TestSolveHeight:
+    """
+    Checks the batch Newton/bisection solver against plain bisection.
+    """
+
+    alpha = np.array([2.3, 2.1, 2.6, 1.95, 2.4])
+    beta = np.array([0.9, 0.61, 0.85, 1.03, 1.04])
+    ht = np.array([110.0, 28.0, 65.0, 38.0, 80.0])
+    v_tot = np.array([95.0, 7.5, 45.0, 11.0, 60.0])
+
+    @pytest.mark.parametrize("target", [0.5, 4.0, 7.0, 9.0])
+    def test_matches_bisection(self, target):
+        h, info = solve_height(target, self.ht, self.v_tot, self.alpha, self.beta)
+        for i, reached in enumerate(info.converged):
+            args = (self.ht[i], self.v_tot[i], self.alpha[i], self.beta[i])
+            if not reached:
+                assert np.isnan(h[i])
+                continue
+            assert h[i] == pytest.approx(_bisect(target, *args), rel=1e-9)
+        assert np.nanmax(info.residual) < 1e-8
+
+    def test_converges_quickly(self):
+        _, info = solve_height(4.0, self.ht, self.v_tot, self.alpha, self.beta)
+        assert info.converged.all()
+        assert info.iterations < 30
+
+    def test_unreachable_diameter(self):
+        """
+        With beta > 1 the profile has a peak, and larger diameters are never
+        reached.
+        """
+        h, info = solve_height(200.0, 80.0, 60.0, 2.4, 1.04)
+        assert np.isnan(h[0])
+        assert not info.converged[0]
+
+    def test_max_iter(self):
+        h, info = solve_height(
+            4.0, self.ht, self.v_tot, self.alpha, self.beta, max_iter=1
+        )
+        assert info.iterations == 1
+        assert not info.converged.all()
+
+
+class TestHeightToDiameter:
+    """
+    Solves heights for trees from their species and division.
+    """
+
+    def test_outside_bark(self):
+        h, info = height_to_diameter(SPCD, DIA, HT, 4.0, DIVISION)
+        assert info.converged.all()
+        assert (h < np.array(HT)).all()
+        assert (h > 0).all()
+
+    def test_inside_bark(self):
+        h, info = height_to_diameter(SPCD, DIA, HT, 4.0, DIVISION, bark="ib")
+        assert info.converged.all()
+        assert (h < np.array(HT)).all()
+
+    def test_breast_height(self):
+        """
+        The profile passes close to DBH at breast height.
+        """
+        h, _ = height_to_diameter(SPCD, DIA, HT, DIA, DIVISION)
+        np.testing.assert_allclose(h, 4.5, atol=3.0)
+
+    def test_errors_nan(self):
+        h, info = height_to_diameter([202, 1], 20.0, 110, 4.0, errors="nan")
+        assert h[0] > 0
+        assert np.isnan(h[1])
+        assert not info.converged[1]
+        with pytest.raises(KeyError):
+            height_to_diameter([202, 1], 20.0, 110, 4.0)
+        with pytest.raises(ValueError):
+            height_to_diameter(202, 20.0, 110, 4.0, bark="xx")
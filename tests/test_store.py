@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+import nsvb.store
+from nsvb.store import (
+    STORE_TABLES,
+    CoefficientStore,
+    _load_store_files,
+    cached_source_digest,
+    install_store,
+    open_store,
+    source_digest,
+    write_store,
+)
+from nsvb.tables import (
+    compile_carbon_fractions,
+    compile_crown_ratios,
+    compile_species,
+    compile_table,
+    compile_wood_density_proportions,
+    compiled_carbon_fractions,
+    compiled_crown_ratios,
+    compiled_table,
+    compiled_wood_density_proportions,
+)
+
+
+@pytest.fixture(scope="module")
+def store_path(tmp_path_factory):
+    return write_store(tmp_path_factory.mktemp("store") / "coefficients.nsvb")
+
+
+class TestCoefficientStore:
+    """
+    Checks the packed coefficient store against the tables compiled from the
+    CSVs.
+    """
+
+    def test_round_trip(self, store_path):
+        store = open_store(store_path, source_digest())
+        species = compile_species()
+        np.testing.assert_array_equal(store.species.spcd, species.spcd)
+        np.testing.assert_array_equal(store.species.wdsg, species.wdsg)
+        np.testing.assert_array_equal(store.species.hardwood, species.hardwood)
+        np.testing.assert_array_equal(store.species.index, species.index)
+        for name in STORE_TABLES:
+            expected = compile_table(name, species)
+            table = store.tables[name]
+            np.testing.assert_array_equal(table.model, expected.model)
+            np.testing.assert_array_equal(table.coefficients, expected.coefficients)
+            np.testing.assert_array_equal(table.divisions, expected.divisions)
+            np.testing.assert_array_equal(table.lookup, expected.lookup)
+
+    def test_round_trip_lookups(self, store_path):
+        store = open_store(store_path, source_digest())
+        np.testing.assert_array_equal(
+            store.carbon_fractions, compile_carbon_fractions()
+        )
+        np.testing.assert_array_equal(
+            store.wood_density_proportions, compile_wood_density_proportions()
+        )
+        crown_ratios = compile_crown_ratios()
+        np.testing.assert_array_equal(
+            store.crown_ratios.provinces, crown_ratios.provinces
+        )
+        np.testing.assert_array_equal(store.crown_ratios.ratios, crown_ratios.ratios)
+        assert store.crown_ratios.undefined == crown_ratios.undefined
+        assert not store.carbon_fractions.flags.writeable
+
+    def test_arrays_are_read_only_views(self, store_path):
+        store = open_store(store_path, source_digest())
+        coefficients = store.tables["s1"].coefficients
+        assert not coefficients.flags.writeable
+        assert coefficients.flags.c_contiguous
+
+    def test_stale_store_is_rejected(self, store_path):
+        assert open_store(store_path, "0" * 64) is None
+
+    def test_invalid_store_is_rejected(self, tmp_path):
+        path = tmp_path / "coefficients.nsvb"
+        assert open_store(path, source_digest()) is None
+        path.write_bytes(b"not a store")
+        assert open_store(path, source_digest()) is None
+
+    def test_from_buffer(self, store_path):
+        store = CoefficientStore.from_buffer(bytearray(store_path.read_bytes()))
+        assert store.path is None
+        assert store.digest == source_digest()
+        np.testing.assert_array_equal(
+            store.tables["s8"].lookup,
+            open_store(store_path, store.digest).tables["s8"].lookup,
+        )
+
+    def test_install_store(self, store_path):
+        store = CoefficientStore.from_buffer(store_path.read_bytes())
+        install_store(store)
+        try:
+            assert compiled_table("s1") is store.tables["s1"]
+            assert compiled_carbon_fractions() is store.carbon_fractions
+            assert compiled_wood_density_proportions() is store.wood_density_proportions
+            assert compiled_crown_ratios() is store.crown_ratios
+        finally:
+            install_store(None)
+        assert compiled_table("s1") is not store.tables["s1"]
+
+    def test_cache_dir_is_isolated(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NSVB_CACHE_DIR", str(tmp_path))
+        _load_store_files.cache_clear()
+        try:
+            store = _load_store_files()
+        finally:
+            _load_store_files.cache_clear()
+        assert store.digest == source_digest()
+        assert store.path.parent in (tmp_path, nsvb.store.DATA_PATH)
+
+    def test_cached_source_digest(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NSVB_CACHE_DIR", str(tmp_path))
+        digest = source_digest()
+        assert cached_source_digest() == digest
+        assert len(list(tmp_path.glob("digest-*"))) == 1
+
+        # A second start reads the record instead of hashing the CSVs.
+        def fail():
+            raise AssertionError("source CSVs were re-hashed")
+
+        monkeypatch.setattr(nsvb.store, "source_digest", fail)
+        assert cached_source_digest() == digest
+
+    def test_cached_source_digest_follows_stamp(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NSVB_CACHE_DIR", str(tmp_path))
+        cached_source_digest()
+        monkeypatch.setattr(nsvb.store, "source_stamp", lambda: "f" * 64)
+        monkeypatch.setattr(nsvb.store, "source_digest", lambda: "e" * 64)
+        assert cached_source_digest() == "e" * 64
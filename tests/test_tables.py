@@ -0,0 +1,171 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from nsvb.estimators import _resolve_coefficients
+from nsvb.tables import (
+    COEFFICIENT_COLUMNS,
+    REF_SPECIES,
+    TABLES,
+    WOOD_DENSITY_PROPORTIONS,
+    compiled_crown_ratios,
+    compiled_species,
+    compiled_table,
+    compiled_wood_density_proportions,
+)
+
+COMPONENTS = ["s1", "s2", "s4", "s5", "s6", "s7", "s8", "s9"]
+
+
+def _resolvable(table_name, spcd, division):
+    try:
+        return _resolve_coefficients(table_name, spcd, division)[1]
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+class TestCompiledTable:
+    """
+    Checks the compiled coefficient index against the dict lookups used by
+    the scalar estimators.
+    """
+
+    @pytest.mark.parametrize("table_name", COMPONENTS)
+    def test_matches_scalar_resolution(self, table_name):
+        species = compiled_species()
+        table = compiled_table(table_name)
+        keys = list(TABLES[f"{table_name}a"])
+        # Unknown divisions and species without SPCD coefficients.
+        keys += [(spcd, "M999") for spcd, _ in keys[:20]]
+        keys += [(spcd, "240") for spcd in (631, 316, 802, 990, 6156)]
+
+        for spcd, division in keys:
+            expected = _resolvable(table_name, spcd, division)
+            slots = species.slots([spcd])
+            codes = table.division_codes([division])
+            if expected is None:
+                with pytest.raises(ValueError):
+                    table.rows(slots, codes)
+                continue
+            row = table.rows(slots, codes)[0]
+            assert table.model[row] == expected["model"]
+            for name in COEFFICIENT_COLUMNS:
+                value = table.columns[name][row]
+                if expected.get(name) is None:
+                    assert np.isnan(value)
+                else:
+                    assert value == expected[name]
+
+    def test_columns_are_contiguous(self):
+        table = compiled_table("s1")
+        for values in table.columns.values():
+            assert values.flags.c_contiguous
+
+    def test_unknown_species(self):
+        with pytest.raises(KeyError):
+            compiled_species().slots([202, 1])
+        with pytest.raises(KeyError):
+            compiled_species().slots([max(REF_SPECIES) + 1])
+
+    def test_species_columns(self):
+        species = compiled_species()
+        slot = species.slots([202])[0]
+        assert species.wdsg[slot] == 0.45
+        assert not species.hardwood[slot]
+        assert species.jenkins_spgrpcd[slot] == int(REF_SPECIES[202]["JENKINS_SPGRPCD"])
+
+
+class TestResolvedCoefficients:
+    """
+    Checks that resolved coefficient records are per-species and read-only.
+    """
+
+    def test_jenkins_records_are_per_species(self):
+        # Species 6156 and 6157 share a Jenkins group with different wdsg.
+        _, first = _resolve_coefficients("s7", 6156)
+        _, second = _resolve_coefficients("s7", 6157)
+        assert first["wdsg"] == 0.41
+        assert second["wdsg"] == 0.52
+        assert "wdsg" not in TABLES["s7b"][int(REF_SPECIES[6156]["JENKINS_SPGRPCD"])]
+
+    def test_records_are_read_only(self):
+        for spcd in (202, 6156):
+            _, record = _resolve_coefficients("s1", spcd, "240")
+            with pytest.raises(TypeError):
+                record["a"] = 0.0
+            assert _resolve_coefficients("s1", spcd, "240")[1] is record
+
+
+class TestLazyTables:
+    """
+    Checks that tables are read on first access rather than at import.
+    """
+
+    def _run(self, snippet):
+        return subprocess.run(
+            [sys.executable, "-c", snippet], check=True, capture_output=True, text=True
+        ).stdout.split()
+
+    def test_import_reads_no_tables(self):
+        loaded = self._run(
+            "import nsvb.estimators, nsvb.batch\n"
+            "from nsvb.tables import TABLES, REF_SPECIES, WOOD_DENSITY_PROPORTIONS\n"
+            "tables = [*TABLES.values(), REF_SPECIES, WOOD_DENSITY_PROPORTIONS]\n"
+            "print(sum(table.loaded for table in tables))"
+        )
+        assert loaded == ["0"]
+
+    def test_reads_only_the_accessed_table(self):
+        loaded = self._run(
+            "from nsvb.estimators import total_stem_bark_weight\n"
+            "from nsvb.tables import TABLES, REF_SPECIES\n"
+            "total_stem_bark_weight(202, 20.0, 110, '240')\n"
+            "print(*[name for name, table in TABLES.items() if table.loaded])\n"
+            "print(REF_SPECIES.loaded)"
+        )
+        assert loaded == ["s6a", "True"]
+
+    def test_mapping_interface(self):
+        assert len(TABLES["s1b"]) == 9
+        assert 1 in TABLES["s1b"]
+        assert TABLES["s1b"].get(99) is None
+        assert dict(TABLES["s1b"]) == {key: TABLES["s1b"][key] for key in TABLES["s1b"]}
+
+
+class TestWoodDensityProportions:
+    """
+    Checks the compiled Table 1 proportions of dead trees.
+    """
+
+    def test_matches_table(self):
+        proportions = compiled_wood_density_proportions()
+        for (wood, decaycd), row in WOOD_DENSITY_PROPORTIONS.items():
+            assert proportions[int(wood == "H"), decaycd].tolist() == [
+                row["DensProp"],
+                row["BarkProp"],
+                row["BranchProp"],
+            ]
+        assert (proportions[:, 0] == 1).all()
+        assert not proportions.flags.writeable
+
+
+class TestCrownRatios:
+    """
+    Checks the compiled Table S11 crown ratios.
+    """
+
+    def test_lookup(self):
+        table = compiled_crown_ratios()
+        codes = table.province_codes(["M242", "M242", "Islan", "M240", ""])
+        ratios = table.ratios[codes, [0, 1, 0, 1, 0]]
+        # Islan has no softwood row, and M240 and "" are not provinces.
+        expected = [
+            TABLES["s11"][("M242", "N")],
+            TABLES["s11"][("M242", "Y")],
+            TABLES["s11"][("UNDEFINED", "N")],
+            TABLES["s11"][("UNDEFINED", "Y")],
+            TABLES["s11"][("UNDEFINED", "N")],
+        ]
+        np.testing.assert_array_equal(ratios, np.array(expected) / 100)
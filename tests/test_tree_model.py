@@ -0,0 +1,112 @@
+import pytest
+
+from nsvb import estimators
+from nsvb.estimators import TreeModel
+
+COMPONENTS = [
+    "total_inside_bark_wood_volume",
+    "total_bark_wood_volume",
+    "total_outside_bark_volume",
+    "total_stem_wood_dry_weight",
+    "total_stem_bark_weight",
+    "total_branch_weight",
+    "total_aboveground_biomass",
+    "total_foliage_dry_weight",
+]
+
+# Trees from the GTR examples: division-specific, species-level and Jenkins
+# group coefficients.
+TREES = [
+    (202, 20.0, 110, "240"),
+    (316, 11.1, 38, "M210"),
+    (631, 11.3, 28, "M240"),
+    (802, 18.1, 65, "M220"),
+]
+
+
+class TestTreeModel:
+    """
+    Runs the bound TreeModel methods against the module-level estimators.
+    """
+
+    @pytest.mark.parametrize("component", COMPONENTS)
+    @pytest.mark.parametrize("spcd, dia, ht, division", TREES)
+    def test_matches_estimators(self, component, spcd, dia, ht, division):
+        expected = getattr(estimators, component)(spcd, dia, ht, division)
+        model = TreeModel(spcd, division)
+        assert getattr(model, component)(dia, ht) == expected
+
+    def test_cull(self):
+        expected = estimators.total_stem_wood_dry_weight(316, 11.1, 38, "M210", cull=3)
+        assert (
+            TreeModel(316, "M210").total_stem_wood_dry_weight(11.1, 38, 3) == expected
+        )
+
+    def test_cached_per_key(self):
+        assert TreeModel(202, "240") is TreeModel(202, "240")
+        assert TreeModel(202, "240") is not TreeModel(202, "")
+
+    def test_slots(self):
+        model = TreeModel(202, "240")
+        assert not hasattr(model, "__dict__")
+        assert model.wdsg == 0.45
+        assert not model.hardwood
+
+    def test_unknown_species(self):
+        with pytest.raises(KeyError):
+            TreeModel(1)
+
+    def test_unresolvable_component(self):
+        """
+        Species without coefficients fail when the component is evaluated,
+        with the same error as the module-level estimators.
+        """
+        model = TreeModel(990)
+        with pytest.raises(TypeError):
+            estimators.total_inside_bark_wood_volume(990, 10.0, 20)
+        with pytest.raises(TypeError):
+            model.total_inside_bark_wood_volume(10.0, 20)
+
+    def test_division_row_without_species_row(self, monkeypatch):
+        """
+        A division row of a species without a species-level row is ignored
+        in favour of the Jenkins group, as in the original lookup.
+        """
+        s1a = dict(estimators.TABLES["s1a"])
+        s1a[(631, "M240")] = s1a[(202, "240")]
+        monkeypatch.setattr(estimators, "TABLES", {**estimators.TABLES, "s1a": s1a})
+        estimators._resolve.cache_clear()
+        try:
+            key, _ = estimators._resolve_coefficients("s1", 631, "M240")
+        finally:
+            estimators._resolve.cache_clear()
+        assert key[0] == "s1b"
+
+    def test_resolutions_are_bounded(self):
+        info = estimators._resolve.cache_info()
+        assert info.maxsize == estimators.RESOLVED_MAXSIZE
+
+
+class TestEstimateTree:
+    """
+    Runs the full-tree pipeline against the individual estimators.
+    """
+
+    @pytest.mark.parametrize("spcd, dia, ht, division", TREES)
+    def test_matches_estimators(self, spcd, dia, ht, division):
+        result = estimators.estimate_tree(spcd, dia, ht, division, cull=2)
+        assert list(result) == list(estimators.COMPONENTS)
+        assert result == {
+            "v_tot_ib": estimators.total_inside_bark_wood_volume(
+                spcd, dia, ht, division
+            ),
+            "v_tot_bk": estimators.total_bark_wood_volume(spcd, dia, ht, division),
+            "v_tot_ob": estimators.total_outside_bark_volume(spcd, dia, ht, division),
+            "w_tot_ib": estimators.total_stem_wood_dry_weight(
+                spcd, dia, ht, division, cull=2
+            ),
+            "w_tot_bk": estimators.total_stem_bark_weight(spcd, dia, ht, division),
+            "w_branch": estimators.total_branch_weight(spcd, dia, ht, division),
+            "agb": estimators.total_aboveground_biomass(spcd, dia, ht, division),
+            "w_foliage": estimators.total_foliage_dry_weight(spcd, dia, ht, division),
+        }
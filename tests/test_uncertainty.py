@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from nsvb.batch import EncodedDivisions, estimate_trees
+from nsvb.tables import TABLES
+from nsvb.uncertainty import (
+    RunningMoments,
+    confidence_interval,
+    residual_sigma,
+    simulate_totals,
+)
+
+
+class TestRunningMoments:
+    """
+    Checks the streaming moments against NumPy over the whole sample.
+    """
+
+    def test_matches_numpy(self):
+        samples = np.random.default_rng(0).normal(5.0, 2.0, (1000, 3))
+        moments = RunningMoments(3)
+        for start in range(0, 1000, 137):
+            moments.update(samples[start : start + 137])
+        assert moments.count == 1000
+        np.testing.assert_allclose(moments.mean, samples.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(
+            moments.variance, samples.var(axis=0, ddof=1), rtol=1e-12
+        )
+
+    def test_too_few_samples(self):
+        moments = RunningMoments(2)
+        moments.update(np.ones((1, 2)))
+        assert np.isnan(moments.variance).all()
+
+
+class TestResidualSigma:
+    """
+    Checks the scorecard precedence of the residual SIGMA lookup.
+    """
+
+    def test_precedence(self):
+        sigma = residual_sigma(
+            "agb", [802, 802, 802, 99999], ["M220", "", "X", "M220"], min_n=30
+        )
+        assert sigma[0] == TABLES["s19"][("TT_WDBK_DW_ADJ", 802, "M220")]["SIGMA"]
+        assert sigma[1] == TABLES["s13"][("TT_WDBK_DW_ADJ", 802)]["SIGMA"]
+        assert sigma[2] == sigma[1]
+        assert sigma[3] == TABLES["s18"][("TT_WDBK_DW_ADJ", "M220")]["SIGMA"]
+
+    def test_min_n(self):
+        n = TABLES["s19"][("TT_WDBK_DW_ADJ", 802, "M220")]["N"]
+        sigma = residual_sigma("agb", 802, "M220", min_n=n + 1)
+        assert sigma[0] == TABLES["s13"][("TT_WDBK_DW_ADJ", 802)]["SIGMA"]
+
+    def test_encoded_divisions(self):
+        division = EncodedDivisions([0, 1, -1], ["M220", "X"])
+        np.testing.assert_array_equal(
+            residual_sigma("w_branch", 802, division),
+            residual_sigma("w_branch", [802] * 3, ["M220", "X", ""]),
+        )
+
+
+@pytest.fixture(scope="module")
+def stand():
+    rng = np.random.default_rng(1)
+    n = 2000
+    return {
+        "spcd": rng.choice([202, 316, 802, 631], n),
+        "dia": rng.uniform(10, 30, n),
+        "ht": rng.uniform(60, 100, n),
+        "division": rng.choice(["240", "M220", "210"], n),
+        "groups": rng.integers(0, 5, n),
+    }
+
+
+class TestSimulateTotals:
+    """
+    Runs the Monte Carlo group totals on a small stand of plots.
+    """
+
+    def test_moments(self, stand):
+        result = simulate_totals(
+            **stand, components=["agb", "w_branch"], n_draws=400, seed=2
+        )
+        predictions = estimate_trees(
+            stand["spcd"], stand["dia"], stand["ht"], stand["division"]
+        )
+        for name, summary in result.items():
+            np.testing.assert_array_equal(summary.groups, np.arange(5))
+            np.testing.assert_allclose(
+                summary.total,
+                np.bincount(stand["groups"], weights=predictions[name]),
+            )
+            sd = residual_sigma(name, stand["spcd"], stand["division"]) * stand["dia"]
+            expected_std = np.sqrt(np.bincount(stand["groups"], weights=sd**2))
+            # Residuals truncated at zero shift the mean up and the spread
+            # down slightly.
+            np.testing.assert_allclose(summary.mean, summary.total, rtol=0.01)
+            np.testing.assert_allclose(summary.std, expected_std, rtol=0.15)
+            lower, upper = confidence_interval(summary)
+            assert (lower < summary.mean).all() and (summary.mean < upper).all()
+
+    def test_reproducible(self, stand):
+        first = simulate_totals(**stand, n_draws=20, seed=3, block_size=5000)
+        second = simulate_totals(**stand, n_draws=20, seed=3, block_size=5000)
+        np.testing.assert_array_equal(first["agb"].mean, second["agb"].mean)
+        np.testing.assert_array_equal(first["agb"].std, second["agb"].std)
+
+    def test_expansion(self, stand):
+        result = simulate_totals(**stand, expansion=6.018, n_draws=10, seed=4)
+        unweighted = simulate_totals(**stand, n_draws=10, seed=4)
+        np.testing.assert_allclose(result["agb"].total, unweighted["agb"].total * 6.018)
+        np.testing.assert_allclose(result["agb"].mean, unweighted["agb"].mean * 6.018)
+
+    def test_dead_foliage_has_no_error(self, stand):
+        result = simulate_totals(
+            **stand, components=["w_foliage"], n_draws=10, seed=5, decaycd=3
+        )
+        np.testing.assert_array_equal(result["w_foliage"].mean, 0)
+        np.testing.assert_array_equal(result["w_foliage"].std, 0)
+
+    def test_invalid_arguments(self, stand):
+        with pytest.raises(ValueError):
+            simulate_totals(**stand, components=["volume"])
+        with pytest.raises(ValueError):
+            simulate_totals(**stand, n_draws=0)